@@ -8,42 +8,71 @@ bl_info = {
 }
 
 import bpy
-from bpy.props import StringProperty
-from bpy.types import Operator, Panel, PropertyGroup
+from bpy.props import StringProperty, BoolProperty, IntProperty, FloatProperty, EnumProperty, CollectionProperty
+from bpy.types import Operator, Panel, PropertyGroup, UIList
 import subprocess
 import os
 import json
-import mathutils
-import sys
+import shutil
+import time
+import tempfile
+import contextlib
 
-# Import the local module containing pose functions
-from . import pose_functions 
+from . import baking
+from . import pose_table
+from . import rig_profiles
+from . import emotion
+from . import preview
+from . import whisper_worker
+from . import phoneme_cache
+from . import timeline_io
+from . import transcribers
+from . import profiling
 
 
 # ------------------------------------------------------------------------
 # 0. CONFIGURATION AND MAPPING
 # ------------------------------------------------------------------------
 
-VISEME_TO_FUNCTION = {
-    "Rest/Neutral": 'apply_rest_pose', 
-    "ClosedLips": 'apply_closed_lips_pose',
-    "LipOpenSmall": 'applylipopensmallpose',
-    "LipWide": 'apply_lip_wide_pose',
-    "LipOpenBig": 'apply_lip_open_big_pose',
-    "OO": 'apply_oo_pose',
-    "EE": 'apply_ee_pose',
-    "FV": 'apply_fv_pose',
-    "TH": 'apply_th_pose',
-    "ChSh": 'apply_chsh_pose',
-    "KG": 'apply_kg_pose',
-    "LR": 'apply_lr_pose'
-}
+# Viseme poses are defined declaratively in viseme_poses.json and compiled
+# once into a (n_visemes, n_bones, 10) array by pose_table.py. Rig profiles
+# (rig_profiles/*.json) map the table onto rigs with other bone names.
 
 
 # ------------------------------------------------------------------------
 # 1. DATA / PROPERTIES
 # ------------------------------------------------------------------------
 
+class LipSyncJob(PropertyGroup):
+    """One talking character of a multi-character scene."""
+    enabled: BoolProperty(
+        name="Enabled",
+        default=True
+    )
+    armature_name: StringProperty(
+        name="Armature",
+        description="Armature object of this character"
+    )
+    audio_file: StringProperty(
+        name="Audio / Timings",
+        description="Audio file with extracted timings, or a timings file (.json, .npz)",
+        subtype='FILE_PATH'
+    )
+    frame_offset: IntProperty(
+        name="Frame Offset",
+        default=0,
+        description="Shifts this character's keys along the timeline"
+    )
+    rig_profile: EnumProperty(
+        name="Rig Profile",
+        items=rig_profiles.rig_profile_items,
+        description="Bone names and viseme poses for this character's rig"
+    )
+    status: StringProperty(
+        name="Status",
+        default=""
+    )
+
 class PhonemeSettings(PropertyGroup):
     audio_file: StringProperty(
         name="Audio File",
@@ -55,47 +84,489 @@ class PhonemeSettings(PropertyGroup):
         default="mixamorig",
         description="Name of the Armature object to animate (e.g., 'mixamorig')"
     )
+    rig_profile: EnumProperty(
+        name="Rig Profile",
+        items=rig_profiles.rig_profile_items,
+        description="Bone names and viseme poses for the target rig (files in rig_profiles/)"
+    )
+    use_cache: BoolProperty(
+        name="Use Phoneme Cache",
+        default=True,
+        description="Reuse extraction results for audio that has not changed"
+    )
+    cache_dir: StringProperty(
+        name="Cache Folder",
+        default=phoneme_cache.DEFAULT_CACHE_DIR,
+        description="Folder holding cached phoneme timings",
+        subtype='DIR_PATH'
+    )
+    cache_max_mb: IntProperty(
+        name="Cache Size (MB)",
+        default=512,
+        min=1,
+        description="Least recently used entries are removed above this size"
+    )
+    chunk_seconds: IntProperty(
+        name="Chunk Length (s)",
+        default=0,
+        min=0,
+        description="Transcribe long audio in overlapping windows of this length, "
+                    "writing partial timings as it goes (0 = whole file at once)"
+    )
+    transcription_backend: EnumProperty(
+        name="Backend",
+        items=[
+            ('openai-whisper', "OpenAI Whisper", "Reference PyTorch implementation"),
+            ('faster-whisper', "faster-whisper", "CTranslate2 inference, several times faster on CPU"),
+        ],
+        default='openai-whisper'
+    )
+    whisper_model: EnumProperty(
+        name="Model",
+        items=[(size, size, "") for size in transcribers.MODEL_SIZES],
+        default='base',
+        description="Larger models are more accurate and slower"
+    )
+    compute_type: EnumProperty(
+        name="Precision",
+        items=[
+            ('default', "Default", "int8 for faster-whisper, the model's own precision for OpenAI Whisper"),
+            ('int8', "int8", "Quantized weights, fastest on CPU (faster-whisper only)"),
+            ('int8_float16', "int8 / float16", "Quantized weights with float16 math on GPU (faster-whisper only)"),
+            ('float16', "float16", "Half precision, GPU only"),
+            ('float32', "float32", "Full precision"),
+        ],
+        default='default'
+    )
+    cpu_threads: IntProperty(
+        name="CPU Threads",
+        default=0,
+        min=0,
+        description="Threads used by the transcriber (0 = backend default)"
+    )
+    use_vad: BoolProperty(
+        name="Skip Silence (VAD)",
+        default=True,
+        description="Only transcribe the detected speech; silences become rest poses directly"
+    )
+    timings_format: EnumProperty(
+        name="Timings Format",
+        items=[
+            ('JSON', "JSON", "Indented JSON, easy to read and edit"),
+            ('NPZ', "Compact (NPZ)", "Columnar NumPy file, small and fast to load for long takes"),
+            ('BOTH', "Both", "Write JSON and the compact file side by side"),
+        ],
+        default='JSON'
+    )
+    extract_status: StringProperty(
+        name="Extraction Status",
+        default=""
+    )
+    extract_progress: FloatProperty(
+        name="Progress",
+        default=0.0,
+        min=0.0,
+        max=100.0,
+        subtype='PERCENTAGE'
+    )
+    batch_jobs: IntProperty(
+        name="Batch Processes",
+        default=0,
+        min=0,
+        description="Processes used for decoding and G2P in batch mode (0 = all cores but one)"
+    )
+    batch_status: StringProperty(
+        name="Batch Status",
+        default=""
+    )
+    incremental_bake: BoolProperty(
+        name="Incremental Re-bake",
+        default=True,
+        description="Only re-key the frames whose visemes changed since the last bake, "
+                    "keeping hand-edited keys elsewhere"
+    )
+    jobs: CollectionProperty(
+        type=LipSyncJob,
+        name="Characters"
+    )
+    active_job_index: IntProperty(
+        name="Active Character",
+        default=0
+    )
+    optimize_keys: BoolProperty(
+        name="Optimize Keyframes",
+        default=True,
+        description="Merge repeated visemes and drop keys that do not change the curves"
+    )
+    key_tolerance: FloatProperty(
+        name="Key Tolerance",
+        default=0.001,
+        min=0.0,
+        precision=4,
+        description="Keys closer than this to the interpolated curve are removed"
+    )
+    max_keys_per_second: IntProperty(
+        name="Max Keys / Second",
+        default=0,
+        min=0,
+        description="Upper limit on key density along the timeline (0 = no limit)"
+    )
+    coarticulation: FloatProperty(
+        name="Coarticulation (s)",
+        default=0.04,
+        min=0.0,
+        max=0.25,
+        precision=3,
+        description="How far ahead (and slightly less behind) neighbouring visemes blend into each other; "
+                    "0 keys every viseme at full strength"
+    )
+    emotion: EnumProperty(
+        name="Emotion",
+        items=emotion.emotion_items,
+        description="Expression held over the whole take when there is no emotion file or timings label"
+    )
+    emotion_intensity: FloatProperty(
+        name="Intensity",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    emotion_blend: FloatProperty(
+        name="Blend (s)",
+        default=0.25,
+        min=0.0,
+        description="Time to ramp between expressions"
+    )
+    emotion_file: StringProperty(
+        name="Emotion File",
+        default="",
+        description="JSON list of {start, end, emotion, intensity} segments (optional)",
+        subtype='FILE_PATH'
+    )
+    log_level: EnumProperty(
+        name="Log Level",
+        items=[
+            ('WARNING', "Warnings", "Only problems"),
+            ('INFO', "Info", "Also repeated status messages (e.g. live preview reloads)"),
+            ('DEBUG', "Debug", "Also per-pose messages; slows down baking with the legacy pose functions"),
+        ],
+        default='WARNING',
+        update=lambda self, context: profiling.set_log_level(self.log_level),
+        description="Detail of the lip sync messages in the system console"
+    )
+    profile_mode: EnumProperty(
+        name="Profile Export",
+        items=[
+            ('OFF', "Off", "Stage timings only (shown below)"),
+            ('CPROFILE', "cProfile", "Function-level cProfile stats (.prof) of each bake"),
+            ('TRACE', "Trace Events", "Chrome trace-event JSON of each run, including the Whisper worker's stages"),
+        ],
+        default='OFF'
+    )
+    profile_dir: StringProperty(
+        name="Profile Folder",
+        default="",
+        description="Folder for exported profiles (empty = system temp folder)",
+        subtype='DIR_PATH'
+    )
 
 # ------------------------------------------------------------------------
 # 2. EXTERNAL EXECUTION LOGIC
 # ------------------------------------------------------------------------
 
-def extract_phonemes_external(audio_path):
-    script_path = os.path.join(os.path.dirname(__file__), "open_AI_whisper.py")
-    output_path = os.path.splitext(audio_path)[0] + "_phonemes.json"
-    
-    # !!! CRITICAL: YOUR PYTHON INSTALLATION PATH !!!
-    python_exe = r"C:\Program Files\Python310\python.exe" 
+# !!! CRITICAL: YOUR PYTHON INSTALLATION PATH !!!
+PYTHON_EXE = r"C:\Program Files\Python310\python.exe"
+WHISPER_SCRIPT = os.path.join(os.path.dirname(__file__), "open_AI_whisper.py")
+# Transcriber spec and threads used without scene settings (command line);
+# a Whisper model name or backend:model[:compute_type], see transcribers.py
+WHISPER_MODEL = "base"
+WHISPER_THREADS = 0
+
+def transcriber_spec(settings):
+    """Canonical transcriber spec selected in the panel (matches the timings' meta "model")."""
+    return transcribers.model_id(settings.transcription_backend, settings.whisper_model, settings.compute_type)
+
+def extract_phonemes_external(audio_path, cache=None, options=None, model=None, threads=None):
+    model = transcribers.canonical_spec(model or WHISPER_MODEL)
+    threads = WHISPER_THREADS if threads is None else threads
+    output_path = timings_output_path(audio_path, options)
 
     try:
         audio_path = os.path.abspath(audio_path)
         if not os.path.exists(audio_path): return None
 
-        cmd = [python_exe, script_path, "--audio", audio_path, "--out", output_path]
-        
-        print(f"Running external script: {' '.join(cmd)}")
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, env=os.environ.copy(), timeout=300)
+        if fetch_cached_timings(cache, audio_path, output_path, options, model):
+            return output_path
+
+        # The worker stays alive between calls, so only the first extraction pays
+        # for interpreter startup, torch import and model loading.
+        result = whisper_worker.run_job(
+            PYTHON_EXE, WHISPER_SCRIPT, audio_path, output_path, model, timeout=300, options=options,
+            threads=threads
+        )
+
+        if not result.get("ok"):
+            print("Error running Whisper worker job:", result.get("error"))
+            return None
 
-        if result.returncode != 0:
-            print("Error running Whisper script; return code:", result.returncode)
-            print("[Subprocess stdout]:", result.stdout)
-            print("[Subprocess stderr]:", result.stderr)
+        if not os.path.exists(output_path):
             return None
 
-        return output_path if os.path.exists(output_path) else None
+        if cache is not None:
+            store_in_cache(cache, audio_path, output_path, options)
+        return output_path
 
     except Exception as e:
         print(f"Error calling phoneme extraction: {e}")
         return None
 
+def fetch_cached_timings(cache, audio_path, output_path, options=None, model=None):
+    """Unchanged audio + same pipeline: reuse the stored result, no Whisper run."""
+    if cache is None:
+        return False
+    key = cache.lookup_key(audio_path, model or WHISPER_MODEL, options)
+    cached_path = cache.get(key) if key else None
+    if not cached_path:
+        return False
+    shutil.copyfile(cached_path, output_path)
+    print(f"Phoneme cache hit for {audio_path}")
+    return True
+
+def store_in_cache(cache, audio_path, output_path, options=None):
+    meta = timeline_io.read_meta(output_path)
+    if "g2p_version" not in meta:
+        return
+    cache.save_environment(meta)
+    key = cache.cache_key(audio_path, meta.get("model", WHISPER_MODEL), meta["g2p_version"], options)
+    cache.put(key, output_path)
+
+def extraction_options(settings):
+    """Keyword arguments for open_AI_whisper.extract() from the panel settings."""
+    return {
+        "chunk_seconds": settings.chunk_seconds,
+        "output_format": settings.timings_format.lower(),
+        "vad": settings.use_vad,
+    }
+
+def bake_options(settings):
+    """Keyword arguments for baking.bake_viseme_timeline() from the panel settings."""
+    return {
+        "optimize": settings.optimize_keys,
+        "key_tolerance": settings.key_tolerance,
+        "max_keys_per_second": settings.max_keys_per_second,
+        "coarticulation": settings.coarticulation,
+    }
+
+def timings_output_path(audio_path, options=None):
+    extension = ".npz" if (options or {}).get("output_format") == "npz" else ".json"
+    return os.path.splitext(audio_path)[0] + "_phonemes" + extension
+
+def timings_path_for_audio(audio_file):
+    """
+    Returns (path, is_partial) of the newest timing file of `audio_file`
+    (.npz or .json), or of the .partial.jsonl that a chunked extraction appends
+    to while it is still running. A partial file newer than the finished
+    output belongs to a re-extraction in progress and wins over the old take.
+    """
+    base_path = os.path.splitext(audio_file)[0] + "_phonemes"
+    candidates = [p for p in (base_path + ".npz", base_path + ".json", base_path + ".partial.jsonl")
+                  if os.path.exists(p)]
+    if not candidates:
+        raise FileNotFoundError(base_path + ".json")
+
+    path = max(candidates, key=os.path.getmtime)
+    return path, path.endswith(".partial.jsonl")
+
+def load_timeline_for_audio(audio_file):
+    """Returns (VisemeTimeline, is_partial) for the newest timing file of `audio_file`."""
+    path, is_partial = timings_path_for_audio(audio_file)
+    with profiling.stage("timeline_load"):
+        return timeline_io.load_timeline(path), is_partial
+
+TIMELINE_EXTENSIONS = (".json", ".npz", ".jsonl")
+
+def load_job_timeline(path, loaded=None):
+    """
+    Timeline for a character job: `path` is either a timings file or an audio
+    file whose newest timings are used. `loaded` shares timelines between jobs.
+    """
+    path = bpy.path.abspath(path)
+    if loaded is not None and path in loaded:
+        return loaded[path]
+
+    if path.lower().endswith(TIMELINE_EXTENSIONS):
+        with profiling.stage("timeline_load"):
+            timeline = timeline_io.load_timeline(path)
+    else:
+        timeline, _is_partial = load_timeline_for_audio(path)
+    if not len(timeline):
+        raise ValueError(f"No viseme timings in '{os.path.basename(path)}'")
+
+    if loaded is not None:
+        loaded[path] = timeline
+    return timeline
+
+def bake_characters(jobs, fps, options, incremental=True):
+    """
+    Bakes every job (armature_name, audio_file, frame_offset, rig_profile)
+    without selection or mode changes. Returns one result dict per job.
+    """
+    bake = baking.rebake_viseme_timeline if incremental else baking.bake_viseme_timeline
+    # Timelines are shared by path; profiles are compiled once per file and
+    # validated once per armature data, so each rig type is resolved once.
+    timelines = {}
+    results = []
+    batch_start = time.perf_counter()
+
+    for job in jobs:
+        job_start = time.perf_counter()
+        result = {"armature": job.armature_name, "audio": job.audio_file, "ok": False}
+        results.append(result)
+        try:
+            armature = bpy.data.objects.get(job.armature_name)
+            if not armature or armature.type != 'ARMATURE':
+                raise ValueError(f"Armature '{job.armature_name}' not found")
+            # The bake replaces the action a preview has set aside
+            preview.stop_preview(armature.name)
+            timeline = load_job_timeline(job.audio_file, timelines)
+            profile = rig_profiles.load_profile(job.rig_profile)
+            profile.bind(armature)
+            first_frame, last_frame, keyframe_count = bake(
+                armature, timeline, fps, profile.table, frame_offset=job.frame_offset,
+                action_name=f"{armature.name}_LipSync", **options
+            )
+        except FileNotFoundError as e:
+            result["error"] = f"no timings ({os.path.basename(str(e))}), run extraction first"
+        except (OSError, ValueError, KeyError) as e:
+            result["error"] = str(e)
+        else:
+            result.update(ok=True, phonemes=len(timeline), keyframes=keyframe_count,
+                          frame_start=first_frame, frame_end=last_frame)
+
+        result["seconds"] = round(time.perf_counter() - job_start, 4)
+        if result["ok"]:
+            print(f"  {job.armature_name}: {result['phonemes']} phonemes, {result['keyframes']} keys, "
+                  f"{result['seconds']:.3f}s")
+        else:
+            print(f"  {job.armature_name}: Failed: {result['error']}")
+
+    baked = sum(1 for result in results if result["ok"])
+    print(f"Baked {baked}/{len(jobs)} characters in {time.perf_counter() - batch_start:.2f}s")
+    return results
+
+def start_batch_extraction(folder, jobs, options=None, model=None, threads=None):
+    """
+    Launches open_AI_whisper.py --batch in the background with the extraction
+    `options` (see extraction_options) and returns (process, report path).
+    """
+    options = options or {}
+    report_path = os.path.join(folder, "batch_report.json")
+    cmd = [PYTHON_EXE, WHISPER_SCRIPT, "--batch", folder, "--model", model or WHISPER_MODEL,
+           "--threads", str(WHISPER_THREADS if threads is None else threads), "--report", report_path,
+           "--format", options.get("output_format", "json")]
+    if jobs > 0:
+        cmd += ["--jobs", str(jobs)]
+    if not options.get("vad", True):
+        cmd.append("--no-vad")
+    if not options.get("energy_timing", True):
+        cmd.append("--no-energy-timing")
+
+    print(f"Running external batch: {' '.join(cmd)}")
+    return subprocess.Popen(cmd, env=os.environ.copy()), report_path
+
+def store_batch_in_cache(cache, report_path, options=None):
+    """Stores every clip the batch report lists as extracted. Returns (ok, failed) clip counts."""
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    # Batch runs never chunk; aligned clips are keyed by their transcript
+    options = {**(options or {}), "chunk_seconds": 0}
+    ok = failed = 0
+    for clip in report.get("clips", []):
+        if not clip.get("ok"):
+            failed += 1
+            continue
+        ok += 1
+        if cache is None or not os.path.exists(clip.get("out", "")):
+            continue
+        try:
+            store_in_cache(cache, clip["audio"], clip["out"], {**options, "transcript": clip.get("transcript")})
+        except (OSError, ValueError) as e:
+            print(f"Could not store timings for {clip['audio']} in cache: {e}")
+    return ok, failed
+
+def profile_output_path(settings, name):
+    """File for the profile export selected in the panel, or None when it is off."""
+    if settings.profile_mode == 'OFF':
+        return None
+    extension = ".prof" if settings.profile_mode == 'CPROFILE' else ".trace.json"
+    folder = bpy.path.abspath(settings.profile_dir) if settings.profile_dir else tempfile.gettempdir()
+    return os.path.join(folder, f"lipsync_{name}_{time.strftime('%Y%m%d-%H%M%S')}{extension}")
+
+def begin_profiled_run(settings):
+    profiling.set_log_level(settings.log_level)
+    profiling.profiler.reset(trace=settings.profile_mode == 'TRACE')
+
+def finish_profiled_run(settings, label, name):
+    """Keeps the run's stage breakdown for the panel, prints it and writes the trace if enabled."""
+    print(profiling.format_run(profiling.profiler.finish(label)))
+    if settings.profile_mode == 'TRACE':
+        print(f"Trace events saved to: {profiling.profiler.write_trace(profile_output_path(settings, name))}")
+
+@contextlib.contextmanager
+def profiled_run(settings, label, name):
+    """Times an operator run per stage (profiling.py), under cProfile if selected."""
+    begin_profiled_run(settings)
+    cprofile_path = profile_output_path(settings, name) if settings.profile_mode == 'CPROFILE' else None
+    try:
+        with profiling.cprofile(cprofile_path):
+            yield
+    finally:
+        # Also closes the run of a failed bake, so the next run starts clean
+        finish_profiled_run(settings, label, name)
+
+def get_phoneme_cache(settings):
+    if not settings.use_cache:
+        return None
+    return phoneme_cache.PhonemeCache(
+        bpy.path.abspath(settings.cache_dir), settings.cache_max_mb * 1024 * 1024
+    )
+
 # ------------------------------------------------------------------------
 # 3. OPERATORS
 # ------------------------------------------------------------------------
 
+EXTRACT_STAGE_LABELS = {
+    "model_load": "Loading Whisper model",
+    "transcribe": "Transcribing",
+    "g2p": "Converting words to phonemes",
+    "chunk": "Transcribed chunk (partial timings ready)",
+    "write": "Writing timings",
+}
+
+def set_extract_status(context, text, progress=None):
+    settings = context.scene.phoneme_settings
+    settings.extract_status = text
+    if progress is not None:
+        settings.extract_progress = progress
+
+    if context.workspace:
+        context.workspace.status_text_set(f"Lip Sync: {text}" if text else None)
+    for area in context.screen.areas if context.screen else ():
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+
+
 class PHONEME_OT_Extract(Operator):
     bl_idname = "wm.phoneme_extract"
     bl_label = "Extract Timings (Run Whisper)"
+    bl_description = "Run Whisper in the background (press Esc to cancel)"
+
+    _running = False
+
+    @classmethod
+    def poll(cls, context):
+        return not PHONEME_OT_Extract._running
 
     def execute(self, context):
         settings = context.scene.phoneme_settings
@@ -105,15 +576,177 @@ class PHONEME_OT_Extract(Operator):
             self.report({'ERROR'}, "Please select a valid audio file.")
             return {'CANCELLED'}
 
-        output_json = extract_phonemes_external(audio_path)
+        self._audio_path = os.path.abspath(audio_path)
+        self._cache = get_phoneme_cache(settings)
+        self._options = extraction_options(settings)
+        self._output_path = timings_output_path(audio_path, self._options)
+        model = transcriber_spec(settings)
+        begin_profiled_run(settings)
+
+        if fetch_cached_timings(self._cache, self._audio_path, self._output_path, self._options, model):
+            finish_profiled_run(settings, "Extract (cache hit)", "extract")
+            set_extract_status(context, "")
+            self.report({'INFO'}, f"Timings loaded from cache: {self._output_path}")
+            return {'FINISHED'}
+
+        # Start (or reuse) the worker without waiting for the model; the job is
+        # buffered on its stdin and picked up as soon as loading finishes.
+        try:
+            self._worker = whisper_worker.get_worker(PYTHON_EXE, WHISPER_SCRIPT, model, wait=False,
+                                                     threads=settings.cpu_threads)
+            self._job_id = self._worker.submit(self._audio_path, self._output_path, self._options)
+        except (OSError, whisper_worker.WorkerError) as e:
+            self.report({'ERROR'}, f"Failed to start Whisper: {e}")
+            return {'CANCELLED'}
+
+        PHONEME_OT_Extract._running = True
+        set_extract_status(context, "Waiting for Whisper worker", 0.0)
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.2, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            # The worker is busy inside Whisper; killing it is the only way to stop it.
+            # It is restarted on the next extraction.
+            whisper_worker.shutdown_worker(force=True)
+            return self._finish(context, {'WARNING'}, "Extraction cancelled.", {'CANCELLED'})
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            messages = self._worker.poll()
+        except whisper_worker.WorkerError as e:
+            return self._finish(context, {'ERROR'}, f"Whisper worker failed: {e}", {'CANCELLED'})
+
+        for message in messages:
+            if message.get("id") not in (None, self._job_id):
+                continue
+            if message.get("event") == "ready":
+                # The worker's model load, timed on its side
+                profiling.profiler.merge(message.get("profile"))
+            elif message.get("event") == "progress":
+                stage = message.get("stage")
+                percent = message.get("percent")
+                label = EXTRACT_STAGE_LABELS.get(stage, stage)
+                set_extract_status(context, f"{label} {percent}%" if percent is not None else label,
+                                   percent if stage == "transcribe" else None)
+            elif "ok" in message:
+                return self._job_done(context, message)
+
+        return {'PASS_THROUGH'}
+
+    def _job_done(self, context, message):
+        profiling.profiler.merge(message.get("profile"), message.get("trace_events"))
+        finish_profiled_run(context.scene.phoneme_settings, "Extract", "extract")
+        if not message.get("ok") or not os.path.exists(self._output_path):
+            print("Error running Whisper worker job:", message.get("error"))
+            return self._finish(context, {'ERROR'}, "Failed to extract timings. Check console.", {'CANCELLED'})
 
-        if output_json:
-            self.report({'INFO'}, f"Timings saved to: {output_json}")
+        if self._cache is not None:
+            try:
+                store_in_cache(self._cache, self._audio_path, self._output_path, self._options)
+            except (OSError, ValueError) as e:
+                print(f"Could not store timings in cache: {e}")
+        stats = message.get("transcriber_stats")
+        if stats:
+            print(f"Transcriber {stats['spec']}: {stats['realtime_factor']}x realtime "
+                  f"({stats['audio_s']}s audio in {stats['transcribe_s']}s)")
+        return self._finish(context, {'INFO'}, f"Timings saved to: {self._output_path}", {'FINISHED'})
+
+    def _finish(self, context, level, text, result):
+        context.window_manager.event_timer_remove(self._timer)
+        PHONEME_OT_Extract._running = False
+        if result == {'FINISHED'}:
+            set_extract_status(context, "", 100.0)
         else:
-            self.report({'ERROR'}, "Failed to extract timings. Check console.")
+            # Keep the reason visible in the panel, but give the status bar back.
+            set_extract_status(context, text)
+            if context.workspace:
+                context.workspace.status_text_set(None)
+        self.report(level, text)
+        return result
+
+
+class PHONEME_OT_ExtractFolder(Operator):
+    bl_idname = "wm.phoneme_extract_folder"
+    bl_label = "Batch Extract Folder"
+    bl_description = "Run every audio clip in a folder through Whisper in the background (press Esc to cancel)"
+
+    directory: StringProperty(subtype='DIR_PATH')
+
+    _running = False
+
+    @classmethod
+    def poll(cls, context):
+        return not PHONEME_OT_ExtractFolder._running
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        settings = context.scene.phoneme_settings
+        folder = bpy.path.abspath(self.directory)
+
+        if not folder or not os.path.isdir(folder):
+            self.report({'ERROR'}, "Please select a valid folder.")
             return {'CANCELLED'}
 
-        return {'FINISHED'}
+        self._cache = get_phoneme_cache(settings)
+        self._options = extraction_options(settings)
+        try:
+            self._process, self._report_path = start_batch_extraction(
+                folder, settings.batch_jobs, self._options, transcriber_spec(settings), settings.cpu_threads
+            )
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to start batch extraction: {e}")
+            return {'CANCELLED'}
+
+        PHONEME_OT_ExtractFolder._running = True
+        settings.batch_status = f"Batch extraction running in {folder}"
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(1.0, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._process.terminate()
+            self._process.wait()
+            return self._finish(context, {'WARNING'}, "Batch extraction cancelled.", {'CANCELLED'})
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        exit_code = self._process.poll()
+        if exit_code is None:
+            return {'PASS_THROUGH'}
+
+        if not os.path.exists(self._report_path):
+            return self._finish(context, {'ERROR'}, f"Batch extraction failed (exit code {exit_code}). "
+                                "Check console.", {'CANCELLED'})
+        try:
+            ok, failed = store_batch_in_cache(self._cache, self._report_path, self._options)
+        except (OSError, ValueError) as e:
+            return self._finish(context, {'ERROR'}, f"Could not read batch report: {e}", {'CANCELLED'})
+        if failed:
+            return self._finish(context, {'WARNING'}, f"Batch extraction: {ok} clips done, {failed} failed. "
+                                f"Report: {self._report_path}", {'FINISHED'})
+        return self._finish(context, {'INFO'}, f"Batch extraction: {ok} clips done. Report: {self._report_path}",
+                            {'FINISHED'})
+
+    def _finish(self, context, level, text, result):
+        context.window_manager.event_timer_remove(self._timer)
+        PHONEME_OT_ExtractFolder._running = False
+        context.scene.phoneme_settings.batch_status = text
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        self.report(level, text)
+        return result
 
 
 class PHONEME_OT_Animate(Operator):
@@ -121,6 +754,10 @@ class PHONEME_OT_Animate(Operator):
     bl_label = "Generate Lip Sync Animation"
 
     def execute(self, context):
+        with profiled_run(context.scene.phoneme_settings, "Generate Keyframes", "animate"):
+            return self._bake(context)
+
+    def _bake(self, context):
         settings = context.scene.phoneme_settings
         armature_name = settings.armature_name
         
@@ -130,111 +767,225 @@ class PHONEME_OT_Animate(Operator):
             self.report({'ERROR'}, f"Armature '{armature_name}' not found.")
             return {'CANCELLED'}
 
-        json_path = os.path.splitext(settings.audio_file)[0] + "_phonemes.json"
-        if not os.path.exists(json_path):
+        try:
+            timeline, is_partial = load_timeline_for_audio(settings.audio_file)
+        except FileNotFoundError:
             self.report({'ERROR'}, f"Viseme JSON file not found. Run extraction first.")
             return {'CANCELLED'}
-
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                viseme_data = json.load(f).get("phoneme_timings", [])
         except Exception as e:
             self.report({'ERROR'}, f"Failed to load viseme data: {e}")
             return {'CANCELLED'}
 
-        if not viseme_data:
+        if not len(timeline):
             self.report({'ERROR'}, "No viseme timings found.")
             return {'CANCELLED'}
+
+        try:
+            profile = rig_profiles.load_profile(settings.rig_profile)
+            profile.bind(armature)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Rig profile: {e}")
+            return {'CANCELLED'}
             
-        # 2. Setup Mode and Scene
+        # 2. Setup Scene
         if context.active_object != armature:
              bpy.ops.object.select_all(action='DESELECT')
              armature.select_set(True)
              context.view_layer.objects.active = armature
-        
-        # Switch to Pose Mode (REQUIRED for keyframing pose bones)
-        bpy.ops.object.mode_set(mode='POSE')
-        
-        # Clear existing animation data
-        if armature.animation_data and armature.animation_data.action:
-            bpy.data.actions.remove(armature.animation_data.action)
-        armature.animation_data_clear()
 
-        # --- CRITICAL FIX 1: Create a new Action for keyframes ---
-        armature.animation_data_create()
-        armature.animation_data.action = bpy.data.actions.new(name="LipSyncAction")
+        if armature.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        # The bake replaces the action a preview has set aside
+        preview.stop_preview(armature_name)
 
+        # 3. Bake all Viseme Poses in one pass (coarticulation blending lives in baking.py)
+        fps = baking.scene_fps(context.scene)
+        bake = baking.rebake_viseme_timeline if settings.incremental_bake else baking.bake_viseme_timeline
+        initial_rest_frame, final_end_frame, keyframe_count = bake(
+            armature, timeline, fps, profile.table, **bake_options(settings)
+        )
 
-        fps = context.scene.render.fps
-        start_time_sec = viseme_data[0]['start']
-        end_time_sec = viseme_data[-1]['end']
-        
         # Set frame range with a buffer
-        initial_rest_frame = max(1, int(start_time_sec * fps) - int(fps * 0.1)) 
-        final_end_frame = int(end_time_sec * fps) + int(fps * 0.5) 
-        
         context.scene.frame_start = initial_rest_frame
         context.scene.frame_end = final_end_frame
 
-        # 3. Apply Initial Rest Pose (Before dialogue starts)
-        pose_functions.apply_rest_pose(armature_name, initial_rest_frame)
-        
-        # 4. Apply Viseme Poses and Keyframes (Look-Ahead Logic)
-        for i, viseme_item in enumerate(viseme_data):
-            current_viseme_code = viseme_item['viseme']
-            start_sec = viseme_item['start']
-            end_sec = viseme_item['end']
-            
-            start_frame = int(start_sec * fps)
-            # Peak frame is slightly after the start (30ms for hold)
-            peak_frame = start_frame + max(1, int(fps * 0.03)) 
-            end_frame = int(end_sec * fps)
-
-            # Get the function for the CURRENT viseme
-            current_pose_func_name = VISEME_TO_FUNCTION.get(current_viseme_code)
-
-            # --- A. Apply Viseme Pose (Peak Frame) ---
-            if current_pose_func_name and hasattr(pose_functions, current_pose_func_name):
-                current_pose_func = getattr(pose_functions, current_pose_func_name)
-                
-                # Apply the current pose to define the peak of the sound.
-                current_pose_func(armature_name, peak_frame)
-
-            # --- B. Set Transition (End Frame) ---
-            
-            # CRITICAL FIX 2: We must have a function call that forces the transition 
-            # at the end_frame, even if it's the Rest Pose.
-            
-            if i + 1 < len(viseme_data):
-                # Look ahead: Use the NEXT viseme's pose at the CURRENT viseme's END frame
-                next_viseme_code = viseme_data[i+1]['viseme']
-                next_pose_func_name = VISEME_TO_FUNCTION.get(next_viseme_code)
-
-                if next_pose_func_name and hasattr(pose_functions, next_pose_func_name):
-                     next_pose_func = getattr(pose_functions, next_pose_func_name)
-                     
-                     # Apply the NEXT pose at the CURRENT viseme's END frame.
-                     next_pose_func(armature_name, end_frame)
-                else:
-                     # Fallback to Rest if the next viseme is unknown (Treating gaps as Rest)
-                     pose_functions.apply_rest_pose(armature_name, end_frame) 
+        # Force Pose Refresh after keyframing is complete
+        with profiling.stage("depsgraph_update"):
+            context.view_layer.update()
+        print(f"Baked {keyframe_count} keyframes on '{armature_name}'")
 
-            else:
-                # If this is the LAST viseme, transition back to the Rest Pose.
-                pose_functions.apply_rest_pose(armature_name, final_end_frame)
-        
-        # CRITICAL FIX 3: Force Pose Refresh after keyframing is complete
-        bpy.context.view_layer.update()
+        if is_partial:
+            self.report({'WARNING'}, f"Baked partial timings ({len(timeline)} phonemes); extraction still running.")
+            return {'FINISHED'}
 
-        # Return to Object Mode
-        bpy.ops.object.mode_set(mode='OBJECT')
         self.report({'INFO'}, f"Lip Sync Animation Generated on '{armature_name}'!")
         return {'FINISHED'}
 
+class PHONEME_OT_Preview(Operator):
+    bl_idname = "wm.phoneme_preview"
+    bl_label = "Live Preview"
+    bl_description = "Pose the armature from the timings during playback and scrubbing, without keyframes (toggle)"
+
+    def execute(self, context):
+        settings = context.scene.phoneme_settings
+        armature_name = settings.armature_name
+        if preview.stop_preview(armature_name):
+            self.report({'INFO'}, "Live preview stopped.")
+            return {'FINISHED'}
+
+        armature = bpy.data.objects.get(armature_name)
+        if not armature or armature.type != 'ARMATURE':
+            self.report({'ERROR'}, f"Armature '{armature_name}' not found.")
+            return {'CANCELLED'}
+
+        try:
+            profile = rig_profiles.load_profile(settings.rig_profile)
+            profile.bind(armature)
+            preview.start_preview(
+                armature, bpy.path.abspath(settings.audio_file), timings_path_for_audio, profile.table,
+                settings.coarticulation, scene=context.scene
+            )
+        except FileNotFoundError:
+            self.report({'ERROR'}, "Viseme JSON file not found. Run extraction first.")
+            return {'CANCELLED'}
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Live preview: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Live preview on '{armature_name}'; play or scrub the timeline.")
+        return {'FINISHED'}
+
+class PHONEME_OT_BakeEmotion(Operator):
+    bl_idname = "wm.phoneme_bake_emotion"
+    bl_label = "Bake Emotion Layer"
+    bl_description = "Key brow, eyelid and cheek expressions on their own NLA track, leaving the lip sync keys alone"
+
+    def execute(self, context):
+        with profiled_run(context.scene.phoneme_settings, "Bake Emotion Layer", "emotion"):
+            return self._bake(context)
+
+    def _bake(self, context):
+        settings = context.scene.phoneme_settings
+        armature = bpy.data.objects.get(settings.armature_name)
+        if not armature or armature.type != 'ARMATURE':
+            self.report({'ERROR'}, f"Armature '{settings.armature_name}' not found.")
+            return {'CANCELLED'}
+
+        try:
+            timeline, _ = load_timeline_for_audio(settings.audio_file)
+            profile = rig_profiles.load_profile(settings.rig_profile)
+            emotion_file = bpy.path.abspath(settings.emotion_file) if settings.emotion_file else ""
+            segments = emotion.emotion_segments_for(
+                timeline, emotion_file, settings.emotion, settings.emotion_intensity
+            )
+        except FileNotFoundError as e:
+            self.report({'ERROR'}, f"File not found: {os.path.basename(str(e))}")
+            return {'CANCELLED'}
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Failed to load emotion data: {e}")
+            return {'CANCELLED'}
+        if profile.expressions is None:
+            self.report({'ERROR'}, f"Rig profile '{profile.label}' has no expression table.")
+            return {'CANCELLED'}
+
+        keyframe_count = emotion.bake_emotion_layer(
+            armature, segments, baking.scene_fps(context.scene), profile.expressions, settings.emotion_blend,
+            settings.key_tolerance if settings.optimize_keys else None
+        )
+        with profiling.stage("depsgraph_update"):
+            context.view_layer.update()
+        if not keyframe_count:
+            self.report({'INFO'}, "Emotion layer cleared (neutral).")
+        else:
+            self.report({'INFO'}, f"Baked {len(segments)} emotion segments ({keyframe_count} keys).")
+        return {'FINISHED'}
+
+class PHONEME_OT_JobAdd(Operator):
+    bl_idname = "wm.phoneme_job_add"
+    bl_label = "Add Character"
+    bl_description = "Add a character, starting from the current audio file and armature"
+
+    def execute(self, context):
+        settings = context.scene.phoneme_settings
+        job = settings.jobs.add()
+        job.armature_name = settings.armature_name
+        job.audio_file = settings.audio_file
+        job.rig_profile = settings.rig_profile
+        settings.active_job_index = len(settings.jobs) - 1
+        return {'FINISHED'}
+
+class PHONEME_OT_JobRemove(Operator):
+    bl_idname = "wm.phoneme_job_remove"
+    bl_label = "Remove Character"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.phoneme_settings.jobs) > 0
+
+    def execute(self, context):
+        settings = context.scene.phoneme_settings
+        settings.jobs.remove(settings.active_job_index)
+        settings.active_job_index = min(settings.active_job_index, len(settings.jobs) - 1)
+        return {'FINISHED'}
+
+class PHONEME_OT_BakeAll(Operator):
+    bl_idname = "wm.phoneme_bake_all"
+    bl_label = "Bake All Characters"
+    bl_description = "Bake lip sync for every enabled character in the list in one pass"
+
+    def execute(self, context):
+        with profiled_run(context.scene.phoneme_settings, "Bake All Characters", "bake_all"):
+            return self._bake(context)
+
+    def _bake(self, context):
+        settings = context.scene.phoneme_settings
+        jobs = [job for job in settings.jobs if job.enabled]
+        if not jobs:
+            self.report({'ERROR'}, "No enabled characters in the list.")
+            return {'CANCELLED'}
+
+        if context.active_object and context.active_object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        batch_start = time.perf_counter()
+        results = bake_characters(jobs, baking.scene_fps(context.scene), bake_options(settings), settings.incremental_bake)
+        total = time.perf_counter() - batch_start
+
+        frames = []
+        for job, result in zip(jobs, results):
+            if result["ok"]:
+                job.status = f"{result['keyframes']} keys in {result['seconds']:.2f}s"
+                frames += [result["frame_start"], result["frame_end"]]
+            else:
+                job.status = f"Failed: {result['error']}"
+
+        if frames:
+            context.scene.frame_start = min(frames)
+            context.scene.frame_end = max(frames)
+        with profiling.stage("depsgraph_update"):
+            context.view_layer.update()
+
+        failed = sum(1 for result in results if not result["ok"])
+        baked = len(jobs) - failed
+        if failed:
+            self.report({'WARNING'}, f"Baked {baked} of {len(jobs)} characters; {failed} failed (see list).")
+        else:
+            self.report({'INFO'}, f"Baked {baked} characters in {total:.2f}s.")
+        return {'FINISHED'}
+
 # ------------------------------------------------------------------------
 # 4. PANEL / UI & REGISTRATION
 # ------------------------------------------------------------------------
 
+class PHONEME_UL_Jobs(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        row.label(text=item.armature_name or "(no armature)", icon='OUTLINER_OB_ARMATURE')
+        row.label(text=os.path.basename(item.audio_file) or "(no audio)", icon='SOUND')
+        if item.status:
+            row.label(text=item.status)
+
 class PHONEME_PT_MainPanel(Panel):
     bl_label = "Automatic Lip Sync"
     bl_idname = "PHONEME_PT_main_panel"
@@ -250,30 +1001,124 @@ class PHONEME_PT_MainPanel(Panel):
         box = layout.box()
         box.label(text="1. Audio and Extraction", icon='SOUND')
         box.prop(settings, "audio_file")
+        row = box.row(align=True)
+        row.prop(settings, "transcription_backend", text="")
+        row.prop(settings, "whisper_model", text="")
+        row = box.row(align=True)
+        row.prop(settings, "compute_type")
+        row.prop(settings, "cpu_threads", text="Threads")
+        box.prop(settings, "chunk_seconds")
+        box.prop(settings, "use_vad")
+        box.prop(settings, "timings_format")
         box.operator("wm.phoneme_extract", text="Run Whisper & Extract Timings")
+        if settings.extract_status:
+            col = box.column(align=True)
+            col.label(text=settings.extract_status, icon='TIME')
+            row = col.row()
+            row.enabled = False
+            row.prop(settings, "extract_progress", slider=True)
+        box.prop(settings, "use_cache")
+        if settings.use_cache:
+            box.prop(settings, "cache_dir")
+            box.prop(settings, "cache_max_mb")
+        row = box.row(align=True)
+        row.operator("wm.phoneme_extract_folder", text="Batch Extract Folder", icon='FILE_FOLDER')
+        row.prop(settings, "batch_jobs", text="Processes")
+        if settings.batch_status:
+            box.label(text=settings.batch_status, icon='INFO')
         
         # 2. Animation Settings
         box = layout.box()
         box.label(text="2. Animation Settings", icon='OUTLINER_OB_ARMATURE')
         box.prop(settings, "armature_name")
+        box.prop(settings, "rig_profile")
+        box.prop(settings, "coarticulation")
+        box.prop(settings, "incremental_bake")
+        box.prop(settings, "optimize_keys")
+        if settings.optimize_keys:
+            col = box.column(align=True)
+            col.prop(settings, "key_tolerance")
+            col.prop(settings, "max_keys_per_second")
         
         # 3. Generation
         box = layout.box()
         box.label(text="3. Generate Animation", icon='POSE_HLT')
-        box.operator("wm.phoneme_animate", text="Generate Keyframes")
+        row = box.row(align=True)
+        previewing = preview.is_previewing(settings.armature_name)
+        row.operator("wm.phoneme_preview", text="Stop Preview" if previewing else "Live Preview",
+                     icon='PAUSE' if previewing else 'PLAY', depress=previewing)
+        row.operator("wm.phoneme_animate", text="Generate Keyframes")
+        col = box.column(align=True)
+        col.prop(settings, "emotion_file")
+        if not settings.emotion_file:
+            row = col.row(align=True)
+            row.prop(settings, "emotion")
+            row.prop(settings, "emotion_intensity")
+        col.prop(settings, "emotion_blend")
+        box.operator("wm.phoneme_bake_emotion", icon='MONKEY')
+
+        # 4. Multi-character
+        box = layout.box()
+        box.label(text="4. Characters", icon='COMMUNITY')
+        row = box.row()
+        row.template_list("PHONEME_UL_Jobs", "", settings, "jobs", settings, "active_job_index", rows=3)
+        col = row.column(align=True)
+        col.operator("wm.phoneme_job_add", text="", icon='ADD')
+        col.operator("wm.phoneme_job_remove", text="", icon='REMOVE')
+        if 0 <= settings.active_job_index < len(settings.jobs):
+            job = settings.jobs[settings.active_job_index]
+            col = box.column(align=True)
+            col.prop(job, "armature_name")
+            col.prop(job, "audio_file")
+            col.prop(job, "frame_offset")
+            col.prop(job, "rig_profile")
+        box.operator("wm.phoneme_bake_all", icon='POSE_HLT')
+
+        # 5. Diagnostics
+        box = layout.box()
+        box.label(text="5. Diagnostics", icon='SORTTIME')
+        row = box.row(align=True)
+        row.prop(settings, "log_level", text="Log")
+        row.prop(settings, "profile_mode", text="Export")
+        if settings.profile_mode != 'OFF':
+            box.prop(settings, "profile_dir")
+        run = profiling.profiler.last_run
+        if run:
+            col = box.column(align=True)
+            col.label(text=f"{run['label']}: {run['total'] * 1000.0:.1f} ms", icon='TIME')
+            for name, entry in run["stages"].items():
+                col.label(text=profiling.format_stage(name, entry))
 
 
 def register():
+    bpy.utils.register_class(LipSyncJob)
     bpy.utils.register_class(PhonemeSettings)
     bpy.utils.register_class(PHONEME_OT_Extract)
+    bpy.utils.register_class(PHONEME_OT_ExtractFolder)
     bpy.utils.register_class(PHONEME_OT_Animate)
+    bpy.utils.register_class(PHONEME_OT_Preview)
+    bpy.utils.register_class(PHONEME_OT_BakeEmotion)
+    bpy.utils.register_class(PHONEME_OT_JobAdd)
+    bpy.utils.register_class(PHONEME_OT_JobRemove)
+    bpy.utils.register_class(PHONEME_OT_BakeAll)
+    bpy.utils.register_class(PHONEME_UL_Jobs)
     bpy.utils.register_class(PHONEME_PT_MainPanel)
     bpy.types.Scene.phoneme_settings = bpy.props.PointerProperty(type=PhonemeSettings)
 
 
 def unregister():
     bpy.utils.unregister_class(PhonemeSettings)
+    bpy.utils.unregister_class(LipSyncJob)
     bpy.utils.unregister_class(PHONEME_OT_Extract)
+    bpy.utils.unregister_class(PHONEME_OT_ExtractFolder)
     bpy.utils.unregister_class(PHONEME_OT_Animate)
+    bpy.utils.unregister_class(PHONEME_OT_Preview)
+    bpy.utils.unregister_class(PHONEME_OT_BakeEmotion)
+    bpy.utils.unregister_class(PHONEME_OT_JobAdd)
+    bpy.utils.unregister_class(PHONEME_OT_JobRemove)
+    bpy.utils.unregister_class(PHONEME_OT_BakeAll)
+    bpy.utils.unregister_class(PHONEME_UL_Jobs)
     bpy.utils.unregister_class(PHONEME_PT_MainPanel)
-    del bpy.types.Scene.phoneme_settings
\ No newline at end of file
+    del bpy.types.Scene.phoneme_settings
+    preview.stop_all_previews()
+    whisper_worker.shutdown_worker()
\ No newline at end of file
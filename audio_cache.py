@@ -0,0 +1,134 @@
+import os
+import subprocess
+
+import numpy as np
+
+from digests import audio_digest
+from vad import frame_levels
+
+
+# ------------------------------------------------------------------------
+# DECODED AUDIO CACHE (ffmpeg once per clip, memory-mapped afterwards)
+# ------------------------------------------------------------------------
+# Runs in the external Python next to open_AI_whisper.py. A clip is decoded
+# to 16 kHz mono float32 once; the samples and their RMS frame levels
+# (vad.frame_levels) are stored as .npy files named after the sha256 of the
+# audio bytes and memory-mapped on every later use. Transcription, VAD and
+# energy timing all read that same buffer, and re-runs, batch pool workers
+# and later pipeline stages skip ffmpeg entirely. Least recently used
+# entries are removed above max_bytes.
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blender_lipsync", "audio")
+SAMPLE_RATE = 16000
+SAMPLES_SUFFIX = ".pcm.npy"
+LEVELS_SUFFIX = ".rms.npy"
+
+def decode_audio(audio_path, sample_rate=SAMPLE_RATE):
+    """Decodes any ffmpeg-readable file to mono float32 at `sample_rate` (like whisper.load_audio)."""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", audio_path,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed to decode {audio_path}: {e.stderr.decode(errors='replace')}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+class DecodedAudio:
+    """A decoded clip: float32 `samples` at `sample_rate` and their RMS frame `levels` in dBFS."""
+
+    def __init__(self, samples, levels, sample_rate=SAMPLE_RATE, digest=None):
+        self.samples = samples
+        self.levels = levels
+        self.sample_rate = sample_rate
+        self.digest = digest
+
+    @property
+    def duration(self):
+        return len(self.samples) / float(self.sample_rate)
+
+
+def decode_clip(audio_path, sample_rate=SAMPLE_RATE):
+    """Uncached decode: the clip with freshly computed frame levels."""
+    samples = decode_audio(audio_path, sample_rate)
+    return DecodedAudio(samples, frame_levels(samples, sample_rate), sample_rate)
+
+
+class AudioCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=2048 * 1024 * 1024):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, audio_path, sample_rate=SAMPLE_RATE):
+        """Returns the DecodedAudio of `audio_path`, memory-mapped from the cache; decodes on a miss."""
+        digest = audio_digest(audio_path)
+        decoded = self.get(digest, sample_rate)
+        if decoded is not None:
+            self.hits += 1
+            return decoded
+
+        self.misses += 1
+        decoded = decode_clip(audio_path, sample_rate)
+        decoded.digest = digest
+        self.put(digest, decoded, sample_rate)
+        # Falls back to the decoded arrays if eviction already took the entry
+        return self.get(digest, sample_rate) or decoded
+
+    def get(self, digest, sample_rate=SAMPLE_RATE):
+        """The cached clip for `digest` (and marks it recently used), or None."""
+        samples_path = self._entry_path(digest, sample_rate, SAMPLES_SUFFIX)
+        levels_path = self._entry_path(digest, sample_rate, LEVELS_SUFFIX)
+        if not (os.path.exists(samples_path) and os.path.exists(levels_path)):
+            return None
+        try:
+            samples = np.load(samples_path, mmap_mode='r')
+            levels = np.load(levels_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        os.utime(samples_path, None)
+        return DecodedAudio(samples, levels, sample_rate, digest)
+
+    def put(self, digest, decoded, sample_rate=SAMPLE_RATE):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Levels first: an entry only counts once its samples file exists
+        for suffix, array in ((LEVELS_SUFFIX, decoded.levels), (SAMPLES_SUFFIX, decoded.samples)):
+            path = self._entry_path(digest, sample_rate, suffix)
+            # Pool workers may decode the same clip; each writes its own temporary file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.asarray(array))
+            os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drops least recently used clips until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith((SAMPLES_SUFFIX, LEVELS_SUFFIX)):
+                    stat = entry.stat()
+                    if entry.name.endswith(SAMPLES_SUFFIX):
+                        entries.append((stat.st_mtime, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        for _mtime, samples_path in entries:
+            if total <= self.max_bytes:
+                break
+            levels_path = samples_path[:-len(SAMPLES_SUFFIX)] + LEVELS_SUFFIX
+            for path in (samples_path, levels_path):
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _entry_path(self, digest, sample_rate, suffix):
+        return os.path.join(self.cache_dir, f"{digest}_{sample_rate}{suffix}")
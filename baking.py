@@ -0,0 +1,510 @@
+import hashlib
+import json
+
+import bpy
+import numpy as np
+
+from . import coarticulation as coarticulation_stage
+from . import pose_table
+from . import profiling
+from .timeline_io import VisemeTimeline
+
+
+def scene_fps(scene) -> float:
+    """Playback frame rate of `scene`: render.fps / render.fps_base (29.97 for NTSC, not 30)."""
+    return scene.render.fps / scene.render.fps_base
+
+
+# ------------------------------------------------------------------------
+# BULK F-CURVE WRITER
+# ------------------------------------------------------------------------
+
+def write_fcurves(action, frames, values, bone_names, tolerance=None) -> int:
+    """
+    Writes pose samples into a fresh `action` with one keyframe_points.add() and
+    one foreach_set("co") per F-curve.
+
+    `frames` is (n_keys,), `values` is (n_keys, n_bones, 10) in pose_table layout
+    and `bone_names` names the bones along axis 1. With a `tolerance`, each curve
+    is decimated first (see decimate_curve). Returns the keyframe count.
+    """
+    if len(frames) == 0:
+        return 0
+
+    with profiling.stage("fcurve_write"):
+        written = 0
+        keep_masks = {}
+        for b, bone_name in enumerate(bone_names):
+            for data_path, channel_slice in pose_table.CHANNEL_SLICES.items():
+                fcurve_path = f'pose.bones["{bone_name}"].{data_path}'
+                for index, channel in enumerate(range(channel_slice.start, channel_slice.stop)):
+                    curve_values = values[:, b, channel]
+                    if tolerance is None:
+                        co = np.column_stack((frames, curve_values)).astype(np.float32)
+                    else:
+                        # Bones that share a pose column have identical curves; decimate those once.
+                        signature = curve_values.tobytes()
+                        keep = keep_masks.get(signature)
+                        if keep is None:
+                            keep = keep_masks[signature] = decimate_curve(frames, curve_values, tolerance)
+                        co = np.column_stack((frames[keep], curve_values[keep])).astype(np.float32)
+
+                    fcurve = action.fcurves.new(fcurve_path, index=index, action_group=bone_name)
+                    fcurve.keyframe_points.add(len(co))
+                    fcurve.keyframe_points.foreach_set("co", co.ravel())
+                    fcurve.update()
+                    written += len(co)
+
+    return written
+
+
+# ------------------------------------------------------------------------
+# KEY OPTIMIZATION (Merge repeats, cap density, drop redundant keys)
+# ------------------------------------------------------------------------
+
+def merge_repeated_keys(frames, rows):
+    """
+    Drops the keys inside runs of the same pose row ("sss" -> ChSh, ChSh, ChSh),
+    keeping the first and last key of each run so the hold and the following
+    transition keep their timing.
+    """
+    if len(rows) < 3:
+        return frames, rows
+
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:-1] = ~((rows[1:-1] == rows[:-2]) & (rows[1:-1] == rows[2:]))
+    return frames[keep], rows[keep]
+
+
+def cap_key_density(frames, rows, fps, max_keys_per_second):
+    """
+    Keeps at most about `max_keys_per_second` keys per second of animation by
+    keeping the last key of every (fps / max_keys_per_second)-frame bin.
+    """
+    if not max_keys_per_second or len(frames) < 3:
+        return frames, rows
+
+    spacing = fps / max_keys_per_second
+    if spacing <= 1.0:
+        return frames, rows  # frames are already unique integers
+
+    bins = np.floor((frames - frames[0]) / spacing).astype(np.int64)
+    keep = np.append(bins[1:] != bins[:-1], True)
+    keep[0] = True  # the initial rest key anchors the dialogue start
+    return frames[keep], rows[keep]
+
+
+def decimate_curve(frames, values, tolerance):
+    """
+    Returns a keep mask that drops the keys of one F-curve that lie within
+    `tolerance` of the straight line between the surrounding kept keys.
+    Every dropped key is checked against the original samples, so the error
+    never builds up past `tolerance`. The first and last keys are always kept.
+    """
+    count = len(frames)
+    keep = np.ones(count, dtype=bool)
+    if count <= 2:
+        return keep
+
+    x = frames.astype(np.float64)
+    v = values.astype(np.float64)
+
+    # Interior keys of flat runs are exactly redundant; drop them in one go.
+    keep[1:-1] = ~((v[1:-1] == v[:-2]) & (v[1:-1] == v[2:]))
+
+    while True:
+        kept = np.flatnonzero(keep)
+        if len(kept) <= 2:
+            break
+        left, mid, right = kept[:-2], kept[1:-1], kept[2:]
+        candidate = np.abs(v[mid] - _lerp(x, v, left, right, x[mid])) <= tolerance
+        if not candidate.any():
+            break
+
+        # Drop every other key of a run of candidates, so no two neighbours go at once.
+        positions = np.arange(len(candidate))
+        run_start = np.maximum.accumulate(np.where(candidate & ~np.append(False, candidate[:-1]), positions, 0))
+        dropped = mid[candidate & ((positions - run_start) % 2 == 0)]
+
+        trial = keep.copy()
+        trial[dropped] = False
+        trial_kept = np.flatnonzero(trial)
+
+        # Error of every original sample against the trial curve
+        segment = np.minimum(np.cumsum(trial) - 1, len(trial_kept) - 2)
+        error = np.abs(v - _lerp(x, v, trial_kept[segment], trial_kept[segment + 1], x))
+        bad_segment = np.zeros(len(trial_kept) - 1, dtype=bool)
+        bad_segment[segment[error > tolerance]] = True
+
+        accepted = dropped[~bad_segment[segment[dropped]]]
+        if len(accepted) == 0:
+            break
+        keep[accepted] = False
+
+    return keep
+
+
+def _lerp(x, v, left, right, at):
+    t = (at - x[left]) / (x[right] - x[left])
+    return v[left] + (v[right] - v[left]) * t
+
+
+# ------------------------------------------------------------------------
+# TIMELINE BAKE
+# ------------------------------------------------------------------------
+
+def get_frame_range(timeline, fps):
+    """Returns (initial_rest_frame, final_end_frame) with a buffer around the dialogue."""
+    start_time_sec = timeline.starts[0]
+    end_time_sec = timeline.ends[-1]
+
+    initial_rest_frame = max(1, int(start_time_sec * fps) - int(fps * 0.1))
+    final_end_frame = int(end_time_sec * fps) + int(fps * 0.5)
+    return initial_rest_frame, final_end_frame
+
+
+def viseme_rows(timeline, table):
+    """Pose table row for every timeline entry (-1 where the table has no such viseme)."""
+    lookup = np.array([table.viseme_to_index.get(name, -1) for name in timeline.viseme_names], dtype=np.intp)
+    return lookup[timeline.viseme_codes]
+
+
+def build_viseme_keys(timeline, fps, table):
+    """
+    Returns (frames, pose_rows): the key schedule for the whole timeline as
+    frame numbers and pose table rows, using the peak + look-ahead layout.
+    """
+    initial_rest_frame, final_end_frame = get_frame_range(timeline, fps)
+    rest = table.rest_index
+    count = len(timeline)
+    rows = viseme_rows(timeline, table)
+
+    start_frames = (timeline.starts * fps).astype(np.int64)
+    # Peak frame is slightly after the start (30ms for hold)
+    peak_frames = start_frames + max(1, int(fps * 0.03))
+    end_frames = (timeline.ends * fps).astype(np.int64)
+
+    # Keys in insertion order: initial rest, then (peak, transition) per viseme.
+    frames = np.empty(2 * count + 1, dtype=np.int64)
+    pose_rows = np.empty(2 * count + 1, dtype=np.intp)
+    valid = np.ones(2 * count + 1, dtype=bool)
+
+    # Initial Rest Pose (Before dialogue starts)
+    frames[0] = initial_rest_frame
+    pose_rows[0] = rest
+
+    # --- A. Viseme Pose (Peak Frame), skipped for unknown visemes ---
+    frames[1::2] = peak_frames
+    pose_rows[1::2] = rows
+    valid[1::2] = rows >= 0
+
+    # --- B. Transition (End Frame) ---
+    # Look ahead: the NEXT viseme's pose at the CURRENT viseme's END frame,
+    # falling back to Rest if the next viseme is unknown.
+    frames[2::2] = end_frames
+    pose_rows[2:-1:2] = np.where(rows[1:] >= 0, rows[1:], rest)
+    # The LAST viseme transitions back to the Rest Pose.
+    frames[-1] = final_end_frame
+    pose_rows[-1] = rest
+
+    return _last_key_per_frame(frames[valid], pose_rows[valid])
+
+
+def build_key_values(timeline, fps, table, bone_indices, optimize=False, max_keys_per_second=0,
+                     coarticulation=0.0):
+    """
+    Returns (frames, rows, column_values): the key schedule and the values of
+    every key as `column_values[rows]`, (n, n_bones, 10) for the bones
+    `bone_indices`. Without `coarticulation` the values are the table poses;
+    with it (the spread in seconds), each key holds the blend of the
+    neighbouring visemes at its frame and `rows` simply indexes the keys.
+    """
+    frames, rows = build_viseme_keys(timeline, fps, table)
+    if not coarticulation:
+        if optimize:
+            frames, rows = merge_repeated_keys(frames, rows)
+            frames, rows = cap_key_density(frames, rows, fps, max_keys_per_second)
+        return frames, rows, table.poses[:, bone_indices]
+
+    # Blended keys rarely repeat exactly; decimation removes the flat ones.
+    keys = np.arange(len(frames))
+    if optimize:
+        frames, keys = cap_key_density(frames, keys, fps, max_keys_per_second)
+    values = coarticulation_stage.coarticulated_values(timeline, frames, fps, table, bone_indices, coarticulation)
+    return frames, np.arange(len(frames)), values
+
+
+def bake_viseme_timeline(armature, timeline, fps, table=None, optimize=False, key_tolerance=0.001,
+                         max_keys_per_second=0, frame_offset=0, action_name="LipSyncAction", coarticulation=0.0):
+    """
+    Bakes a timeline_io.VisemeTimeline onto a fresh `action_name` action on
+    `armature`, shifted by `frame_offset` frames.
+    With `optimize`, repeated visemes are merged, the key density is capped at
+    `max_keys_per_second` (0 = no cap) and keys within `key_tolerance` of the
+    interpolated curve are dropped. `coarticulation` > 0 blends neighbouring
+    visemes over that many seconds (coarticulation.py) instead of keying the
+    next viseme's pose at each end frame.
+    Returns (initial_rest_frame, final_end_frame, keyframe_count).
+    """
+    table = table or pose_table.load_pose_table()
+
+    # Replace the existing action; NLA tracks (the emotion layer) stay
+    animation_data = armature.animation_data or armature.animation_data_create()
+    if animation_data.action:
+        bpy.data.actions.remove(animation_data.action)
+    action = bpy.data.actions.new(name=action_name)
+    animation_data.action = action
+
+    bone_indices, bone_names = table.resolve_bones(armature)
+    initial_rest_frame, final_end_frame = get_frame_range(timeline, fps)
+    with profiling.stage("pose_eval", len(timeline)):
+        frames, rows, column_values = build_key_values(
+            timeline, fps, table, bone_indices, optimize, max_keys_per_second, coarticulation
+        )
+    keyframe_count = write_fcurves(
+        action, frames + frame_offset, column_values[rows], bone_names, key_tolerance if optimize else None
+    )
+
+    params = bake_params(fps, table, bone_names, optimize, key_tolerance, max_keys_per_second, frame_offset,
+                         coarticulation)
+    store_bake_record(action, timeline, params)
+    return initial_rest_frame + frame_offset, final_end_frame + frame_offset, keyframe_count
+
+
+# ------------------------------------------------------------------------
+# INCREMENTAL RE-BAKE (Only re-key the frames whose visemes changed)
+# ------------------------------------------------------------------------
+# The timeline and settings of the last bake are kept as a custom property on
+# the action. A re-bake diffs the new timeline against it and replaces only
+# the keys inside the changed frame span, so keys edited by hand elsewhere stay.
+
+BAKE_RECORD_KEY = "lipsync_bake"
+
+
+def bake_params(fps, table, bone_names, optimize, key_tolerance, max_keys_per_second, frame_offset=0,
+                coarticulation=0.0):
+    """Everything besides the timeline that changes the baked keys."""
+    table_hash = hashlib.sha1(table.poses.tobytes())
+    table_hash.update(json.dumps([table.viseme_names, table.bone_names]).encode())
+    if coarticulation:
+        table_hash.update(table.dominance.tobytes())
+    return {
+        "fps": fps,
+        "table": table_hash.hexdigest(),
+        "bones": list(bone_names),
+        "optimize": bool(optimize),
+        "key_tolerance": key_tolerance if optimize else None,
+        "max_keys_per_second": max_keys_per_second if optimize else 0,
+        "frame_offset": frame_offset,
+        "coarticulation": coarticulation,
+    }
+
+
+def store_bake_record(action, timeline, params):
+    action[BAKE_RECORD_KEY] = {
+        "starts": timeline.starts.tolist(),
+        "ends": timeline.ends.tolist(),
+        "visemes": np.asarray(timeline.viseme_codes, dtype=np.int32).tolist(),
+        "viseme_names": json.dumps(timeline.viseme_names),
+        "params": json.dumps(params),
+    }
+
+
+def load_bake_record(action):
+    """Returns (VisemeTimeline, params) of the last bake on `action`, or None."""
+    record = action.get(BAKE_RECORD_KEY) if action else None
+    if record is None:
+        return None
+    try:
+        timeline = VisemeTimeline(
+            np.asarray(record["starts"], dtype=np.float64),
+            np.asarray(record["ends"], dtype=np.float64),
+            np.asarray(record["visemes"], dtype=np.int64),
+            json.loads(record["viseme_names"]),
+        )
+        return timeline, json.loads(record["params"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def changed_entry_range(old, new):
+    """
+    Returns (prefix, suffix): the number of leading and trailing entries the two
+    timelines share. Entries old[prefix:len(old) - suffix] became new[prefix:len(new) - suffix].
+    """
+    old_names = np.array(old.viseme_names, dtype=object)[old.viseme_codes] if len(old) else np.empty(0, object)
+    new_names = np.array(new.viseme_names, dtype=object)[new.viseme_codes] if len(new) else np.empty(0, object)
+
+    def same(old_index, new_index):
+        return (np.isclose(old.starts[old_index], new.starts[new_index], rtol=0, atol=1e-6)
+                & np.isclose(old.ends[old_index], new.ends[new_index], rtol=0, atol=1e-6)
+                & (old_names[old_index] == new_names[new_index]))
+
+    shared = min(len(old), len(new))
+    head = same(np.arange(shared), np.arange(shared))
+    prefix = int(np.argmin(head)) if not head.all() else shared
+
+    tail_count = shared - prefix
+    tail = same(np.arange(len(old) - 1, len(old) - 1 - tail_count, -1),
+                np.arange(len(new) - 1, len(new) - 1 - tail_count, -1))
+    suffix = int(np.argmin(tail)) if not tail.all() else tail_count
+    return prefix, suffix
+
+
+def affected_frame_span(old, new, fps, prefix, suffix):
+    """
+    Returns (first_frame, last_frame) holding every key that differs between the
+    two bakes: the changed entries' peak and end keys plus the look-ahead key of
+    the entry before them. Open ends are +-inf.
+    """
+    peak_offset = max(1, int(fps * 0.03))
+    frames = []
+    if prefix > 0:
+        frames.append([int(new.ends[prefix - 1] * fps)])
+    for timeline in (old, new):
+        changed = slice(prefix, len(timeline) - suffix)
+        frames.append((timeline.starts[changed] * fps).astype(np.int64) + peak_offset)
+        frames.append((timeline.ends[changed] * fps).astype(np.int64))
+    frames = np.concatenate(frames)
+
+    first_frame = -np.inf if prefix == 0 else int(frames.min())
+    last_frame = np.inf if suffix == 0 else int(frames.max())
+    return first_frame, last_frame
+
+
+def rebake_viseme_timeline(armature, timeline, fps, table=None, optimize=False, key_tolerance=0.001,
+                           max_keys_per_second=0, frame_offset=0, action_name="LipSyncAction", coarticulation=0.0):
+    """
+    Re-keys only the frame span where `timeline` differs from the last bake on
+    the armature's action. Falls back to bake_viseme_timeline when there is no
+    usable record (first bake, other settings or pose table, everything changed).
+    Returns (initial_rest_frame, final_end_frame, keyframe_count).
+    """
+    table = table or pose_table.load_pose_table()
+    action = armature.animation_data.action if armature.animation_data else None
+    bone_indices, bone_names = table.resolve_bones(armature)
+    params = bake_params(fps, table, bone_names, optimize, key_tolerance, max_keys_per_second, frame_offset,
+                         coarticulation)
+
+    def full_bake():
+        return bake_viseme_timeline(armature, timeline, fps, table, optimize, key_tolerance,
+                                    max_keys_per_second, frame_offset, action_name, coarticulation)
+
+    record = load_bake_record(action)
+    if record is None or record[1] != params or not len(timeline):
+        return full_bake()
+
+    old_timeline = record[0]
+    prefix, suffix = changed_entry_range(old_timeline, timeline)
+    initial_rest_frame, final_end_frame = get_frame_range(timeline, fps)
+    initial_rest_frame += frame_offset
+    final_end_frame += frame_offset
+    if prefix == len(old_timeline) == len(timeline):
+        profiling.log.info("Timeline unchanged since the last bake; nothing to re-key")
+        return initial_rest_frame, final_end_frame, 0
+    if coarticulation:
+        # Blended keys also change within reach of the edited entries
+        prefix = max(prefix - coarticulation_stage.NEIGHBOURS, 0)
+        suffix = max(suffix - coarticulation_stage.NEIGHBOURS, 0)
+    if prefix == 0 and suffix == 0:
+        return full_bake()
+
+    first_frame, last_frame = affected_frame_span(old_timeline, timeline, fps, prefix, suffix)
+    first_frame += frame_offset
+    last_frame += frame_offset
+    with profiling.stage("pose_eval", len(timeline)):
+        frames, rows = build_viseme_keys(timeline, fps, table)
+        if optimize:
+            frames, rows = cap_key_density(frames, rows, fps, max_keys_per_second)
+        columns = table.poses
+        if coarticulation:
+            columns = coarticulation_stage.coarticulated_values(
+                timeline, frames, fps, table, np.arange(len(table.bone_names)), coarticulation
+            )
+            rows = np.arange(len(frames))
+    frames = frames + frame_offset
+
+    keyframe_count = 0
+    tolerance = key_tolerance if optimize else None
+    windows = {}
+    with profiling.stage("fcurve_write"):
+        for bone_index, bone_name in zip(bone_indices, bone_names):
+            for data_path, channel_slice in pose_table.CHANNEL_SLICES.items():
+                fcurve_path = f'pose.bones["{bone_name}"].{data_path}'
+                for index, channel in enumerate(range(channel_slice.start, channel_slice.stop)):
+                    fcurve = action.fcurves.find(fcurve_path, index=index)
+                    if fcurve is None:
+                        fcurve = action.fcurves.new(fcurve_path, index=index, action_group=bone_name)
+                    keyframe_count += _rewrite_span(
+                        fcurve, first_frame, last_frame, frames, rows, columns[:, bone_index, channel],
+                        tolerance, windows
+                    )
+
+    store_bake_record(action, timeline, params)
+    changed_entries = max(len(old_timeline), len(timeline)) - prefix - suffix
+    profiling.log.info("Re-keyed frames %s-%s (%s changed entries, %s keyframes)", first_frame, last_frame,
+                       changed_entries, keyframe_count)
+    return initial_rest_frame, final_end_frame, keyframe_count
+
+
+def _rewrite_span(fcurve, first_frame, last_frame, frames, rows, column, tolerance, windows):
+    """
+    Replaces the keys of `fcurve` in [first_frame, last_frame] with the schedule
+    keys between the nearest kept keys on either side. `column` holds the curve's
+    value for every pose row and `windows` caches schedule slices across curves.
+    Returns the keys inserted.
+    """
+    points = fcurve.keyframe_points
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    existing_frames, existing_values = co[0::2], co[1::2]
+
+    inside = np.flatnonzero((existing_frames >= first_frame) & (existing_frames <= last_frame))
+    for i in inside[::-1]:
+        points.remove(points[int(i)], fast=True)
+
+    # Keys a decimated bake dropped next to the span may be needed again, so the
+    # span reaches out to the neighbouring keys that stay.
+    before = existing_frames[:inside[0]] if len(inside) else existing_frames[existing_frames < first_frame]
+    after = existing_frames[inside[-1] + 1:] if len(inside) else existing_frames[existing_frames > last_frame]
+    head = [(float(before[-1]), float(existing_values[len(before) - 1]))] if len(before) else []
+    tail = [(float(after[0]), float(existing_values[len(existing_frames) - len(after)]))] if len(after) else []
+    low = head[0][0] if head else -np.inf
+    high = tail[0][0] if tail else np.inf
+
+    window = windows.get((low, high))
+    if window is None:
+        selected = np.flatnonzero((frames > low) & (frames < high))
+        window = windows[(low, high)] = (selected, np.unique(rows[selected]))
+    selected, window_rows = window
+
+    if tolerance is not None and (head or tail) and len(window_rows):
+        # A curve that stays within tolerance of its anchors across the window needs no keys.
+        level = column[window_rows]
+        if all(np.abs(level - value).max() <= tolerance for _, value in head + tail):
+            selected = selected[:0]
+    new_frames, new_values = frames[selected], column[rows[selected]]
+
+    if tolerance is not None and len(new_frames):
+        head_co = np.array(head, dtype=np.float64).reshape(-1, 2)
+        tail_co = np.array(tail, dtype=np.float64).reshape(-1, 2)
+        keep = decimate_curve(
+            np.concatenate((head_co[:, 0], new_frames, tail_co[:, 0])),
+            np.concatenate((head_co[:, 1], new_values, tail_co[:, 1])),
+            tolerance,
+        )[len(head):len(head) + len(new_frames)]
+        new_frames, new_values = new_frames[keep], new_values[keep]
+
+    for frame, value in zip(new_frames.tolist(), new_values.tolist()):
+        points.insert(frame, value, options={'FAST'})
+    fcurve.update()
+    return len(new_frames)
+
+
+def _last_key_per_frame(frames, rows):
+    # Later keys on the same frame replace earlier ones, like keyframe_insert does.
+    order = np.argsort(frames, kind='stable')
+    frames = frames[order]
+    rows = rows[order]
+    keep = np.append(frames[1:] != frames[:-1], True)
+    return frames[keep], rows[keep]
@@ -0,0 +1,347 @@
+"""
+Scaling benchmark for the post-transcription pipeline and the bake path.
+
+Runs without Blender or Whisper: word timings are synthetic, G2P is a
+deterministic stand-in and `bpy` is replaced by fake_bpy, which counts the
+operator calls, depsgraph updates and keyframe writes each stage makes.
+
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 100000 --out bench.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import types
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+ADDON_PACKAGE = "lipsync_addon"
+
+sys.path.insert(0, BENCH_DIR)
+import fake_bpy  # noqa: E402
+
+fake_bpy.install()
+# open_AI_whisper.py runs as a plain script next to its helpers in the external Python
+sys.path.insert(0, REPO_DIR)
+import open_AI_whisper  # noqa: E402
+import forced_align  # noqa: E402
+from g2p_cache import CachedG2p  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+ARMATURE_NAME = "BenchArmature"
+
+# A few ARPAbet spellings, enough to hit every viseme in phoneme_map.py
+_PHONEME_POOL = [
+    "AA1", "AE1", "AH0", "AO1", "AW1", "AY1", "B", "CH", "D", "DH", "EH1", "ER0", "EY1", "F", "G",
+    "HH", "IH1", "IY1", "JH", "K", "L", "M", "N", "NG", "OW1", "OY1", "P", "R", "S", "SH", "T", "TH",
+    "UH1", "UW1", "V", "W", "Y", "Z", "ZH",
+]
+
+
+def load_addon():
+    """Imports the repo as a package so the addon's relative imports resolve."""
+    spec = importlib.util.spec_from_file_location(
+        ADDON_PACKAGE, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_PACKAGE] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+
+addon = load_addon()
+# The legacy per-viseme functions are not imported by the addon itself
+importlib.import_module(ADDON_PACKAGE + ".pose_functions")
+# Only the fields PHONEME_OT_Animate reads; bench_bake fills them in.
+fake_bpy.context.scene.phoneme_settings = type("PhonemeSettings", (), {})()
+
+
+class FakeG2p:
+    """Deterministic word -> phonemes, 1 to 6 phonemes depending on the word."""
+
+    def __call__(self, word):
+        rng = random.Random(word)
+        return [rng.choice(_PHONEME_POOL) for _ in range(rng.randint(1, 6))]
+
+
+def synthetic_words(count, vocabulary=5000, seed=0):
+    """(word, start, end) tuples with speech-like durations and occasional pauses."""
+    rng = random.Random(seed)
+    words = []
+    t = 0.25
+    for _ in range(count):
+        duration = rng.uniform(0.12, 0.6)
+        words.append((f"word{rng.randrange(vocabulary)}", round(t, 3), round(t + duration, 3)))
+        t += duration + (rng.uniform(0.1, 0.6) if rng.random() < 0.15 else rng.uniform(0.0, 0.04))
+    return words
+
+
+def timed(func, *args, **kwargs):
+    fake_bpy.reset_counters()
+    # The pipeline prints progress; keep stdout for the JSON report.
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    return result, seconds, dict(fake_bpy.CALLS)
+
+
+def stage(seconds, items, calls=None, **extra):
+    entry = {"seconds": round(seconds, 6), "items": items,
+             "items_per_second": round(items / seconds, 1) if seconds > 0 else None}
+    if calls is not None:
+        entry["calls"] = calls
+    entry.update(extra)
+    return entry
+
+
+def bench_pipeline(size, work_dir):
+    """word timings -> G2P -> columnar timeline -> viseme records -> JSON / .npz round trip."""
+    words = synthetic_words(size)
+    g2p = CachedG2p(store_path=None, g2p=FakeG2p())
+    results = {}
+
+    timeline, seconds, _ = timed(open_AI_whisper.build_phoneme_timings, words, g2p)
+    results["build_phoneme_timings"] = stage(seconds, len(words), phonemes=len(timeline), g2p=g2p.stats())
+
+    records, seconds, _ = timed(timeline.to_records)
+    results["timeline_to_records"] = stage(seconds, len(records))
+
+    _, seconds, _ = timed(open_AI_whisper.VisemeTimeline.from_records, records)
+    results["timeline_from_records"] = stage(seconds, len(records))
+
+    base = os.path.join(work_dir, f"bench_{size}_phonemes")
+    for output_format in ("json", "npz"):
+        path, seconds, _ = timed(open_AI_whisper.write_timings, base + ".json", timeline, {}, output_format)
+        written = stage(seconds, len(timeline), bytes=os.path.getsize(path))
+        _, seconds, _ = timed(addon.timeline_io.load_timeline, path)
+        results[f"write_{output_format}"] = written
+        results[f"load_{output_format}"] = stage(seconds, len(timeline))
+
+    return timeline, base, results
+
+
+def bench_bake(timeline, audio_base):
+    profile = addon.rig_profiles.load_profile("mixamo")
+    table = profile.table
+    results = {}
+
+    armature = fake_bpy.new_armature(ARMATURE_NAME, table.bone_names + profile.expressions.bone_names)
+    (_, _, keyframes), seconds, calls = timed(
+        addon.baking.bake_viseme_timeline, armature, timeline, 24, table
+    )
+    results["bake_viseme_timeline"] = stage(seconds, len(timeline), calls, keyframes=keyframes)
+
+    (_, _, keyframes), seconds, calls = timed(
+        addon.baking.bake_viseme_timeline, armature, timeline, 24, table, optimize=True
+    )
+    results["bake_viseme_timeline_optimized"] = stage(seconds, len(timeline), calls, keyframes=keyframes)
+
+    # One viseme edited in the middle of the take, re-baked incrementally
+    codes = timeline.viseme_codes.copy()
+    middle = len(codes) // 2
+    codes[middle] = (codes[middle] + 1) % len(timeline.viseme_names)
+    edited = addon.timeline_io.VisemeTimeline(timeline.starts, timeline.ends, codes, timeline.viseme_names)
+    (_, _, keyframes), seconds, calls = timed(
+        addon.baking.rebake_viseme_timeline, armature, edited, 24, table, optimize=True
+    )
+    results["rebake_one_edit"] = stage(seconds, 1, calls, keyframes=keyframes)
+
+    # Dominance-blended keys instead of look-ahead poses, full bake and one edit
+    (_, _, keyframes), seconds, calls = timed(
+        addon.baking.bake_viseme_timeline, armature, timeline, 24, table, optimize=True, coarticulation=0.04
+    )
+    results["bake_coarticulated"] = stage(seconds, len(timeline), calls, keyframes=keyframes)
+    (_, _, keyframes), seconds, calls = timed(
+        addon.baking.rebake_viseme_timeline, armature, edited, 24, table, optimize=True, coarticulation=0.04
+    )
+    results["rebake_coarticulated_one_edit"] = stage(seconds, 1, calls, keyframes=keyframes)
+
+    # Full operator path: timing file lookup, scene setup, bake and refresh.
+    settings = fake_bpy.context.scene.phoneme_settings
+    settings.audio_file = audio_base[:-len("_phonemes")] + ".wav"
+    settings.armature_name = ARMATURE_NAME
+    settings.rig_profile = "mixamo"
+    settings.incremental_bake = False
+    settings.optimize_keys = True
+    settings.key_tolerance = 0.001
+    settings.max_keys_per_second = 0
+    settings.coarticulation = 0.04
+    settings.log_level = "WARNING"
+    settings.profile_mode = "OFF"
+    settings.profile_dir = ""
+    fake_bpy.view_layer.objects.active = None
+    operator = addon.PHONEME_OT_Animate()
+    status, seconds, calls = timed(operator.execute, fake_bpy.context)
+    results["animate_operator"] = stage(seconds, len(timeline), calls, status=sorted(status),
+                                        stages=addon.profiling.profiler.last_run["stages"])
+
+    # Live preview: frame handler cost per frame across the whole take, no keys written
+    addon.PHONEME_OT_Preview().execute(fake_bpy.context)
+    scene = fake_bpy.context.scene
+    frames = np.linspace(timeline.starts[0] * 24, timeline.ends[-1] * 24, 2000).astype(int)
+
+    def play():
+        for frame in frames:
+            scene.frame_current = int(frame)
+            addon.preview.preview_frame_handler(scene)
+
+    _, seconds, calls = timed(play)
+    results["preview_frame_handler"] = stage(seconds, len(frames), calls)
+    addon.preview.stop_preview(ARMATURE_NAME)
+
+    # Emotion layer: one labelled segment per ~5 s of dialogue
+    names = [name for name in profile.expressions.viseme_names if name != "Neutral"]
+    bounds = np.arange(timeline.starts[0], timeline.ends[-1], 5.0)
+    segments = [{"start": float(start), "end": float(start + 4.0), "emotion": names[i % len(names)],
+                 "intensity": 0.8} for i, start in enumerate(bounds)]
+    keyframes, seconds, calls = timed(
+        addon.emotion.bake_emotion_layer, armature, segments, 24, profile.expressions, key_tolerance=0.001
+    )
+    results["bake_emotion_layer"] = stage(seconds, len(segments), calls, keyframes=keyframes)
+    return results
+
+
+def bench_characters(timeline, work_dir, characters):
+    """
+    PHONEME_OT_BakeAll with the take split into `characters` consecutive lines,
+    one armature and timings file per character, as in a dialogue or crowd scene.
+    """
+    table = addon.pose_table.load_pose_table()
+    settings = fake_bpy.context.scene.phoneme_settings
+    settings.jobs = []
+    for i, rows in enumerate(np.array_split(np.arange(len(timeline)), characters)):
+        if not len(rows):
+            continue
+        name = f"BenchCharacter{i:03d}"
+        line = addon.timeline_io.VisemeTimeline(
+            timeline.starts[rows], timeline.ends[rows], timeline.viseme_codes[rows], timeline.viseme_names
+        )
+        path = line.save_npz(os.path.join(work_dir, f"{name}_phonemes.npz"))
+        fake_bpy.new_armature(name, table.bone_names)
+        settings.jobs.append(types.SimpleNamespace(
+            enabled=True, armature_name=name, audio_file=path,
+            frame_offset=i, rig_profile="mixamo", status="",
+        ))
+
+    operator = addon.PHONEME_OT_BakeAll()
+    status, seconds, calls = timed(operator.execute, fake_bpy.context)
+    result = stage(seconds, len(settings.jobs), calls, status=sorted(status),
+                   per_character=[job.status for job in settings.jobs],
+                   stages=addon.profiling.profiler.last_run["stages"])
+
+    for job in settings.jobs:
+        fake_bpy.data.objects.pop(job.armature_name, None)
+        fake_bpy.data.actions.pop(f"{job.armature_name}_LipSync", None)
+    return result
+
+
+def synthetic_audio(seconds, speech_fraction=0.6, seed=0):
+    """16 kHz room tone with voiced bursts covering about `speech_fraction` of the clip."""
+    rng = np.random.default_rng(seed)
+    rate = open_AI_whisper.SAMPLE_RATE
+    audio = (rng.standard_normal(int(seconds * rate)) * 0.002).astype(np.float32)
+    t = 0.0
+    while t < seconds:
+        length = rng.uniform(0.5, 4.0)
+        if rng.random() < speech_fraction:
+            a, b = int(t * rate), int(min(t + length, seconds) * rate)
+            phase = np.arange(b - a) / rate
+            audio[a:b] += (0.2 * np.sin(2 * np.pi * 160 * phase) * (0.6 + 0.4 * np.sin(2 * np.pi * 5 * phase))
+                           ).astype(np.float32)
+        t += length
+    return audio
+
+
+def bench_vad(seconds):
+    """Energy VAD + region packing on synthetic audio; items are seconds of audio."""
+    audio = synthetic_audio(seconds)
+    rate = open_AI_whisper.SAMPLE_RATE
+    regions, detect_seconds, _ = timed(open_AI_whisper.detect_speech, audio, rate)
+    (packed, _), pack_seconds, _ = timed(open_AI_whisper.pack_regions, audio, rate, regions)
+    return {
+        "detect_speech": stage(detect_seconds, seconds, regions=len(regions)),
+        "pack_regions": stage(pack_seconds, seconds, transcribed_fraction=round(len(packed) / len(audio), 3)),
+    }
+
+
+def bench_alignment(seconds, letters_per_second=12, seed=0):
+    """CTC Viterbi of a synthetic script over random 20 ms emissions; items are seconds of audio."""
+    rng = np.random.default_rng(seed)
+    classes = 29
+    log_probs = np.log(rng.dirichlet(np.ones(classes), int(seconds / 0.02))).astype(np.float32)
+    tokens = rng.integers(1, classes, int(seconds * letters_per_second))
+    _, viterbi_seconds, _ = timed(forced_align.ctc_viterbi, log_probs, tokens)
+    return {"ctc_viterbi": stage(viterbi_seconds, seconds, frames=len(log_probs), tokens=len(tokens))}
+
+
+def bench_legacy_pose_functions(timeline, limit):
+    """Per-viseme set + keyframe_insert path, capped at `limit` visemes since it is O(n) operator calls."""
+    count = min(len(timeline), limit)
+    frames = (timeline.starts[:count] * 24).astype(int) + 1
+    names = [timeline.viseme_names[code] for code in timeline.viseme_codes[:count]]
+
+    def run():
+        for name, frame in zip(names, frames):
+            addon.pose_functions.apply_viseme_pose(ARMATURE_NAME, name, int(frame))
+
+    _, seconds, calls = timed(run)
+    return stage(seconds, count, calls)
+
+
+def run(sizes, legacy_limit, characters, vad_seconds, align_seconds):
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "vad": bench_vad(vad_seconds),
+        "alignment": bench_alignment(align_seconds),
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            print(f"Benchmarking {size} words...", file=sys.stderr)
+            timeline, base, pipeline_results = bench_pipeline(size, work_dir)
+            entry = {"words": size, "phonemes": len(timeline)}
+            entry.update(pipeline_results)
+            entry.update(bench_bake(timeline, base))
+            entry["bake_all_characters"] = bench_characters(timeline, work_dir, characters)
+            entry["legacy_apply_viseme_pose"] = bench_legacy_pose_functions(timeline, legacy_limit)
+            report["sizes"][str(size)] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lip sync pipeline without Blender.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Synthetic word counts to run")
+    parser.add_argument("--legacy-limit", type=int, default=2000,
+                        help="Max visemes to push through the per-frame pose_functions path")
+    parser.add_argument("--characters", type=int, default=20,
+                        help="Armatures baked together by the multi-character stage")
+    parser.add_argument("--vad-seconds", type=int, default=600,
+                        help="Length of the synthetic audio run through voice activity detection")
+    parser.add_argument("--align-seconds", type=int, default=60,
+                        help="Length of the synthetic clip whose script is force-aligned")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.legacy_limit, args.characters, args.vad_seconds, args.align_seconds)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Benchmark report saved to: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Lightweight in-process stand-in for `bpy` and `mathutils`.
+
+Only implements what the addon touches, and counts the calls that dominate
+bake time in real Blender: operators, depsgraph updates, keyframe inserts
+and F-curve writes. Call install() before importing the addon.
+"""
+
+import sys
+import types
+from collections import Counter
+
+import numpy as np
+
+CALLS = Counter()
+
+
+def reset_counters():
+    CALLS.clear()
+
+
+# ------------------------------------------------------------------------
+# ANIMATION DATA
+# ------------------------------------------------------------------------
+
+class KeyframePoints:
+    """Keyframe (frame, value) pairs held as an (n, 2) float32 array."""
+
+    def __init__(self):
+        self.co = np.empty((0, 2), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.co)
+
+    def add(self, count):
+        CALLS["keyframe_points.add"] += 1
+        self.co = np.concatenate([self.co, np.zeros((count, 2), dtype=np.float32)])
+
+    def foreach_set(self, attr, seq):
+        CALLS[f"keyframe_points.foreach_set.{attr}"] += 1
+        if attr == "co":
+            self.co = np.array(seq, dtype=np.float32).reshape(-1, 2)
+
+    def foreach_get(self, attr, seq):
+        CALLS[f"keyframe_points.foreach_get.{attr}"] += 1
+        if attr == "co":
+            seq[:] = self.co.ravel()
+
+    def insert(self, frame, value, options=None):
+        CALLS["keyframe_points.insert"] += 1
+        index = np.searchsorted(self.co[:, 0], frame)
+        if index < len(self.co) and self.co[index, 0] == frame:
+            self.co[index, 1] = value
+        else:
+            self.co = np.insert(self.co, index, (frame, value), axis=0)
+
+    def __getitem__(self, index):
+        return Keyframe(self, index)
+
+    def remove(self, keyframe, fast=False):
+        CALLS["keyframe_points.remove"] += 1
+        self.co = np.delete(self.co, keyframe.index, axis=0)
+
+    def clear(self):
+        CALLS["keyframe_points.clear"] += 1
+        self.co = np.empty((0, 2), dtype=np.float32)
+
+
+class Keyframe:
+    def __init__(self, points, index):
+        self.index = index
+        self.co = tuple(points.co[index])
+
+
+class FCurve:
+    def __init__(self, data_path, index=0, action_group=""):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = action_group
+        self.keyframe_points = KeyframePoints()
+
+    def update(self):
+        CALLS["fcurve.update"] += 1
+        co = self.keyframe_points.co
+        if len(co) > 1 and (co[1:, 0] < co[:-1, 0]).any():
+            self.keyframe_points.co = co[np.argsort(co[:, 0], kind="stable")]
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=""):
+        CALLS["fcurves.new"] += 1
+        if self.find(data_path, index=index) is not None:
+            raise RuntimeError(f"F-Curve '{data_path}[{index}]' already exists")
+        fcurve = FCurve(data_path, index, action_group)
+        self.append(fcurve)
+        return fcurve
+
+    def find(self, data_path, index=0):
+        for fcurve in self:
+            if fcurve.data_path == data_path and fcurve.array_index == index:
+                return fcurve
+        return None
+
+
+class IDProperties(dict):
+    pass
+
+
+class Action:
+    def __init__(self, name):
+        self.name = name
+        self.fcurves = FCurves()
+        self.use_fake_user = False
+        self._props = IDProperties()
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def keyframe_count(self):
+        return sum(len(fcurve.keyframe_points) for fcurve in self.fcurves)
+
+
+class NlaStrip:
+    def __init__(self, name, start, action):
+        self.name = name
+        self.action = action
+        self.frame_start = start
+        self.blend_type = 'REPLACE'
+        self.extrapolation = 'HOLD'
+
+
+class NlaStrips(list):
+    def new(self, name, start, action):
+        CALLS["nla_strips.new"] += 1
+        strip = NlaStrip(name, start, action)
+        self.append(strip)
+        return strip
+
+
+class NlaTrack:
+    def __init__(self):
+        self.name = "NlaTrack"
+        self.strips = NlaStrips()
+
+
+class NlaTracks(list):
+    def new(self, prev=None):
+        CALLS["nla_tracks.new"] += 1
+        track = NlaTrack()
+        self.append(track)
+        return track
+
+    def get(self, name, default=None):
+        return next((track for track in self if track.name == name), default)
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+        self.action_blend_type = 'REPLACE'
+        self.nla_tracks = NlaTracks()
+
+
+# ------------------------------------------------------------------------
+# OBJECTS
+# ------------------------------------------------------------------------
+
+class PoseBone:
+    def __init__(self, name):
+        self.name = name
+        self.location = [0.0, 0.0, 0.0]
+        self.rotation_quaternion = [1.0, 0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+
+    def __setattr__(self, name, value):
+        if name in ("location", "rotation_quaternion", "scale"):
+            CALLS["pose_bone.set"] += 1
+            value = list(value)
+        object.__setattr__(self, name, value)
+
+    def keyframe_insert(self, data_path, frame=None, group=None, index=-1):
+        CALLS["keyframe_insert"] += 1
+        return True
+
+    def path_from_id(self, prop=""):
+        path = f'pose.bones["{self.name}"]'
+        return f"{path}.{prop}" if prop else path
+
+
+class PoseBones(dict):
+    def __iter__(self):
+        return iter(self.values())
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self.values())[key]
+        return dict.__getitem__(self, key)
+
+
+class Pose:
+    def __init__(self, bone_names):
+        self.bones = PoseBones((name, PoseBone(name)) for name in bone_names)
+
+
+class ArmatureData:
+    def __init__(self, name):
+        self.name = name
+        self.name_full = name
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Object:
+    def __init__(self, name, bone_names=(), type='ARMATURE'):
+        self.name = name
+        self.type = type
+        self.mode = 'OBJECT'
+        self.data = ArmatureData(name)
+        self.pose = Pose(bone_names)
+        self.animation_data = None
+        self._selected = False
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+    def select_set(self, state):
+        self._selected = state
+
+    def update_tag(self, refresh=None):
+        CALLS["update_tag"] += 1
+
+
+class Collection(dict):
+    def __iter__(self):
+        return iter(self.values())
+
+    def new(self, name):
+        item = Action(name)
+        self[name] = item
+        return item
+
+    def remove(self, item):
+        self.pop(item.name, None)
+
+
+# ------------------------------------------------------------------------
+# CONTEXT
+# ------------------------------------------------------------------------
+
+class ViewLayer:
+    def __init__(self):
+        self.objects = types.SimpleNamespace(active=None)
+
+    def update(self):
+        CALLS["view_layer.update"] += 1
+
+
+class Scene:
+    def __init__(self, fps=24):
+        self.render = types.SimpleNamespace(fps=fps, fps_base=1.0)
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+
+
+class Context:
+    def __init__(self, scene, view_layer):
+        self.scene = scene
+        self.view_layer = view_layer
+        self.workspace = None
+        self.screen = None
+        self.window = None
+        self.window_manager = None
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+
+class _OperatorNamespace:
+    """bpy.ops.<module>.<operator>(...) that only counts calls."""
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        def operator(*args, **kwargs):
+            CALLS[f"ops.{self._module}.{name}"] += 1
+            if self._module == "object" and name == "mode_set":
+                active = context.view_layer.objects.active
+                if active is not None:
+                    active.mode = kwargs.get("mode", args[0] if args else 'OBJECT')
+            return {'FINISHED'}
+        return operator
+
+
+class _Ops:
+    def __getattr__(self, module):
+        return _OperatorNamespace(module)
+
+
+class _Prop:
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+
+def _property(*args, **kwargs):
+    return _Prop(*args, **kwargs)
+
+
+class _Registrable:
+    def report(self, level, message):
+        self.reports = getattr(self, "reports", [])
+        self.reports.append((set(level), message))
+
+
+# ------------------------------------------------------------------------
+# MODULE ASSEMBLY
+# ------------------------------------------------------------------------
+
+data = types.SimpleNamespace(objects=Collection(), actions=Collection())
+view_layer = ViewLayer()
+context = Context(Scene(), view_layer)
+
+
+def new_armature(name, bone_names):
+    armature = Object(name, bone_names)
+    data.objects[name] = armature
+    return armature
+
+
+def install():
+    """Registers the fake modules as `bpy`, `bpy.*` and `mathutils` in sys.modules."""
+    bpy = types.ModuleType("bpy")
+    bpy.data = data
+    bpy.context = context
+    bpy.ops = _Ops()
+
+    props = types.ModuleType("bpy.props")
+    for name in ("StringProperty", "BoolProperty", "IntProperty", "FloatProperty", "EnumProperty",
+                 "PointerProperty", "CollectionProperty", "FloatVectorProperty"):
+        setattr(props, name, _property)
+
+    bpy_types = types.ModuleType("bpy.types")
+    for name in ("Operator", "Panel", "PropertyGroup", "UIList", "Menu"):
+        setattr(bpy_types, name, type(name, (_Registrable,), {}))
+    bpy_types.Scene = Scene
+    bpy_types.Object = Object
+
+    utils = types.ModuleType("bpy.utils")
+    utils.register_class = lambda cls: None
+    utils.unregister_class = lambda cls: None
+    utils.escape_identifier = lambda s: s.replace("\\", "\\\\").replace('"', '\\"')
+
+    path = types.ModuleType("bpy.path")
+    path.abspath = lambda p: p
+
+    app = types.ModuleType("bpy.app")
+    app.handlers = types.SimpleNamespace(frame_change_pre=[], frame_change_post=[], load_post=[])
+    app.handlers.persistent = lambda func: func
+    app.background = True
+
+    bpy.props, bpy.types, bpy.utils, bpy.path, bpy.app = props, bpy_types, utils, path, app
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = tuple
+    mathutils.Quaternion = tuple
+
+    sys.modules.update({
+        "bpy": bpy, "bpy.props": props, "bpy.types": bpy_types, "bpy.utils": utils,
+        "bpy.path": path, "bpy.app": app, "bpy.app.handlers": app.handlers, "mathutils": mathutils,
+    })
+    return bpy
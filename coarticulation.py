@@ -0,0 +1,82 @@
+import numpy as np
+
+from . import pose_table
+
+
+# ------------------------------------------------------------------------
+# COARTICULATION (Dominance-weighted blending of neighbouring visemes)
+# ------------------------------------------------------------------------
+# Every timeline entry pulls the mouth towards its pose with a dominance that
+# is its table strength inside the entry and falls off exponentially outside
+# it: over `spread` seconds ahead of the entry (anticipation) and a shorter
+# span after it (carry-over). The pose at any time is the dominance-weighted
+# mean of the entries around it, so strong visemes (closed lips, F/V) still
+# reach their target while weak ones (K/G, rest) give way to their neighbours.
+#
+# Weights for all sample times are gathered into one (n_times, n_visemes)
+# matrix; the poses are then a single matrix product with the pose table.
+
+DEFAULT_SPREAD = 0.04
+CARRYOVER_RATIO = 0.75
+# Entries on either side of a sample that can influence it
+NEIGHBOURS = 6
+
+
+def timeline_segments(timeline, table):
+    """
+    (starts, ends, rows, strengths) of every entry plus a rest entry before and
+    after the take; precomputed once for repeated coarticulation_weights() calls.
+    """
+    rest = table.rest_index
+    lookup = np.array([table.viseme_to_index.get(name, -1) for name in timeline.viseme_names], dtype=np.intp)
+    rows = lookup[timeline.viseme_codes]
+    # Unknown visemes act as rest, like the peak-only layout
+    rows = np.concatenate([[rest], np.where(rows >= 0, rows, rest), [rest]])
+    starts = np.concatenate([[-np.inf], timeline.starts, [timeline.ends[-1]]])
+    ends = np.concatenate([[timeline.starts[0]], timeline.ends, [np.inf]])
+    strengths = np.maximum(table.dominance[rows], 1e-3)
+    return starts, ends, rows, strengths
+
+
+def coarticulation_weights(timeline, table, times, spread=DEFAULT_SPREAD, neighbours=NEIGHBOURS, segments=None):
+    """
+    Returns the (n_times, n_visemes) blend weights of the pose table rows at
+    `times` (seconds); every row of the result sums to 1. Each time costs a
+    binary search plus 2 * `neighbours` + 1 entries, whatever the take length.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    starts, ends, rows, strengths = segments or timeline_segments(timeline, table)
+
+    current = np.searchsorted(starts, times, side="right") - 1
+    nearby = current[:, None] + np.arange(-neighbours, neighbours + 1)
+    valid = (nearby >= 0) & (nearby < len(starts))
+    nearby = np.clip(nearby, 0, len(starts) - 1)
+
+    # Distance outside each entry, 0 inside it
+    ahead = np.maximum(starts[nearby] - times[:, None], 0.0)
+    behind = np.maximum(times[:, None] - ends[nearby], 0.0)
+    falloff = ahead / spread + behind / (spread * CARRYOVER_RATIO)
+    dominance = np.where(valid, strengths[nearby] * np.exp(-falloff), 0.0)
+
+    count = len(table.viseme_names)
+    flat = (np.arange(len(times))[:, None] * count + rows[nearby]).ravel()
+    weights = np.bincount(flat, weights=dominance.ravel(), minlength=len(times) * count)
+    weights = weights.reshape(len(times), count)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def blend_poses(weights, poses):
+    """(n_times, n_bones, 10) poses blended from `poses` (n_visemes, n_bones, 10) by `weights`."""
+    count, bones, channels = poses.shape
+    # Blending offsets from rest keeps channels no viseme moves exactly at rest
+    offsets = (poses - pose_table.REST_CHANNELS).reshape(count, bones * channels)
+    values = (weights.astype(np.float32) @ offsets).reshape(-1, bones, channels) + pose_table.REST_CHANNELS
+    return pose_table.normalize_quaternions(values)
+
+
+def coarticulated_values(timeline, frames, fps, table, bone_indices, spread=DEFAULT_SPREAD):
+    """Blended poses of the bones `bone_indices` at every key frame, (n_keys, n_bones, 10)."""
+    if not len(frames):
+        return np.empty((0, len(bone_indices), pose_table.CHANNEL_COUNT), dtype=np.float32)
+    weights = coarticulation_weights(timeline, table, np.asarray(frames) / float(fps), spread)
+    return blend_poses(weights, table.poses[:, bone_indices])
@@ -0,0 +1,27 @@
+import hashlib
+import os
+
+# ------------------------------------------------------------------------
+# AUDIO DIGESTS (Content hash of a clip, shared by both caches)
+# ------------------------------------------------------------------------
+# Shared by the decoded audio cache (external Python) and the phoneme cache
+# (addon), so this module only depends on the standard library. Both key
+# their entries on the same sha256, and a clip is only hashed again when
+# its size or modification time changes.
+
+# (path, size, mtime) -> sha256 of the audio
+_audio_digests = {}
+
+
+def audio_digest(audio_path):
+    stat = os.stat(audio_path)
+    memo_key = (os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+    digest = _audio_digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(audio_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _audio_digests[memo_key] = digest
+    return digest
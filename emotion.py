@@ -0,0 +1,162 @@
+import json
+
+import bpy
+import numpy as np
+
+from . import pose_table
+from . import profiling
+from . import rig_profiles
+from .baking import write_fcurves
+
+
+# ------------------------------------------------------------------------
+# EMOTION LAYER (Brow / eyelid / cheek expressions on their own NLA track)
+# ------------------------------------------------------------------------
+# Emotion segments ({"start", "end", "emotion", "intensity"}, seconds) are
+# keyed from the compiled expression table into a small action of their own.
+# That action plays on an NLA track with COMBINE blending and the lip sync
+# action is switched to COMBINE as well, so both add onto the rest pose.
+# Changing the emotions only rebuilds this layer, never the lip sync keys.
+#
+# Segments come from an emotion file, from "emotions" in the timings meta,
+# or from one label held over the whole take.
+
+EMOTION_TRACK_NAME = "LipSync Emotion"
+EMOTION_ACTION_SUFFIX = "_Emotion"
+
+
+def load_emotion_segments(path):
+    """Reads a JSON list of segments (or {"segments": [...]}), sorted by start."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("segments", [])
+    return sorted(data, key=lambda segment: float(segment["start"]))
+
+
+def emotion_segments_for(timeline, emotion_file="", default_emotion=pose_table.NEUTRAL_EXPRESSION, intensity=1.0):
+    """
+    Segments from `emotion_file` if given, else from the timings' meta, else
+    `default_emotion` at `intensity` from the first to the last phoneme.
+    """
+    if emotion_file:
+        return load_emotion_segments(emotion_file)
+    segments = timeline.meta.get("emotions") if timeline.meta else None
+    if segments:
+        return sorted(segments, key=lambda segment: float(segment["start"]))
+    if not len(timeline) or default_emotion == pose_table.NEUTRAL_EXPRESSION:
+        return []
+    return [{"start": float(timeline.starts[0]), "end": float(timeline.ends[-1]),
+             "emotion": default_emotion, "intensity": intensity}]
+
+
+def build_expression_keys(segments, fps, table, blend_seconds=0.25):
+    """
+    Returns (frames, rows, weights): expression table rows and their strength
+    per key. Each segment ramps in over `blend_seconds` and holds to its end;
+    the face ramps back to neutral only across gaps longer than the blend.
+    """
+    blend = max(1, int(round(blend_seconds * fps)))
+    neutral = table.rest_index
+    keys = []
+    unknown = set()
+    previous_end = None
+
+    for segment in segments:
+        start = int(float(segment["start"]) * fps)
+        end = max(int(float(segment["end"]) * fps), start + 1)
+        row = table.viseme_index(segment.get("emotion", ""))
+        if row is None:
+            unknown.add(segment.get("emotion", ""))
+            row = neutral
+        weight = float(segment.get("intensity", 1.0))
+
+        if previous_end is not None:
+            # Overlapping segments start where the previous one ends
+            start = max(start, previous_end)
+            end = max(end, start + 1)
+        if previous_end is None or start - previous_end > blend:
+            if previous_end is not None:
+                keys.append((previous_end + blend, neutral, 0.0))
+            keys.append((start, neutral, 0.0))
+        ramp = min(blend, max(1, (end - start) // 2))
+        keys += [(start + ramp, row, weight), (end, row, weight)]
+        previous_end = end
+
+    if previous_end is not None:
+        keys.append((previous_end + blend, neutral, 0.0))
+    if unknown:
+        print(f"Emotion layer: no expression for {', '.join(sorted(unknown))}, using neutral")
+    if not keys:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.intp), np.empty(0)
+
+    frames = np.array([frame for frame, _, _ in keys], dtype=np.int64)
+    rows = np.array([row for _, row, _ in keys], dtype=np.intp)
+    weights = np.array([weight for _, _, weight in keys], dtype=np.float64)
+    # Later keys on the same frame replace earlier ones
+    keep = np.append(frames[1:] != frames[:-1], True)
+    return frames[keep], rows[keep], weights[keep]
+
+
+def expression_values(table, rows, weights):
+    """(n_keys, n_bones, 10) poses scaled from rest by `weights`, quaternions renormalized."""
+    rest = pose_table.REST_CHANNELS
+    values = rest + (table.poses[rows] - rest) * weights[:, None, None].astype(np.float32)
+    return pose_table.normalize_quaternions(values)
+
+
+def clear_emotion_layer(armature, action_name=None):
+    """Removes the emotion NLA track and its action from `armature`."""
+    animation_data = armature.animation_data
+    if animation_data is not None:
+        track = animation_data.nla_tracks.get(EMOTION_TRACK_NAME)
+        if track is not None:
+            animation_data.nla_tracks.remove(track)
+    action = bpy.data.actions.get(action_name or armature.name + EMOTION_ACTION_SUFFIX)
+    if action is not None:
+        bpy.data.actions.remove(action)
+
+
+def bake_emotion_layer(armature, segments, fps, table, blend_seconds=0.25, key_tolerance=0.001,
+                       frame_offset=0, action_name=None):
+    """
+    Replaces the emotion layer of `armature` with `segments` keyed from the
+    expression `table`. Returns the keyframe count (0 clears the layer).
+    """
+    action_name = action_name or armature.name + EMOTION_ACTION_SUFFIX
+    clear_emotion_layer(armature, action_name)
+
+    with profiling.stage("pose_eval", len(segments)):
+        frames, rows, weights = build_expression_keys(segments, fps, table, blend_seconds)
+        bone_indices, bone_names = table.resolve_bones(armature)
+        if not len(frames) or not bone_names:
+            return 0
+        values = expression_values(table, rows, weights)[:, bone_indices]
+
+    action = bpy.data.actions.new(name=action_name)
+    keyframe_count = write_fcurves(action, frames + frame_offset, values, bone_names, key_tolerance)
+
+    animation_data = armature.animation_data or armature.animation_data_create()
+    track = animation_data.nla_tracks.new()
+    track.name = EMOTION_TRACK_NAME
+    strip = track.strips.new(action_name, int(frames[0]) + frame_offset, action)
+    strip.blend_type = 'COMBINE'
+    strip.extrapolation = 'NOTHING'
+    # The lip sync action plays on top; COMBINE adds it to the expression.
+    animation_data.action_blend_type = 'COMBINE'
+    return keyframe_count
+
+
+# Blender keeps only references to dynamic enum strings, so the items live here.
+_emotion_items = []
+
+
+def emotion_items(self, context):
+    """Expressions of the selected rig profile's expression table."""
+    try:
+        table = rig_profiles.cached_profile(self.rig_profile).expressions
+    except (OSError, ValueError):
+        table = None
+    names = table.viseme_names if table else [pose_table.NEUTRAL_EXPRESSION]
+    _emotion_items[:] = [(name, name, "") for name in names]
+    return _emotion_items
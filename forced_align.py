@@ -0,0 +1,286 @@
+import time
+import unicodedata
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# FORCED ALIGNMENT (Known script -> CTC Viterbi over frame-level scores)
+# ------------------------------------------------------------------------
+# When the words are already known there is nothing to decode: an acoustic
+# model scores every 20 ms frame against every character once (one forward
+# pass of torchaudio's MMS_FA wav2vec2 model), and a Viterbi search finds the
+# most likely monotonic path of the script's characters through those frames
+# under CTC rules (blanks between tokens, repeats need a blank). That is far
+# cheaper than autoregressive Whisper decoding and gives a time span for every
+# character, which phoneme_durations.distribute_aligned_time() turns into
+# phoneme boundaries.
+#
+# Long takes are never scored or searched in one piece: the model runs on
+# EMISSION_WINDOW_SECONDS of audio at a time (self-attention cost grows with
+# the square of the length), and the Viterbi search walks ALIGN_WINDOW_FRAMES
+# at a time, keeping the words that finish early in each window and starting
+# the next window where they end (windowed_viterbi).
+#
+# Like transcribers.py, torch/torchaudio are imported on load() only; the
+# Viterbi search itself is plain numpy.
+
+ALIGNER_SPEC = "mms-fa"
+BLANK = "-"
+STAR = "*"  # MMS_FA's wildcard token, stands in for words without alignable letters
+# Backpointers of longer trellises (frames x tokens, one byte each) are refused
+MAX_TRELLIS_BYTES = 512 * 1024 * 1024
+# Samples per emission frame (wav2vec2's convolutional feature encoder stride)
+FRAME_STRIDE = 320
+EMISSION_WINDOW_SECONDS = 30.0
+# Audio on either side of an emission window that the model sees but whose frames are dropped
+EMISSION_CONTEXT_SECONDS = 1.0
+# Viterbi window (60 s of 20 ms frames); words ending in its first COMMIT_FRACTION are kept
+ALIGN_WINDOW_FRAMES = 3000
+COMMIT_FRACTION = 0.75
+# Tokens offered to a window, relative to its share of the remaining script
+TOKEN_MARGIN = 2.0
+
+
+class AlignmentError(ValueError):
+    """The script cannot be aligned to the audio (too short for it, or too long to search)."""
+
+
+def read_transcript(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def transcript_words(text):
+    """Script text -> words, split on whitespace; punctuation stays attached like in Whisper's words."""
+    return text.split()
+
+
+def word_tokens(word, dictionary):
+    """Letters of `word` that the acoustic model knows, accents folded (MMS_FA is romanized lower case)."""
+    folded = unicodedata.normalize("NFKD", word.lower())
+    return [dictionary[c] for c in folded if c in dictionary and c not in (BLANK, STAR)]
+
+
+def ctc_viterbi(log_probs, tokens, blank=0, open_end=False):
+    """
+    Most likely CTC path of `tokens` through `log_probs` (n_frames, n_classes).
+    Returns (token_starts, token_ends) in frames, end exclusive; every token
+    owns at least one frame. With `open_end` the path may stop before the last
+    token, and only the tokens it reaches are returned. Raises AlignmentError
+    if the audio is too short for the tokens or the trellis too large.
+    """
+    log_probs = np.asarray(log_probs, dtype=np.float32)
+    tokens = np.asarray(tokens, dtype=np.intp)
+    n_frames, n_tokens = len(log_probs), len(tokens)
+    if not n_tokens:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    repeats = int(np.count_nonzero(tokens[1:] == tokens[:-1]))
+    if n_frames < n_tokens + repeats and not open_end:
+        raise AlignmentError(f"Transcript needs at least {n_tokens + repeats} frames, the audio has {n_frames}")
+
+    # States alternate blank, token, blank, ..., token, blank
+    n_states = 2 * n_tokens + 1
+    if n_frames * n_states > MAX_TRELLIS_BYTES:
+        raise AlignmentError(f"Alignment of {n_tokens} tokens over {n_frames} frames is too large")
+    labels = np.full(n_states, blank, dtype=np.intp)
+    labels[1::2] = tokens
+    # A token state may be entered from the previous token directly unless both are the same
+    can_skip = np.zeros(n_states, dtype=bool)
+    can_skip[3::2] = tokens[1:] != tokens[:-1]
+
+    score = np.full(n_states, -np.inf, dtype=np.float32)
+    score[:2] = log_probs[0, labels[:2]]
+    step = np.full(n_states, -np.inf, dtype=np.float32)
+    skip = np.full(n_states, -np.inf, dtype=np.float32)
+    # 0 = stay, 1 = from the previous state, 2 = skipped the blank before
+    back = np.zeros((n_frames, n_states), dtype=np.int8)
+    for t in range(1, n_frames):
+        step[1:] = score[:-1]
+        skip[2:] = np.where(can_skip[2:], score[:-2], -np.inf)
+        moves = back[t]
+        moves[step > score] = 1
+        best = np.maximum(score, step)
+        moves[skip > best] = 2
+        score = np.maximum(best, skip) + log_probs[t, labels]
+
+    if open_end:
+        state = int(np.argmax(score))
+        n_tokens = state // 2 + state % 2
+    else:
+        # The path ends on the last token or the blank after it
+        state = n_states - 1 if score[-1] >= score[-2] else n_states - 2
+    path = np.empty(n_frames, dtype=np.intp)
+    for t in range(n_frames - 1, -1, -1):
+        path[t] = state
+        state -= int(back[t, state])
+
+    frames = np.flatnonzero(path % 2 == 1)
+    frame_tokens = (path[frames] - 1) // 2
+    indices = np.arange(n_tokens)
+    starts = frames[np.searchsorted(frame_tokens, indices, side="left")]
+    ends = frames[np.searchsorted(frame_tokens, indices, side="right") - 1] + 1
+    return starts, ends
+
+
+def windowed_viterbi(log_probs, tokens, token_owner, blank=0, window_frames=ALIGN_WINDOW_FRAMES):
+    """
+    ctc_viterbi() for long clips. Each window of `window_frames` is searched
+    with an open end over the next words of the script (TOKEN_MARGIN times
+    its share of what is left, more if the path uses them all); the words that
+    end in its first COMMIT_FRACTION are kept, and the next window starts where
+    the last of them ends. `token_owner` holds the word index of each token.
+    Clips up to one window are aligned in one piece. Returns (token_starts, token_ends).
+    """
+    n_frames = len(log_probs)
+    if n_frames <= window_frames:
+        return ctc_viterbi(log_probs, tokens, blank)
+    tokens = np.asarray(tokens, dtype=np.intp)
+    token_owner = np.asarray(token_owner, dtype=np.intp)
+    n_tokens = len(tokens)
+    word_last = np.flatnonzero(np.append(token_owner[1:] != token_owner[:-1], True))
+    commit_frames = int(window_frames * COMMIT_FRACTION)
+
+    starts = np.empty(n_tokens, dtype=np.intp)
+    ends = np.empty(n_tokens, dtype=np.intp)
+    frame = token = 0
+    while token < n_tokens:
+        if n_frames - frame <= window_frames:
+            window_starts, window_ends = ctc_viterbi(log_probs[frame:], tokens[token:], blank)
+            starts[token:], ends[token:] = window_starts + frame, window_ends + frame
+            break
+
+        rate = (n_tokens - token) / (n_frames - frame)
+        take = int(min(n_tokens - token, np.ceil(rate * window_frames * TOKEN_MARGIN) + 1, window_frames))
+        while True:
+            window_starts, window_ends = ctc_viterbi(log_probs[frame:frame + window_frames],
+                                                     tokens[token:token + take], blank, open_end=True)
+            if len(window_ends) < take or take >= min(n_tokens - token, window_frames):
+                break
+            # The path used up the offered words (denser speech than average): offer more
+            take = min(2 * take, n_tokens - token, window_frames)
+
+        # Whole words the path finished well before the window end
+        last_tokens = word_last[(word_last >= token) & (word_last < token + len(window_ends))] - token
+        kept = last_tokens[window_ends[last_tokens] <= commit_frames]
+        if not len(kept):
+            if len(window_starts) and window_starts[0] > 0:
+                # Speech starts late in the window: move the window up to it
+                frame += int(window_starts[0])
+                continue
+            if not len(last_tokens):
+                # Not even one word fits: noise or silence, skip the committed part
+                frame += commit_frames
+                continue
+            kept = last_tokens[:1]
+        count = int(kept[-1]) + 1
+        starts[token:token + count] = window_starts[:count] + frame
+        ends[token:token + count] = window_ends[:count] + frame
+        frame += int(window_ends[count - 1])
+        token += count
+    return starts, ends
+
+
+class Alignment:
+    """Token spans in seconds; token_owner maps every token to its word (words in script order)."""
+
+    def __init__(self, token_starts, token_ends, token_owner, word_count):
+        self.token_starts = token_starts
+        self.token_ends = token_ends
+        self.token_owner = token_owner
+        self.word_count = word_count
+
+    @property
+    def word_starts(self):
+        return self.token_starts[np.searchsorted(self.token_owner, np.arange(self.word_count), side="left")]
+
+
+class CtcAligner:
+    """Aligns known words to 16 kHz float32 audio with the MMS_FA acoustic model."""
+    spec = ALIGNER_SPEC
+    install_hint = "pip install torch torchaudio"
+
+    def __init__(self, threads=0, device="cpu"):
+        self.threads = threads
+        self.device = device
+        self.load_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.calls = 0
+
+    def load(self):
+        started = time.perf_counter()
+        try:
+            import torch
+            import torchaudio
+        except ImportError as e:
+            raise ImportError(f"Forced alignment is not installed ({e}). {self.install_hint}")
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        bundle = torchaudio.pipelines.MMS_FA
+        self._torch = torch
+        self._model = bundle.get_model(with_star=True).to(self.device).eval()
+        self.dictionary = bundle.get_dict(star=STAR)
+        self.sample_rate = bundle.sample_rate
+        self.load_seconds = time.perf_counter() - started
+        return self
+
+    def emissions(self, audio):
+        """
+        (n_frames, n_classes) log probabilities and the frame length in seconds.
+        Audio longer than EMISSION_WINDOW_SECONDS is scored window by window,
+        each with EMISSION_CONTEXT_SECONDS of context on both sides.
+        """
+        window = int(EMISSION_WINDOW_SECONDS * self.sample_rate) // FRAME_STRIDE * FRAME_STRIDE
+        if len(audio) <= window:
+            log_probs = self._log_probs(audio)
+            return log_probs, len(audio) / float(self.sample_rate) / max(len(log_probs), 1)
+
+        context = int(EMISSION_CONTEXT_SECONDS * self.sample_rate) // FRAME_STRIDE * FRAME_STRIDE
+        parts = []
+        for start in range(0, len(audio), window):
+            first = max(0, start - context)
+            log_probs = self._log_probs(audio[first:start + window + context])
+            skip = (start - first) // FRAME_STRIDE
+            parts.append(log_probs[skip:skip + window // FRAME_STRIDE])
+        return np.concatenate(parts), FRAME_STRIDE / float(self.sample_rate)
+
+    def _log_probs(self, audio):
+        torch = self._torch
+        waveform = torch.from_numpy(np.array(audio, dtype=np.float32))[None].to(self.device)
+        with torch.inference_mode():
+            emission, _ = self._model(waveform)
+            return torch.log_softmax(emission, dim=-1)[0].cpu().numpy()
+
+    def align(self, audio, words, offset=0.0):
+        """Alignment of `words` in `audio` (which starts `offset` seconds into the clip)."""
+        started = time.perf_counter()
+        star = self.dictionary[STAR]
+        tokens = []
+        token_owner = []
+        for index, word in enumerate(words):
+            ids = word_tokens(word, self.dictionary) or [star]
+            tokens.extend(ids)
+            token_owner.extend([index] * len(ids))
+
+        log_probs, frame_seconds = self.emissions(audio)
+        starts, ends = windowed_viterbi(log_probs, tokens, token_owner, self.dictionary[BLANK])
+        alignment = Alignment(offset + starts * frame_seconds, offset + ends * frame_seconds,
+                              np.array(token_owner, dtype=np.intp), len(words))
+
+        self.busy_seconds += time.perf_counter() - started
+        self.audio_seconds += len(audio) / float(self.sample_rate)
+        self.calls += 1
+        return alignment
+
+    def stats(self):
+        """Throughput so far, in the same shape as Transcriber.stats()."""
+        return {
+            "spec": self.spec,
+            "threads": self.threads,
+            "load_s": round(self.load_seconds, 3),
+            "audio_s": round(self.audio_seconds, 3),
+            "align_s": round(self.busy_seconds, 3),
+            "realtime_factor": round(self.audio_seconds / self.busy_seconds, 2) if self.busy_seconds else None,
+            "calls": self.calls,
+        }
@@ -0,0 +1,283 @@
+import hashlib
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import sqlite3
+import string
+import urllib.request
+from collections import OrderedDict
+
+# ------------------------------------------------------------------------
+# MEMOIZED G2P (In-memory LRU -> on-disk pronunciation store -> g2p_en)
+# ------------------------------------------------------------------------
+# Runs in the external Python next to open_AI_whisper.py. The g2p_en model is
+# only constructed on the first miss, so fully cached clips never load it.
+#
+# lookup_many() converts a whole transcript at once: every distinct word is
+# looked up once, and when enough of them miss the store they are converted
+# in a process pool (each process loads its own g2p_en model, a second or two,
+# so small batches stay in this process). pool.map() keeps the input order and
+# g2p_en is deterministic per word, so the result never depends on `jobs`.
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "blender_lipsync", "pronunciations.sqlite")
+# Fewer misses than this are converted in this process
+MIN_PARALLEL_MISSES = 256
+# SQLite's default limit on bound parameters per statement is 999
+STORE_QUERY_SIZE = 500
+
+
+def normalize_word(word):
+    """Lowercases and strips surrounding punctuation ("Hello," -> "hello")."""
+    return word.strip().lower().strip(string.punctuation + "’“”")
+
+
+def seed_digest(store_path=DEFAULT_STORE_PATH):
+    """
+    Digest of the seeded pronunciations in the store at `store_path` ("" if
+    none). Seeding changes a clip's phonemes without changing its audio or
+    model, so the addon's phoneme cache keys include it.
+    """
+    if not store_path or not os.path.exists(store_path):
+        return ""
+    try:
+        db = sqlite3.connect(f"file:{urllib.request.pathname2url(os.path.abspath(store_path))}?mode=ro",
+                             uri=True, timeout=30)
+        try:
+            row = db.execute("SELECT value FROM meta WHERE key = 'seed_digest'").fetchone()
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return ""
+    return row[0] if row else ""
+
+
+def g2p_en_version():
+    try:
+        return importlib.metadata.version("g2p_en")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class CachedG2p:
+    """Drop-in replacement for g2p_en.G2p: `cached(word)` returns the phoneme list."""
+
+    def __init__(self, store_path=DEFAULT_STORE_PATH, lru_size=4096, g2p=None, jobs=1):
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._g2p = g2p
+        # Pool processes for lookup_many() misses (0 = one per CPU but one)
+        self.jobs = jobs or max(1, (os.cpu_count() or 2) - 1)
+        self._pool = None
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if store_path:
+            store_dir = os.path.dirname(store_path)
+            if store_dir and not os.path.exists(store_dir):
+                os.makedirs(store_dir, exist_ok=True)
+            self._db = sqlite3.connect(store_path, timeout=30)
+            self._init_store()
+
+    def __call__(self, word):
+        key = normalize_word(word)
+        if not key:
+            return []
+
+        phonemes = self._lru.get(key)
+        if phonemes is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return list(phonemes)
+
+        phonemes = self._load(key)
+        if phonemes is not None:
+            self.store_hits += 1
+        else:
+            self.misses += 1
+            phonemes = self._convert(key)
+            self._save(key, phonemes, "g2p")
+
+        self._remember(key, phonemes)
+        return list(phonemes)
+
+    def lookup_many(self, words):
+        """
+        Phonemes of every word in `words` (tuples, in order), as calling the
+        cache once per word would return them. Each distinct word is looked up
+        once and counts once in stats().
+        """
+        index = {}
+        slots = [index.setdefault(normalize_word(word), len(index)) for word in words]
+        pronunciations = [()] * len(index)
+        pending = []
+        for position, key in enumerate(index):
+            if not key:
+                continue
+            phonemes = self._lru.get(key)
+            if phonemes is None:
+                pending.append((position, key))
+                continue
+            self._lru.move_to_end(key)
+            self.hits += 1
+            pronunciations[position] = phonemes
+
+        stored = self._load_many([key for _, key in pending])
+        misses = []
+        for position, key in pending:
+            phonemes = stored.get(key)
+            if phonemes is None:
+                misses.append((position, key))
+                continue
+            self.store_hits += 1
+            self._remember(key, phonemes)
+            pronunciations[position] = phonemes
+
+        converted = self._convert_many([key for _, key in misses])
+        self.misses += len(misses)
+        self._save_many(zip([key for _, key in misses], converted))
+        for (position, key), phonemes in zip(misses, converted):
+            self._remember(key, phonemes)
+            pronunciations[position] = phonemes
+        return [pronunciations[slot] for slot in slots]
+
+    def seed(self, word, phonemes):
+        """Pins a pronunciation (e.g. a character name); seeds win over the model."""
+        self._seed(word, phonemes)
+        self._update_seed_digest()
+
+    def seed_file(self, path):
+        """
+        Loads pronunciations from a JSON object {"word": ["PH", ...]} or a
+        CMU-dict style text file ("WORD  PH PH PH" per line). Returns the count.
+        """
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                entries = json.load(f).items()
+            else:
+                entries = []
+                for line in f:
+                    parts = line.split()
+                    if parts and not line.startswith(";;;"):
+                        entries.append((parts[0], parts[1:]))
+        for word, phonemes in entries:
+            self._seed(word, phonemes)
+            count += 1
+        self._update_seed_digest()
+        return count
+
+    def stats(self):
+        return {"hits": self.hits, "store_hits": self.store_hits, "misses": self.misses}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _convert(self, key):
+        if self._g2p is None:
+            from g2p_en import G2p
+            self._g2p = G2p()
+        return tuple(self._g2p(key))
+
+    def _convert_many(self, keys):
+        # Pool processes cannot start their own pools (batch mode runs G2P in one)
+        if self.jobs < 2 or len(keys) < MIN_PARALLEL_MISSES or multiprocessing.current_process().daemon:
+            return [self._convert(key) for key in keys]
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.jobs, initializer=_init_converter, initargs=(self._g2p,))
+        return self._pool.map(_convert_word, keys, chunksize=max(1, len(keys) // (4 * self.jobs)))
+
+    def _remember(self, key, phonemes):
+        self._lru[key] = phonemes
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _seed(self, word, phonemes):
+        key = normalize_word(word)
+        phonemes = tuple(phonemes)
+        self._save(key, phonemes, "seed")
+        self._remember(key, phonemes)
+
+    def _update_seed_digest(self):
+        if self._db is None:
+            return
+        sha = hashlib.sha256()
+        rows = self._db.execute("SELECT word, phonemes FROM pronunciations WHERE source = 'seed' ORDER BY word")
+        for word, phonemes in rows:
+            sha.update(f"{word}\t{phonemes}\n".encode())
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('seed_digest', ?)", (sha.hexdigest(),))
+
+    def _init_store(self):
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pronunciations "
+                "(word TEXT PRIMARY KEY, phonemes TEXT NOT NULL, source TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'g2p_version'").fetchone()
+            version = g2p_en_version()
+            if row is None or row[0] != version:
+                # Model output may differ between versions; seeded entries stay.
+                self._db.execute("DELETE FROM pronunciations WHERE source = 'g2p'")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('g2p_version', ?)", (version,))
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT phonemes FROM pronunciations WHERE word = ?", (key,)).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def _load_many(self, keys):
+        if self._db is None:
+            return {}
+        stored = {}
+        for first in range(0, len(keys), STORE_QUERY_SIZE):
+            batch = keys[first:first + STORE_QUERY_SIZE]
+            rows = self._db.execute(
+                f"SELECT word, phonemes FROM pronunciations WHERE word IN ({', '.join('?' * len(batch))})", batch
+            )
+            stored.update((word, tuple(json.loads(phonemes))) for word, phonemes in rows)
+        return stored
+
+    def _save(self, key, phonemes, source):
+        if self._db is None:
+            return
+        with self._db:
+            if source == "seed":
+                self._db.execute("INSERT OR REPLACE INTO pronunciations VALUES (?, ?, ?)",
+                                 (key, json.dumps(list(phonemes)), source))
+            else:
+                self._db.execute("INSERT OR IGNORE INTO pronunciations VALUES (?, ?, ?)",
+                                 (key, json.dumps(list(phonemes)), source))
+
+    def _save_many(self, entries):
+        if self._db is None:
+            return
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO pronunciations VALUES (?, ?, ?)",
+                                 [(key, json.dumps(list(phonemes)), "g2p") for key, phonemes in entries])
+
+
+_pool_converter = None
+
+
+def _init_converter(g2p=None):
+    global _pool_converter
+    if g2p is None:
+        from g2p_en import G2p
+        g2p = G2p()
+    _pool_converter = g2p
+
+
+def _convert_word(key):
+    return tuple(_pool_converter(key))
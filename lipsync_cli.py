@@ -0,0 +1,260 @@
+"""
+Headless lip sync baking for render farms, one shot per Blender process:
+
+    blender --background shot.blend --python lipsync_cli.py -- \
+        --pair Hero hero.wav --pair Villain villain.wav --save --summary shot_lipsync.json
+
+Jobs come from --pair ARMATURE AUDIO, a --manifest JSON file, or the
+character list saved in the scene. Audio without timings is extracted first
+(cached timings are reused). The exit code is 0 only if every job baked.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+import types
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_addon():
+    """Imports the addon package this script ships in (without registering its UI)."""
+    name = os.path.basename(ADDON_DIR)
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR]
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[name] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="blender --background [file.blend] --python lipsync_cli.py --",
+        description="Extract phoneme timings and bake lip sync without the UI."
+    )
+    parser.add_argument("--blend", help="Open this .blend first (otherwise the file Blender was started with)")
+    parser.add_argument("--scene", help="Scene to bake into (default: the active scene)")
+    parser.add_argument("--pair", nargs=2, action="append", default=[], metavar=("ARMATURE", "AUDIO"),
+                        help="Armature object and its audio or timings file; repeatable")
+    parser.add_argument("--manifest",
+                        help='JSON list of {"armature", "audio", "frame_offset", "rig_profile"} jobs')
+    parser.add_argument("--rig-profile", default="",
+                        help="Rig profile name or .json path for --pair and manifest jobs without one "
+                             "(default: the bundled Mixamo profile)")
+    parser.add_argument("--extract", choices=("missing", "always", "never"), default="missing",
+                        help="Run extraction for audio without timings (default), always, or never")
+    parser.add_argument("--python-exe", help="External Python with Whisper (overrides PYTHON_EXE)")
+    parser.add_argument("--model",
+                        help="Whisper model name or backend:model[:compute_type] spec, e.g. "
+                             "faster-whisper:small:int8 (overrides WHISPER_MODEL)")
+    parser.add_argument("--threads", type=int, help="CPU threads for the transcriber (overrides WHISPER_THREADS)")
+    parser.add_argument("--format", choices=("json", "npz", "both"), default="json",
+                        help="Timings file format written by extraction")
+    parser.add_argument("--chunk-seconds", type=int, default=0,
+                        help="Transcribe long audio in chunks of this length (0 = whole file)")
+    parser.add_argument("--no-vad", action="store_true",
+                        help="Transcribe the whole audio instead of only the detected speech")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse or store cached timings")
+    parser.add_argument("--cache-dir", help="Phoneme cache folder")
+    parser.add_argument("--full-bake", action="store_true", help="Always rebuild actions instead of re-keying changes")
+    parser.add_argument("--no-optimize", action="store_true", help="Keep every key (no decimation)")
+    parser.add_argument("--tolerance", type=float, default=0.001, help="Key decimation tolerance")
+    parser.add_argument("--coarticulation", type=float, default=0.04,
+                        help="Seconds over which neighbouring visemes blend (0 = no blending)")
+    parser.add_argument("--max-keys-per-second", type=int, default=0, help="Key density cap (0 = none)")
+    parser.add_argument("--save", action="store_true", help="Save the .blend in place after baking")
+    parser.add_argument("--save-as", help="Save the .blend to this path after baking")
+    parser.add_argument("--export-actions", help="Write only the baked actions to this .blend library file")
+    parser.add_argument("--summary", help="Write the JSON timing summary to this file (it is also printed)")
+    parser.add_argument("--log-level", choices=("WARNING", "INFO", "DEBUG"), default="WARNING",
+                        help="Detail of the lip sync console messages")
+    parser.add_argument("--profile", help="Write cProfile stats of the run to this file (.prof)")
+    parser.add_argument("--trace", help="Write the run's stages (with the Whisper worker's) as trace-event JSON")
+    return parser.parse_args(argv)
+
+
+def collect_jobs(args, scene):
+    """Jobs as (armature_name, audio_file, frame_offset, rig_profile) namespaces."""
+    jobs = []
+    for armature_name, audio in args.pair:
+        jobs.append(types.SimpleNamespace(
+            armature_name=armature_name, audio_file=os.path.abspath(audio), frame_offset=0,
+            rig_profile=args.rig_profile,
+        ))
+
+    if args.manifest:
+        base_dir = os.path.dirname(os.path.abspath(args.manifest))
+        with open(args.manifest, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries.get("jobs", [])
+        for entry in entries:
+            # Profile names refer to installed profiles, .json paths are relative to the manifest
+            rig_profile = entry.get("rig_profile", args.rig_profile)
+            if rig_profile.lower().endswith(".json"):
+                rig_profile = os.path.join(base_dir, rig_profile)
+            jobs.append(types.SimpleNamespace(
+                armature_name=entry["armature"],
+                audio_file=os.path.join(base_dir, entry["audio"]),
+                frame_offset=int(entry.get("frame_offset", 0)),
+                rig_profile=rig_profile,
+            ))
+
+    if not jobs:
+        settings = getattr(scene, "phoneme_settings", None)
+        for job in settings.jobs if settings else ():
+            if job.enabled:
+                jobs.append(types.SimpleNamespace(
+                    armature_name=job.armature_name, audio_file=bpy.path.abspath(job.audio_file),
+                    frame_offset=job.frame_offset, rig_profile=job.rig_profile,
+                ))
+    return jobs
+
+
+def extract_missing(addon, jobs, args):
+    """Runs extraction for the jobs' audio files as requested. Returns {audio: result}."""
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or addon.phoneme_cache.DEFAULT_CACHE_DIR
+        cache = addon.phoneme_cache.PhonemeCache(cache_dir)
+
+    options = {}
+    if args.chunk_seconds > 0:
+        options["chunk_seconds"] = args.chunk_seconds
+    if args.format != "json":
+        options["output_format"] = args.format
+    if args.no_vad:
+        options["vad"] = False
+
+    results = {}
+    for job in jobs:
+        audio = job.audio_file
+        if audio in results or audio.lower().endswith(addon.TIMELINE_EXTENSIONS):
+            continue
+        if args.extract == "never":
+            continue
+        if args.extract == "missing":
+            try:
+                addon.load_timeline_for_audio(audio)
+                continue
+            except FileNotFoundError:
+                pass
+
+        start = time.perf_counter()
+        output_path = addon.extract_phonemes_external(audio, cache, options)
+        results[audio] = {
+            "ok": output_path is not None,
+            "timings": output_path,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        print(f"Extraction {'done' if output_path else 'FAILED'} for {audio}")
+    return results
+
+
+def save_outputs(args, results):
+    baked_actions = {
+        bpy.data.actions.get(f"{result['armature']}_LipSync") for result in results if result["ok"]
+    }
+    baked_actions.discard(None)
+
+    if args.export_actions:
+        bpy.data.libraries.write(os.path.abspath(args.export_actions), baked_actions, fake_user=True)
+        print(f"Exported {len(baked_actions)} actions to {args.export_actions}")
+    if args.save_as:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.save_as))
+        print(f"Saved {args.save_as}")
+    elif args.save:
+        bpy.ops.wm.save_mainfile()
+        print(f"Saved {bpy.data.filepath}")
+
+
+def main(args):
+    run_start = time.perf_counter()
+    addon = load_addon()
+    addon.profiling.set_log_level(args.log_level)
+    addon.profiling.profiler.reset(trace=bool(args.trace))
+    if args.python_exe:
+        addon.PYTHON_EXE = args.python_exe
+    if args.model:
+        addon.WHISPER_MODEL = args.model
+    if args.threads is not None:
+        addon.WHISPER_THREADS = args.threads
+
+    if args.blend:
+        bpy.ops.wm.open_mainfile(filepath=os.path.abspath(args.blend))
+    scene = bpy.data.scenes[args.scene] if args.scene else bpy.context.scene
+
+    jobs = collect_jobs(args, scene)
+    if not jobs:
+        print("No jobs: pass --pair, --manifest, or save a character list in the scene.")
+        return 2, {"ok": False, "error": "no jobs"}
+
+    extract_start = time.perf_counter()
+    extraction = extract_missing(addon, jobs, args)
+    extract_seconds = time.perf_counter() - extract_start
+    addon.whisper_worker.shutdown_worker()
+
+    options = {
+        "optimize": not args.no_optimize,
+        "key_tolerance": args.tolerance,
+        "max_keys_per_second": args.max_keys_per_second,
+        "coarticulation": args.coarticulation,
+    }
+    bake_start = time.perf_counter()
+    fps = addon.baking.scene_fps(scene)
+    results = addon.bake_characters(jobs, fps, options, incremental=not args.full_bake)
+    bake_seconds = time.perf_counter() - bake_start
+
+    frames = [result[key] for result in results if result["ok"] for key in ("frame_start", "frame_end")]
+    if frames:
+        scene.frame_start = min(frames)
+        scene.frame_end = max(frames)
+
+    ok = all(result["ok"] for result in results) and all(entry["ok"] for entry in extraction.values())
+    if any(result["ok"] for result in results):
+        save_outputs(args, results)
+
+    summary = {
+        "ok": ok,
+        "blend": bpy.data.filepath,
+        "scene": scene.name,
+        "fps": fps,
+        "extraction": extraction,
+        "jobs": results,
+        "seconds": {
+            "extract": round(extract_seconds, 4),
+            "bake": round(bake_seconds, 4),
+            "total": round(time.perf_counter() - run_start, 4),
+        },
+        "stages": addon.profiling.profiler.summary(),
+    }
+    if args.trace:
+        print(f"Trace events saved to: {addon.profiling.profiler.write_trace(os.path.abspath(args.trace))}")
+    return (0 if ok else 1), summary
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    try:
+        with load_addon().profiling.cprofile(args.profile):
+            exit_code, summary = main(args)
+    except Exception as e:
+        traceback.print_exc()
+        exit_code, summary = 3, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    text = json.dumps(summary)
+    print(text)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text)
+    sys.exit(exit_code)
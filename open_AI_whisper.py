@@ -3,25 +3,30 @@ import os
 import sys
 import json
 import csv
-import whisper
-from g2p_en import G2p
+import subprocess
+import multiprocessing
+import time
+import itertools
+import collections
+import numpy as np
+from g2p_cache import CachedG2p, DEFAULT_STORE_PATH, g2p_en_version
 import re
 
-# Phoneme to Viseme Mapping (Your existing mapping is used here)
-PHONEME_TO_VISEME = {
-    "REST": "Rest/Neutral",
-    "P": "ClosedLips", "B": "ClosedLips", "M": "ClosedLips",
-    "AA": "LipOpenSmall", "AH": "LipOpenSmall", "AO": "LipOpenSmall",
-    "AE": "LipWide", "EH": "LipWide", "AY": "LipWide",
-    "AW": "LipOpenBig", "EY": "LipOpenBig",
-    "UW": "OO", "UH": "OO", "OW": "OO",
-    "IY": "EE", "IH": "EE", "Y": "EE",
-    "F": "FV", "V": "FV",
-    "TH": "TH", "DH": "TH",
-    "CH": "ChSh", "JH": "ChSh", "SH": "ChSh", "ZH": "ChSh", "S": "ChSh", "Z": "ChSh",
-    "K": "KG", "G": "KG", "NG": "KG",
-    "L": "LR", "R": "LR"
-}
+# Phoneme to Viseme Mapping lives in phoneme_map.py so the addon can share it
+from phoneme_map import PHONEME_TO_VISEME
+from timeline_io import VisemeTimeline, first_seen_codes
+from vad import detect_speech, frame_levels, pack_regions, unpack_words
+from phoneme_durations import (STOP_PHONEMES, distribute_aligned_time, distribute_word_time, duration_weights,
+                               extend_aligned_ends, refine_word_bounds)
+# The transcription backends import their runtimes (Whisper, CTranslate2) only
+# when a model is loaded; the post-transcription helpers (G2P, timeline build,
+# writers) stay importable for benchmarks and tools without them.
+from transcribers import canonical_spec, create_transcriber
+from audio_cache import AudioCache, DEFAULT_CACHE_DIR as DEFAULT_AUDIO_CACHE_DIR, audio_digest, decode_clip
+from forced_align import ALIGNER_SPEC, AlignmentError, CtcAligner, read_transcript, transcript_words
+from profiling import cprofile, format_run, profiler, stage
+
+SAMPLE_RATE = 16000  # Whisper's input rate, for every backend
 
 def remove_stress(phoneme_list):
     return [re.sub(r'\d$', '', p) for p in phoneme_list]
@@ -29,89 +34,941 @@ def remove_stress(phoneme_list):
 def classify_viseme(ph):
     return PHONEME_TO_VISEME.get(ph.upper(), "REST")
 
-def main(audio_path, out_json_path=None):
-    print(f"Python executable running this script: {sys.executable}")
+# ------------------------------------------------------------------------
+# PROGRESS REPORTING (Consumed by the worker protocol, no-op otherwise)
+# ------------------------------------------------------------------------
+
+_progress_callback = None
+
+def report_progress(stage, percent=None):
+    if _progress_callback is not None:
+        _progress_callback(stage, percent)
+
+def pipeline_info(model_name="base"):
+    """Describes the models that produced a result (recorded in the output JSON)."""
+    # The canonical transcriber spec, e.g. "base" or "faster-whisper:base:int8"
+    return {"model": canonical_spec(model_name), "g2p_version": g2p_en_version()}
+
+def alignment_info():
+    """pipeline_info() of forced alignment: the aligner takes the transcriber's place."""
+    return {"model": ALIGNER_SPEC, "g2p_version": g2p_en_version()}
+
+def load_models(model_name="base", pronunciations=DEFAULT_STORE_PATH, threads=0, g2p_jobs=0):
+    """
+    Loads the transcriber named by the spec `model_name` (see transcribers.py)
+    and the G2P converter (the expensive part of a run). `g2p_jobs` processes
+    convert large sets of new words (0 = one per CPU but one).
+    """
+    with stage("model_load"):
+        model = create_transcriber(model_name, threads).load()
+        print(f"Loaded transcriber {model.spec} in {model.load_seconds:.1f}s")
+        g2p = CachedG2p(pronunciations, jobs=g2p_jobs)
+    return model, g2p
+
+# ------------------------------------------------------------------------
+# DECODE STAGE (Each clip through ffmpeg once, see audio_cache.py)
+# ------------------------------------------------------------------------
+
+_audio_cache = None
+
+def configure_audio_cache(cache_dir=DEFAULT_AUDIO_CACHE_DIR, max_mb=2048):
+    """Enables the decoded audio cache in `cache_dir` (None or "" decodes every time)."""
+    global _audio_cache
+    _audio_cache = AudioCache(cache_dir, max_mb * 1024 * 1024) if cache_dir else None
+
+def load_clip(audio_path):
+    """The decoded clip (samples + frame levels), memory-mapped from the audio cache when enabled."""
+    with stage("decode"):
+        if _audio_cache is None:
+            return decode_clip(audio_path, SAMPLE_RATE)
+        return _audio_cache.load(audio_path, SAMPLE_RATE)
+
+def cached_clip(audio_path):
+    """The clip if the audio cache already holds it, else None (never decodes)."""
+    if _audio_cache is None:
+        return None
+    return _audio_cache.get(audio_digest(audio_path), SAMPLE_RATE)
+
+def load_audio(audio_path):
+    """16 kHz mono float32 samples of any ffmpeg-readable file (like whisper.load_audio)."""
+    return load_clip(audio_path).samples
+
+def default_output_path(audio_path):
+    return os.path.splitext(audio_path)[0] + "_phonemes.json"
+
+def transcribe_words(model, audio):
+    """Runs the transcriber on a 16 kHz float32 array and returns (word, start, end) tuples."""
+    report_progress("transcribe", 0)
+    progress = (lambda percent: report_progress("transcribe", percent)) if _progress_callback else None
+    with stage("transcribe"):
+        return model.transcribe(audio, progress)
+
+def transcribe_speech(model, audio, use_vad=True, levels=None):
+    """
+    Like transcribe_words() on a 16 kHz float32 array, but only the speech
+    regions found by vad.py are transcribed. `levels` are the clip's frame
+    levels if already known. Returns (word_timings, speech_seconds).
+    """
+    duration = len(audio) / SAMPLE_RATE
+    if not use_vad:
+        return transcribe_words(model, audio), duration
+
+    with stage("vad"):
+        regions = detect_speech(audio, SAMPLE_RATE, levels=levels)
+    speech_seconds = float(np.sum(regions[:, 1] - regions[:, 0]))
+    print(f"VAD: {len(regions)} speech regions, {speech_seconds:.1f}s of {duration:.1f}s "
+          f"({100.0 * (1.0 - speech_seconds / duration) if duration else 0.0:.0f}% skipped)")
+    if not len(regions):
+        return [], 0.0
+
+    packed, table = pack_regions(audio, SAMPLE_RATE, regions)
+    return unpack_words(transcribe_words(model, packed), table), speech_seconds
+
+# Gaps longer than this before a word (or after the last one) become rests
+REST_GAP = 0.05
+
+def build_phoneme_timings(word_timings, g2p, previous_end=None, levels=None, levels_offset=0.0, duration=None):
+    """
+    Converts (word, start, end) tuples into a phoneme/viseme timeline
+    (timeline_io.VisemeTimeline). `previous_end` continues a timeline built
+    earlier (chunked mode) so rests bridge the boundary; with `duration` the
+    silence after the last word is a rest too. Word time is split by typical
+    phoneme durations (phoneme_durations.py); with frame `levels`
+    (vad.frame_levels of audio starting at `levels_offset`) the word edges are
+    first tightened to the voiced audio.
+    """
+    words = word_phonemes([w for w, _, _ in word_timings], g2p)
+    with stage("timeline_build", len(words.phoneme_codes)):
+        word_starts = np.array([start for _, start, _ in word_timings], dtype=np.float64)
+        word_ends = np.array([end for _, _, end in word_timings], dtype=np.float64)
+        if levels is not None:
+            keep_start = words.starts_with(STOP_PHONEMES)
+            word_starts, word_ends = refine_word_bounds(word_starts, word_ends, levels, levels_offset, keep_start)
+        ph_starts, ph_ends = distribute_word_time(word_starts, word_ends, words.owner, words.weights())
+        return phoneme_timeline(words, word_starts, ph_starts, ph_ends, previous_end, duration)
+
+class WordPhonemes:
+    """
+    Columnar G2P of a word sequence: word_codes index word_names (the distinct
+    word texts), phoneme_codes index phoneme_names, and `owner` holds the word
+    index of each phoneme, in word order.
+    """
+
+    def __init__(self, word_names, word_codes, phoneme_names, phoneme_codes, owner):
+        self.word_names = word_names
+        self.word_codes = word_codes
+        self.phoneme_names = phoneme_names
+        self.phoneme_codes = phoneme_codes
+        self.owner = owner
+
+    def __len__(self):
+        return len(self.word_codes)
+
+    @property
+    def counts(self):
+        """Number of phonemes of each word."""
+        return np.bincount(self.owner, minlength=len(self.word_codes))
+
+    def weights(self):
+        return duration_weights(self.phoneme_names)[self.phoneme_codes]
+
+    def starts_with(self, phonemes):
+        """Whether each word's first phoneme is one of `phonemes`."""
+        counts = self.counts
+        if not len(self.phoneme_codes):
+            return np.zeros(len(counts), dtype=bool)
+        in_set = np.array([p in phonemes for p in self.phoneme_names], dtype=bool)
+        first = np.minimum(np.cumsum(counts) - counts, len(self.phoneme_codes) - 1)
+        return (counts > 0) & in_set[self.phoneme_codes[first]]
+
+def word_phonemes(word_texts, g2p):
+    """
+    G2P of every word (WordPhonemes). Each distinct word is converted once,
+    by g2p.lookup_many() for a CachedG2p (which may use a process pool for the
+    misses) or a plain call otherwise; the per-word results are then gathered
+    with NumPy.
+    """
+    with stage("g2p", len(word_texts)):
+        index = {}
+        word_codes = np.fromiter((index.setdefault(w, len(index)) for w in word_texts), dtype=np.intp,
+                                 count=len(word_texts))
+        word_names = list(index)
+        lookup_many = getattr(g2p, "lookup_many", None)
+        converted = lookup_many(word_names) if lookup_many else [g2p(w) for w in word_names]
+        phoneme_index = {}
+        pronunciations = [
+            [phoneme_index.setdefault(p, len(phoneme_index)) for p in remove_stress(phonemes) if p.isalpha()]
+            for phonemes in converted
+        ]
+
+        lengths = np.array([len(codes) for codes in pronunciations], dtype=np.intp)
+        flat = np.fromiter(itertools.chain.from_iterable(pronunciations), dtype=np.intp, count=int(lengths.sum()))
+        counts = lengths[word_codes]
+        owner = np.repeat(np.arange(len(word_codes)), counts)
+        # Each phoneme's position in its word, offset by where that word's pronunciation starts in `flat`
+        within = np.arange(len(owner)) - (np.cumsum(counts) - counts)[owner]
+        phoneme_codes = flat[(np.cumsum(lengths) - lengths)[word_codes][owner] + within]
+    return WordPhonemes(word_names, word_codes, list(phoneme_index), phoneme_codes, owner)
+
+def phoneme_timeline(words, word_starts, ph_starts, ph_ends, previous_end=None, duration=None):
+    """
+    Merges the phonemes of `words` (WordPhonemes) and the rests in the gaps
+    before words into one VisemeTimeline, row positions computed with NumPy.
+    `previous_end` is where an earlier timeline ended (None: no rest before
+    the first word); with `duration` the gap after the last entry is a rest too.
+    """
+    word_starts = np.asarray(word_starts, dtype=np.float64)
+    ph_starts, ph_ends = np.round(ph_starts, 4), np.round(ph_ends, 4)
+    counts = words.counts
+    first_phoneme = np.cumsum(counts) - counts
+    before = np.nan if previous_end is None else previous_end
 
+    # Where the timeline ends after each word (NaN: nothing yet). Words with
+    # phonemes end at their last one; the few without (punctuation, symbols)
+    # end at the rest before them if they get one, so they are walked in order.
+    spoken = counts > 0
+    last_end = np.full(len(words), np.nan)
+    last_end[spoken] = ph_ends[first_phoneme[spoken] + counts[spoken] - 1]
+    for i in np.flatnonzero(~spoken).tolist():
+        end_before = last_end[i - 1] if i else before
+        start = float(word_starts[i])
+        last_end[i] = round(start, 4) if start > end_before + REST_GAP else end_before
+    end_before = np.concatenate([[before], last_end])[:len(words)]
+    rest = word_starts > end_before + REST_GAP
+
+    # Rest edges use round() like the JSON writer; np.round can differ from it near ties
+    rest_starts = [round(value, 4) for value in end_before[rest].tolist()]
+    rest_ends = [round(value, 4) for value in word_starts[rest].tolist()]
+    final_end = last_end[-1] if len(words) else before
+    final_end = 0.0 if np.isnan(final_end) else float(final_end)
+    closing = duration is not None and duration > final_end + REST_GAP
+    if closing:
+        rest_starts.append(round(final_end, 4))
+        rest_ends.append(round(duration, 4))
+    row_count = len(ph_starts) + len(rest_starts)
+
+    # A word's rest comes right before its phonemes; the closing rest is last
+    rests_through = np.cumsum(rest)
+    phoneme_rows = np.arange(len(ph_starts)) + rests_through[words.owner]
+    rest_rows = first_phoneme[rest] + rests_through[rest] - 1
+    if closing:
+        rest_rows = np.append(rest_rows, row_count - 1)
+
+    rest_phoneme = len(words.phoneme_names)
+    rest_word = len(words.word_names)
+    viseme_names = list(dict.fromkeys([classify_viseme(p) for p in words.phoneme_names] + ["Rest/Neutral"]))
+    phoneme_visemes = np.array([viseme_names.index(classify_viseme(p)) for p in words.phoneme_names]
+                               + [viseme_names.index("Rest/Neutral")], dtype=np.int64)
+
+    starts = np.empty(row_count)
+    ends = np.empty(row_count)
+    phoneme_codes = np.full(row_count, rest_phoneme, dtype=np.int64)
+    word_codes = np.full(row_count, rest_word, dtype=np.int64)
+    starts[phoneme_rows], ends[phoneme_rows] = ph_starts, ph_ends
+    starts[rest_rows], ends[rest_rows] = rest_starts, rest_ends
+    phoneme_codes[phoneme_rows] = words.phoneme_codes
+    word_codes[phoneme_rows] = words.word_codes[words.owner]
+
+    # Name tables in order of first use, as VisemeTimeline.from_records() builds them
+    viseme_codes, viseme_names = first_seen_codes(phoneme_visemes[phoneme_codes], viseme_names, np.uint8)
+    phoneme_codes, phoneme_names = first_seen_codes(phoneme_codes, words.phoneme_names + ["REST"], np.uint8)
+    word_codes, word_names = first_seen_codes(word_codes, words.word_names + [""], np.uint32)
+    return VisemeTimeline(starts, ends, viseme_codes, viseme_names, phoneme_codes, phoneme_names,
+                          word_codes, word_names)
+
+def speech_phoneme_timings(word_timings, g2p, duration, previous_end=0.0, levels=None, levels_offset=0.0):
+    """
+    build_phoneme_timings() for VAD-filtered words: the silence before the
+    first and after the last word (up to `duration`) are emitted as rests too.
+    """
+    return build_phoneme_timings(word_timings, g2p, previous_end, levels, levels_offset, duration)
+
+def aligned_phoneme_timings(words, alignment, g2p, duration):
+    """
+    Phoneme timeline of force-aligned script `words` (forced_align.Alignment):
+    phoneme boundaries follow the aligned letters, and the silences around
+    and between words become rests up to `duration`.
+    """
+    words = word_phonemes(words, g2p)
+    with stage("timeline_build", len(words.phoneme_codes)):
+        ph_starts, ph_ends = distribute_aligned_time(alignment.token_starts, alignment.token_ends,
+                                                     alignment.token_owner, words.owner, words.weights())
+        return phoneme_timeline(words, alignment.word_starts, ph_starts, ph_ends, 0.0, duration)
+
+OUTPUT_FORMATS = ("json", "npz", "both")
+
+def write_timings(out_json_path, phoneme_timings, meta=None, output_format="json"):
+    """
+    Writes the timings (a VisemeTimeline or JSON entry dicts) as indented
+    JSON, as a compact columnar .npz next to it (see timeline_io.py), or both.
+    Returns the path of the primary file.
+    """
+    columnar = isinstance(phoneme_timings, VisemeTimeline)
+    with stage("write", len(phoneme_timings)):
+        save_dir = os.path.dirname(out_json_path)
+        if save_dir and not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        if output_format in ("npz", "both"):
+            npz_path = os.path.splitext(out_json_path)[0] + ".npz"
+            if columnar:
+                phoneme_timings.meta = meta or {}
+                phoneme_timings.save_npz(npz_path)
+            else:
+                VisemeTimeline.from_records(phoneme_timings, meta).save_npz(npz_path)
+            print("Phoneme timings NPZ saved to:", npz_path)
+            if output_format == "npz":
+                return npz_path
+
+        # Write final JSON output
+        if columnar:
+            phoneme_timings = phoneme_timings.to_records()
+        with open(out_json_path, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta or {}, "phoneme_timings": phoneme_timings}, f, indent=2)
+
+        print("Phoneme timings JSON saved to:", out_json_path)
+        return out_json_path
+
+def partial_output_path(out_json_path):
+    return os.path.splitext(out_json_path)[0] + ".partial.jsonl"
+
+def extract(audio_path, out_json_path, model, g2p, meta=None, chunk_seconds=0, overlap_seconds=2.0,
+            output_format="json", vad=True, energy_timing=True, transcript=None):
+    """
+    Transcribes `audio_path` with already loaded models and writes the timings JSON.
+    With `chunk_seconds` > 0 the audio is streamed in overlapping windows instead.
+    With `vad` only the detected speech is transcribed and silences become rests.
+    With `energy_timing` word edges are tightened to the voiced audio.
+    With a `transcript` file the script is force-aligned instead (extract_aligned);
+    if it cannot be aligned and a transcriber `model` is loaded, the clip is
+    transcribed after all.
+    """
     if not os.path.exists(audio_path):
-        print(f"ERROR: Audio file not found: {audio_path}", file=sys.stderr)
-        sys.exit(2)
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
     # Use the provided output path if available, otherwise use a default relative to the audio file
     if out_json_path is None:
-        out_json_path = os.path.splitext(audio_path)[0] + "_phonemes.json"
-    
+        out_json_path = default_output_path(audio_path)
+
+    if transcript:
+        try:
+            return extract_aligned(audio_path, out_json_path, transcript, g2p, meta, output_format, vad,
+                                   energy_timing)
+        except AlignmentError as e:
+            if model is None:
+                raise
+            print(f"WARNING: {e}; using Whisper timings instead of the transcript", file=sys.stderr)
+
+    if chunk_seconds > 0:
+        return extract_chunked(audio_path, out_json_path, model, g2p, meta, chunk_seconds, overlap_seconds,
+                               output_format, vad, energy_timing)
+
+    print("Transcribing with Whisper... (this may take some time)")
+    clip = load_clip(audio_path)
+    audio = clip.samples
+    word_timings, _ = transcribe_speech(model, audio, vad, clip.levels)
+    report_progress("g2p")
+    levels = clip.levels if energy_timing else None
+    if vad:
+        phoneme_timings = speech_phoneme_timings(word_timings, g2p, len(audio) / SAMPLE_RATE, levels=levels)
+    else:
+        phoneme_timings = build_phoneme_timings(word_timings, g2p, levels=levels)
+    report_progress("write")
+    return write_timings(out_json_path, phoneme_timings, meta, output_format)
+
+# ------------------------------------------------------------------------
+# FORCED ALIGNMENT MODE (Known script, no transcription, see forced_align.py)
+# ------------------------------------------------------------------------
+# The aligner is loaded on the first aligned clip, so a worker that only
+# ever transcribes never imports torchaudio.
+
+_aligner = None
+# Audio kept around the detected speech when cropping the clip for alignment
+ALIGN_PADDING = 0.3
+
+def load_aligner(threads=0):
+    global _aligner
+    if _aligner is None:
+        with stage("model_load"):
+            _aligner = CtcAligner(threads).load()
+        print(f"Loaded aligner {_aligner.spec} in {_aligner.load_seconds:.1f}s")
+    return _aligner
+
+def extract_aligned(audio_path, out_json_path, transcript_path, g2p, meta=None, output_format="json", vad=True,
+                    energy_timing=True):
+    """
+    Aligns the words of the text file `transcript_path` to `audio_path` and
+    writes the timings. With `vad` the leading and trailing silence is cropped
+    before alignment (it becomes rests either way). With `energy_timing` word
+    ends are carried through the voiced audio after their last letter.
+    """
+    words = transcript_words(read_transcript(transcript_path))
+    if not words:
+        raise ValueError(f"Transcript is empty: {transcript_path}")
+
+    clip = load_clip(audio_path)
+    start, end = 0, len(clip.samples)
+    if vad:
+        regions = detect_speech(clip.samples, SAMPLE_RATE, levels=clip.levels)
+        if len(regions):
+            start = max(0, int((regions[0, 0] - ALIGN_PADDING) * SAMPLE_RATE))
+            end = min(end, int((regions[-1, 1] + ALIGN_PADDING) * SAMPLE_RATE))
+
+    print(f"Aligning {len(words)} script words...")
+    report_progress("align")
+    aligner = load_aligner()
+    with stage("align", len(words)):
+        alignment = aligner.align(clip.samples[start:end], words, start / SAMPLE_RATE)
+        if energy_timing:
+            alignment.token_ends = extend_aligned_ends(alignment.token_starts, alignment.token_ends,
+                                                       alignment.token_owner, clip.levels)
+    report_progress("g2p")
+    phoneme_timings = aligned_phoneme_timings(words, alignment, g2p, clip.duration)
+    report_progress("write")
+    return write_timings(out_json_path, phoneme_timings, {**(meta or {}), **alignment_info()}, output_format)
+
+# ------------------------------------------------------------------------
+# CHUNKED MODE (Overlapping windows, flat memory, incremental output)
+# ------------------------------------------------------------------------
+# ffmpeg streams 16 kHz mono PCM through a pipe; only one window is held in
+# memory at a time. Windows advance by (chunk - overlap) seconds. A word
+# belongs to the window whose core (the window minus half the overlap on
+# each inner side) contains its midpoint, so every word is kept exactly once.
+# Phoneme entries are appended to <out>.partial.jsonl after every window so
+# Blender can start baking the beginning before the tail is transcribed.
+
+def iter_audio_chunks(audio_path, chunk_seconds, overlap_seconds):
+    """Yields (offset_seconds, float32 samples, is_last) windows of the decoded audio."""
+    sample_rate = SAMPLE_RATE
+    window = int(chunk_seconds * sample_rate)
+    step = window - int(overlap_seconds * sample_rate)
+    if step <= 0:
+        raise ValueError("overlap_seconds must be smaller than chunk_seconds")
+
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", audio_path,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    buffer = np.zeros(0, dtype=np.float32)
+    pending = b""
+    offset = 0
+    eof = False
+    try:
+        while True:
+            # Read one sample past the window to know whether another window follows.
+            while not eof and len(buffer) <= window:
+                data = pending + process.stdout.read((window + 1 - len(buffer)) * 2)
+                if len(data) == len(pending):
+                    eof = True
+                    break
+                cut = len(data) // 2 * 2
+                pending = data[cut:]
+                samples = np.frombuffer(data[:cut], np.int16).astype(np.float32) / 32768.0
+                buffer = np.concatenate([buffer, samples])
+
+            if len(buffer) == 0:
+                break
+            is_last = len(buffer) <= window
+            yield offset / sample_rate, buffer[:window], is_last
+            if is_last:
+                break
+            buffer = buffer[step:]
+            offset += step
+    finally:
+        process.stdout.close()
+        return_code = process.wait()
+    if return_code != 0 and offset == 0 and len(buffer) == 0:
+        raise RuntimeError(f"ffmpeg failed to decode {audio_path}")
+
+def iter_clip_chunks(samples, chunk_seconds, overlap_seconds):
+    """iter_audio_chunks() over already decoded (e.g. memory-mapped) samples."""
+    window = int(chunk_seconds * SAMPLE_RATE)
+    step = window - int(overlap_seconds * SAMPLE_RATE)
+    if step <= 0:
+        raise ValueError("overlap_seconds must be smaller than chunk_seconds")
+    offset = 0
+    while offset < len(samples):
+        is_last = offset + window >= len(samples)
+        yield offset / SAMPLE_RATE, samples[offset:offset + window], is_last
+        if is_last:
+            break
+        offset += step
+
+def extract_chunked(audio_path, out_json_path, model, g2p, meta, chunk_seconds, overlap_seconds,
+                    output_format="json", vad=True, energy_timing=True):
+    partial_path = partial_output_path(out_json_path)
     save_dir = os.path.dirname(out_json_path)
     if save_dir and not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
-    # Load Whisper model (ensure it's installed in the external Python environment)
-    model = whisper.load_model("base")
-    print("Transcribing with Whisper... (this may take some time)")
-    result = model.transcribe(audio_path, word_timestamps=True)
-
-    word_timings = []
-    if "segments" in result:
-        for segment in result["segments"]:
-            if "words" in segment:
-                for word in segment["words"]:
-                    w = word["word"].strip()
-                    start = word.get("start", None)
-                    end = word.get("end", None)
-                    if start is None or end is None:
-                        continue
-                    word_timings.append((w, float(start), float(end)))
-
-    g2p = G2p()
+    half_overlap = overlap_seconds / 2.0
     phoneme_timings = []
+    # With VAD the leading silence is a rest from 0 like every other gap
+    last_end = 0.0 if vad else None
 
-    # Process word timings into phoneme/viseme timings (using average duration)
-    for w, start, end in word_timings:
-        phonemes = g2p(w)
-        phonemes = remove_stress(phonemes)
-        phonemes = [p for p in phonemes if p.isalpha()]
-        
-        # Add a rest viseme if there's a gap before the word starts (heuristic)
-        if phoneme_timings and start > phoneme_timings[-1]['end'] + 0.05:
-             # Insert a 'Rest' gap
-             phoneme_timings.append({
-                 "phoneme": "REST",
-                 "start": round(phoneme_timings[-1]['end'], 4),
-                 "end": round(start, 4),
-                 "word": "",
-                 "viseme": "Rest/Neutral"
-             })
-
-        if not phonemes:
-            # Handle words that can't be transcribed (e.g., numbers, punctuation)
-            continue
-            
-        duration = (end - start) / len(phonemes)
-        current_start = start
-        
-        for ph in phonemes:
-            ph_start = current_start
-            ph_end = ph_start + duration
-            viseme = classify_viseme(ph)
-            
-            phoneme_timings.append({
-                "phoneme": ph,
-                "start": round(ph_start, 4),
-                "end": round(ph_end, 4),
-                "word": w,
-                "viseme": viseme
-            })
-            current_start = ph_end
-
-    # Write final JSON output
-    with open(out_json_path, "w", encoding="utf-8") as f:
-        json.dump({"phoneme_timings": phoneme_timings}, f, indent=2)
-
-    print("Phoneme timings JSON saved to:", out_json_path)
+    # A clip already in the audio cache is windowed from the memory map; otherwise
+    # ffmpeg streams it, so long takes never sit in memory whole.
+    clip = cached_clip(audio_path)
+    if clip is not None:
+        chunks = iter_clip_chunks(clip.samples, chunk_seconds, overlap_seconds)
+    else:
+        chunks = iter_audio_chunks(audio_path, chunk_seconds, overlap_seconds)
+
+    with open(partial_path, "w", encoding="utf-8") as partial:
+        for index, (offset, samples, is_last) in enumerate(chunks):
+            print(f"Transcribing chunk {index + 1} at {offset:.1f}s...")
+            core_start = offset + half_overlap if index > 0 else float("-inf")
+            core_end = offset + chunk_seconds - half_overlap if not is_last else float("inf")
+
+            word_timings = []
+            # One RMS pass per window serves both VAD and energy timing
+            window_levels = frame_levels(samples, SAMPLE_RATE)
+            window_words, _ = transcribe_speech(model, samples, vad, window_levels)
+            for w, start, end in window_words:
+                start += offset
+                end += offset
+                if core_start <= (start + end) / 2.0 < core_end:
+                    word_timings.append((w, start, end))
+
+            # Whisper may place a word slightly before the end of the previous one.
+            if last_end is not None:
+                word_timings = [(w, max(start, last_end), max(end, last_end)) for w, start, end in word_timings]
+
+            levels = window_levels if energy_timing else None
+            if vad and is_last:
+                chunk_timings = speech_phoneme_timings(word_timings, g2p, offset + len(samples) / SAMPLE_RATE,
+                                                       last_end, levels, offset)
+            else:
+                chunk_timings = build_phoneme_timings(word_timings, g2p, last_end, levels, offset)
+            chunk_timings = chunk_timings.to_records()
+            for entry in chunk_timings:
+                partial.write(json.dumps(entry) + "\n")
+            partial.flush()
+            report_progress("chunk", None)
+
+            phoneme_timings.extend(chunk_timings)
+            if phoneme_timings:
+                last_end = phoneme_timings[-1]["end"]
+
+    report_progress("write")
+    out_path = write_timings(out_json_path, phoneme_timings, meta, output_format)
+    os.remove(partial_path)
+    return out_path
+
+def main(audio_path, out_json_path=None, model_name="base", pronunciations=DEFAULT_STORE_PATH, threads=0, g2p_jobs=0,
+         **options):
+    print(f"Python executable running this script: {sys.executable}")
+
+    if not os.path.exists(audio_path):
+        print(f"ERROR: Audio file not found: {audio_path}", file=sys.stderr)
+        sys.exit(2)
+
+    model = aligner = None
+    if options.get("transcript"):
+        # Forced alignment only needs the transcriber if the script cannot be aligned
+        aligner, g2p = load_aligner(threads), CachedG2p(pronunciations, jobs=g2p_jobs)
+        try:
+            out_json_path = extract(audio_path, out_json_path, None, g2p, alignment_info(), **options)
+        except AlignmentError as e:
+            print(f"WARNING: {e}; using Whisper timings instead of the transcript", file=sys.stderr)
+            with stage("model_load"):
+                model = create_transcriber(model_name, threads).load()
+            print(f"Loaded transcriber {model.spec} in {model.load_seconds:.1f}s")
+            options = {**options, "transcript": None}
+            out_json_path = extract(audio_path, out_json_path, model, g2p, pipeline_info(model_name), **options)
+    else:
+        model, g2p = load_models(model_name, pronunciations, threads, g2p_jobs)
+        out_json_path = extract(audio_path, out_json_path, model, g2p, pipeline_info(model_name), **options)
+    if aligner is not None:
+        print(f"Aligner: {aligner.stats()}")
+    if model is not None:
+        print(f"Transcriber: {model.stats()}")
+    if _audio_cache is not None:
+        print(f"Audio cache: {_audio_cache.stats()}")
+    print(f"G2P cache: {g2p.stats()}")
+    g2p.close()
     print(out_json_path)
 
+# ------------------------------------------------------------------------
+# WORKER MODE (One long-lived process, models stay loaded between jobs)
+# ------------------------------------------------------------------------
+# Protocol: one JSON object per line.
+#   stdin  <- {"id": 1, "audio": "...", "out": "...", "options": {...}}  or  {"cmd": "shutdown"}
+#             (options are extract() keyword arguments, e.g. chunk_seconds;
+#             "trace": true also returns the job's trace events)
+#   stdout -> {"event": "ready", "profile": {...}} once, then {"id": 1, "ok": true, "out": "..."}
+#             or {"id": 1, "ok": false, "error": "..."} per job, preceded by
+#             {"event": "progress", "id": 1, "stage": "...", "percent": 0-100|null}.
+#             Results carry the job's per-stage "profile" (profiling.py).
+# Everything else (prints, Whisper logs) goes to stderr.
+
+def run_worker(model_name="base", pronunciations=DEFAULT_STORE_PATH, threads=0, g2p_jobs=0):
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    def send(message):
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    global _progress_callback
+    current_job = {"id": None}
+
+    def send_progress(stage, percent):
+        send({"event": "progress", "id": current_job["id"], "stage": stage, "percent": percent})
+
+    _progress_callback = send_progress
+
+    print(f"Whisper worker starting with {sys.executable}")
+    report_progress("model_load")
+    model, g2p = load_models(model_name, pronunciations, threads, g2p_jobs)
+    meta = pipeline_info(model_name)
+    send({"event": "ready", "pid": os.getpid(), "profile": profiler.summary(), **meta})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            send({"ok": False, "error": f"Invalid job: {e}"})
+            continue
+
+        if job.get("cmd") == "shutdown":
+            break
+
+        job_id = job.get("id")
+        current_job["id"] = job_id
+        profiler.reset(trace=bool(job.get("trace")))
+        try:
+            out_path = extract(job["audio"], job.get("out"), model, g2p, meta, **job.get("options", {}))
+            result = {"id": job_id, "ok": True, "out": out_path, "g2p_stats": g2p.stats(),
+                      "transcriber_stats": model.stats()}
+        except Exception as e:
+            result = {"id": job_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        result["profile"] = profiler.summary()
+        if profiler.tracing:
+            result["trace_events"] = profiler.events
+        send(result)
+    g2p.close()
+
+# ------------------------------------------------------------------------
+# BATCH MODE (Whole folders / manifests, one model, a pool for the rest)
+# ------------------------------------------------------------------------
+# The main process holds the only Whisper model and transcribes clip after
+# clip. Audio decoding (ffmpeg) for upcoming clips and G2P + writing for
+# finished clips run in a process pool alongside it. Decoding runs at most
+# DECODE_AHEAD clips ahead per pool process: without the audio cache every
+# decoded clip comes back as full PCM and waits in the main process.
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac")
+DECODE_AHEAD = 2
+
+def collect_batch_clips(batch_path, out_dir=None):
+    """
+    Returns [(audio_path, out_json_path, transcript_path)] for a directory of
+    clips or a manifest. A manifest is a .json list (of paths or {"audio", "out",
+    "transcript"} objects) or a text file with one audio path per line. Clips
+    with a transcript are force-aligned (transcript_path is None otherwise).
+    """
+    entries = []
+    if os.path.isdir(batch_path):
+        for name in sorted(os.listdir(batch_path)):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                entries.append({"audio": os.path.join(batch_path, name)})
+    else:
+        base_dir = os.path.dirname(os.path.abspath(batch_path))
+        with open(batch_path, "r", encoding="utf-8") as f:
+            if batch_path.lower().endswith(".json"):
+                manifest = json.load(f)
+                if isinstance(manifest, dict):
+                    manifest = manifest.get("clips", [])
+                entries = [e if isinstance(e, dict) else {"audio": e} for e in manifest]
+            else:
+                entries = [{"audio": line.strip()} for line in f if line.strip() and not line.startswith("#")]
+        for entry in entries:
+            entry["audio"] = os.path.join(base_dir, entry["audio"])
+            if entry.get("transcript"):
+                entry["transcript"] = os.path.join(base_dir, entry["transcript"])
+
+    clips = []
+    for entry in entries:
+        audio_path = os.path.abspath(entry["audio"])
+        out_path = entry.get("out")
+        if out_path is None and out_dir:
+            out_path = os.path.join(out_dir, os.path.basename(default_output_path(audio_path)))
+        clips.append((audio_path, out_path or default_output_path(audio_path), entry.get("transcript")))
+    return clips
+
+_pool_g2p = None
+
+def _init_pool_worker(pronunciations, audio_cache_dir=None, audio_cache_mb=2048):
+    global _pool_g2p
+    _pool_g2p = CachedG2p(pronunciations)
+    configure_audio_cache(audio_cache_dir, audio_cache_mb)
+
+def _decode_clip(audio_path):
+    # With the audio cache only the digest goes back; the main process maps the
+    # cached samples instead of receiving them pickled through the pool.
+    started = time.perf_counter()
+    try:
+        clip = load_clip(audio_path)
+        payload = clip.digest if _audio_cache is not None else clip
+        return payload, None, time.perf_counter() - started
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+def _finish_clip(out_json_path, word_timings, meta, output_format, duration=None, levels=None):
+    started = time.perf_counter()
+    if duration is None:
+        phoneme_timings = build_phoneme_timings(word_timings, _pool_g2p, levels=levels)
+    else:
+        phoneme_timings = speech_phoneme_timings(word_timings, _pool_g2p, duration, levels=levels)
+    out_path = write_timings(out_json_path, phoneme_timings, meta, output_format)
+    return out_path, len(phoneme_timings), time.perf_counter() - started, _pool_g2p.stats()
+
+def decode_ahead(pool, audio_paths, ahead):
+    """Like pool.imap(_decode_clip, audio_paths), with at most `ahead` clips decoded but not yet taken."""
+    pending = collections.deque()
+    for audio_path in audio_paths:
+        pending.append(pool.apply_async(_decode_clip, (audio_path,)))
+        if len(pending) > ahead:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def run_batch(batch_path, out_dir=None, jobs=None, model_name="base", report_path=None,
+              pronunciations=DEFAULT_STORE_PATH, output_format="json", vad=True, energy_timing=True, threads=0):
+    """Extracts every clip of a folder or manifest. Returns the number of failed clips."""
+    batch_started = time.perf_counter()
+    clips = collect_batch_clips(batch_path, out_dir)
+    jobs = jobs or max(1, (os.cpu_count() or 2) - 1)
+    print(f"Batch: {len(clips)} clips, {jobs} pool processes, model '{model_name}', VAD {'on' if vad else 'off'}")
+
+    model = create_transcriber(model_name, threads).load()
+    meta = pipeline_info(model_name)
+
+    results = []
+    aligned_g2p = None
+    cache_args = (_audio_cache.cache_dir, _audio_cache.max_bytes // (1024 * 1024)) if _audio_cache else ()
+    with multiprocessing.Pool(jobs, initializer=_init_pool_worker, initargs=(pronunciations,) + cache_args) as pool:
+        # Decoding runs ahead of the transcription loop, in clip order.
+        decoded = decode_ahead(pool, [audio_path for audio_path, _, _ in clips], DECODE_AHEAD * jobs)
+        pending = []
+        for (audio_path, out_path, transcript), (clip, error, decode_s) in zip(clips, decoded):
+            report = {"audio": audio_path, "out": out_path, "decode_s": round(decode_s, 3)}
+            results.append(report)
+            if error:
+                report.update(ok=False, error=error)
+                print(f"[batch] decode failed for {audio_path}: {error}", file=sys.stderr)
+                continue
+
+            started = time.perf_counter()
+            if transcript:
+                report["transcript"] = transcript
+                aligned_g2p = aligned_g2p or CachedG2p(pronunciations)
+                try:
+                    report["out"] = extract_aligned(audio_path, out_path, transcript, aligned_g2p, meta, output_format,
+                                                    vad, energy_timing)
+                    report.update(ok=True, aligned=True, align_s=round(time.perf_counter() - started, 3))
+                    continue
+                except AlignmentError as e:
+                    print(f"[batch] WARNING: {e}; using Whisper timings for {audio_path}", file=sys.stderr)
+                except Exception as e:
+                    report.update(ok=False, error=f"{type(e).__name__}: {e}")
+                    continue
+                started = time.perf_counter()
+            try:
+                if isinstance(clip, str):
+                    clip = _audio_cache.get(clip, SAMPLE_RATE) or load_clip(audio_path)
+                audio = clip.samples
+                word_timings, speech_s = transcribe_speech(model, audio, vad, clip.levels)
+            except Exception as e:
+                report.update(ok=False, error=f"{type(e).__name__}: {e}")
+                continue
+            report["transcribe_s"] = round(time.perf_counter() - started, 3)
+            report["audio_s"] = round(len(audio) / SAMPLE_RATE, 3)
+            report["speech_s"] = round(speech_s, 3)
+            report["words"] = len(word_timings)
+            duration = len(audio) / SAMPLE_RATE if vad else None
+            # Frame levels are small (one float per 30 ms), unlike the samples
+            levels = np.asarray(clip.levels) if energy_timing else None
+            pending.append((report, pool.apply_async(
+                _finish_clip, (out_path, word_timings, meta, output_format, duration, levels)
+            )))
+            print(f"[batch] transcribed {audio_path} in {report['transcribe_s']}s")
+
+        for report, async_result in pending:
+            try:
+                out_path, phoneme_count, g2p_s, g2p_stats = async_result.get()
+                report.update(ok=True, out=out_path, phonemes=phoneme_count, g2p_s=round(g2p_s, 3),
+                              g2p_cache=g2p_stats)
+            except Exception as e:
+                report.update(ok=False, error=f"{type(e).__name__}: {e}")
+
+    if aligned_g2p is not None:
+        aligned_g2p.close()
+    failed = sum(1 for report in results if not report.get("ok"))
+    summary = {
+        "meta": meta,
+        "jobs": jobs,
+        "model_load_s": round(model.load_seconds, 3),
+        "transcriber": model.stats(),
+        "audio_cache": _audio_cache.cache_dir if _audio_cache else None,
+        "stages": profiler.summary(),
+        "total_s": round(time.perf_counter() - batch_started, 3),
+        "clips": results,
+        "failed": failed,
+    }
+    if report_path is None:
+        report_path = os.path.join(out_dir or os.path.dirname(os.path.abspath(batch_path)),
+                                   "batch_report.json")
+    report_dir = os.path.dirname(report_path)
+    if report_dir and not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    stats = model.stats()
+    print(f"Batch finished: {len(results) - failed} ok, {failed} failed, "
+          f"{stats['realtime_factor']}x realtime ({stats['spec']}). Report: {report_path}")
+    return failed
+
+# ------------------------------------------------------------------------
+# BACKEND COMPARISON (Throughput and agreement of transcriber specs)
+# ------------------------------------------------------------------------
+# Every spec transcribes the same decoded clips; the first spec is the
+# reference the others' word error rates are measured against.
+
+def _normalize_words(word_timings):
+    return [w.lower().strip(".,!?;:\"'") for w, _, _ in word_timings]
+
+def word_error_rate(reference, hypothesis):
+    """Levenshtein distance between two word lists over the reference length."""
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / float(len(reference))
+
+def compare_backends(audio_paths, specs, threads=0, vad=True, report_path=None):
+    """Transcribes `audio_paths` with every spec and reports load time, throughput and WER."""
+    clips = [(audio_path, load_audio(audio_path)) for audio_path in audio_paths]
+    reference = None
+    rows = []
+    for spec in specs:
+        row = {"spec": spec}
+        rows.append(row)
+        try:
+            model = create_transcriber(spec, threads).load()
+            words = [_normalize_words(transcribe_speech(model, audio, vad)[0]) for _, audio in clips]
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+            print(f"[compare] {spec} failed: {row['error']}", file=sys.stderr)
+            continue
+        row.update(model.stats())
+        row["words"] = sum(len(clip_words) for clip_words in words)
+        if reference is None:
+            reference = words
+        row["wer"] = round(float(np.mean([word_error_rate(r, h) for r, h in zip(reference, words)])), 4)
+
+    print(f"{'spec':40} {'load s':>8} {'audio s':>8} {'busy s':>8} {'x rt':>7} {'words':>6} {'WER':>7}")
+    for row in rows:
+        if "error" in row:
+            print(f"{row['spec']:40} failed: {row['error']}")
+            continue
+        print(f"{row['spec']:40} {row['load_s']:8.2f} {row['audio_s']:8.1f} {row['transcribe_s']:8.2f} "
+              f"{row['realtime_factor'] or 0:7.1f} {row['words']:6d} {row['wer']:7.3f}")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"clips": audio_paths, "threads": threads, "vad": vad, "backends": rows}, f, indent=2)
+        print(f"Comparison report: {report_path}")
+    return rows
+
+def run_command(parser, args):
+    """Runs the mode selected on the command line; returns the exit code."""
+    if args.seed_pronunciations:
+        store = CachedG2p(args.pronunciations)
+        print(f"Seeded {store.seed_file(args.seed_pronunciations)} pronunciations into {args.pronunciations}")
+        store.close()
+    elif args.transcript and not args.audio:
+        parser.error("--transcript aligns a single --audio clip")
+    elif args.worker:
+        run_worker(args.model, args.pronunciations, args.threads, args.g2p_jobs)
+    elif args.compare_backends:
+        if not (args.audio or args.batch):
+            parser.error("--compare-backends needs --audio or --batch clips")
+        audio_paths = [args.audio] if args.audio else [audio for audio, _, _ in collect_batch_clips(args.batch)]
+        compare_backends(audio_paths, args.compare_backends, args.threads, not args.no_vad, args.report)
+    elif args.batch:
+        failed = run_batch(args.batch, args.out_dir, args.jobs, args.model, args.report, args.pronunciations,
+                           args.format, not args.no_vad, not args.no_energy_timing, args.threads)
+        return 1 if failed else 0
+    elif args.audio:
+        main(args.audio, args.out, args.model, args.pronunciations, args.threads, args.g2p_jobs,
+             chunk_seconds=args.chunk_seconds, overlap_seconds=args.overlap_seconds,
+             output_format=args.format, vad=not args.no_vad, energy_timing=not args.no_energy_timing,
+             transcript=args.transcript)
+    else:
+        parser.error("--audio is required unless --worker, --batch or --seed-pronunciations is given")
+    return 0
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--audio", required=True, help="Path to audio file")
+    parser.add_argument("--audio", required=False, help="Path to audio file")
     parser.add_argument("--out", required=False, help="Path to output JSON (phoneme timings)")
+    parser.add_argument("--model", default="base",
+                        help="Transcriber spec: a Whisper model name or backend:model[:compute_type], "
+                             "e.g. faster-whisper:small:int8")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="CPU threads for the transcriber (0 = backend default)")
+    parser.add_argument("--transcript",
+                        help="Text file with the clip's script: force-align it instead of transcribing "
+                             "(Whisper is only loaded if the script cannot be aligned)")
+    parser.add_argument("--compare-backends", nargs="+", metavar="SPEC",
+                        help="Transcribe --audio / --batch clips with every spec and report throughput and WER")
+    parser.add_argument("--worker", action="store_true",
+                        help="Run as a persistent worker reading JSON jobs from stdin")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json",
+                        help="Timing file format: indented JSON, compact columnar .npz, or both")
+    parser.add_argument("--chunk-seconds", type=float, default=0,
+                        help="Transcribe in overlapping windows of this length (0 = whole file)")
+    parser.add_argument("--overlap-seconds", type=float, default=2.0,
+                        help="Overlap between chunk windows")
+    parser.add_argument("--no-vad", action="store_true",
+                        help="Transcribe the whole audio instead of only the detected speech")
+    parser.add_argument("--no-energy-timing", action="store_true",
+                        help="Keep Whisper's word edges instead of tightening them to the voiced audio")
+    parser.add_argument("--audio-cache", default=DEFAULT_AUDIO_CACHE_DIR,
+                        help="Folder of decoded clips (memory-mapped .npy) reused across runs")
+    parser.add_argument("--audio-cache-mb", type=int, default=2048,
+                        help="Size limit of the decoded audio cache")
+    parser.add_argument("--no-audio-cache", action="store_true",
+                        help="Decode every clip with ffmpeg instead of using the audio cache")
+    parser.add_argument("--pronunciations", default=DEFAULT_STORE_PATH,
+                        help="SQLite pronunciation store used to memoize G2P")
+    parser.add_argument("--g2p-jobs", type=int, default=0,
+                        help="Processes converting new words when a transcript has many of them "
+                             "(0 = one per CPU but one, 1 = none)")
+    parser.add_argument("--seed-pronunciations",
+                        help="JSON or CMU-dict file of pronunciations to add to the store, then exit")
+    parser.add_argument("--batch", help="Folder of clips or manifest (.json / .txt) to extract")
+    parser.add_argument("--out-dir", help="Batch: folder for the timing files (default: next to each clip)")
+    parser.add_argument("--jobs", type=int, help="Batch: number of pool processes for decoding and G2P")
+    parser.add_argument("--report", help="Batch / comparison: path of the JSON summary report")
+    parser.add_argument("--profile", help="Write cProfile stats of the run to this file (.prof)")
+    parser.add_argument("--trace", help="Write the run's stages as Chrome trace-event JSON to this file")
     args = parser.parse_args()
-    main(args.audio, args.out)
\ No newline at end of file
+    configure_audio_cache(None if args.no_audio_cache else args.audio_cache, args.audio_cache_mb)
+    profiler.reset(trace=bool(args.trace))
+    with cprofile(args.profile):
+        exit_code = run_command(parser, args)
+    if not args.worker and profiler.totals:
+        print(format_run(profiler.finish("open_AI_whisper")))
+    if args.trace:
+        print(f"Trace events saved to: {profiler.write_trace(args.trace)}")
+    sys.exit(exit_code)
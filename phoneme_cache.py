@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import shutil
+
+from .digests import audio_digest
+from .g2p_cache import DEFAULT_STORE_PATH, seed_digest
+from .phoneme_map import PHONEME_TO_VISEME
+
+
+# ------------------------------------------------------------------------
+# CONTENT-ADDRESSED PHONEME CACHE
+# ------------------------------------------------------------------------
+# Entries are keyed on the audio bytes plus everything that changes the
+# result: pipeline version, Whisper model, G2P version, seeded
+# pronunciations, extraction options and the phoneme -> viseme mapping.
+# The G2P version is only known inside the external Python, so it is taken
+# from the "meta" block of the last extraction and remembered here.
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blender_lipsync")
+ENVIRONMENT_FILE = "environment.json"
+ENTRY_EXTENSIONS = (".json", ".npz")
+
+# Bump whenever open_AI_whisper.py produces different timings from the same
+# inputs (VAD, duration model, alignment, rests), so older entries stop matching.
+PIPELINE_VERSION = 1
+
+# open_AI_whisper.extract() keyword defaults, kept in step with it. Options are
+# hashed with these filled in, so changing a default invalidates older entries.
+EXTRACT_DEFAULTS = {
+    "chunk_seconds": 0,
+    "overlap_seconds": 2.0,
+    "output_format": "json",
+    "vad": True,
+    "energy_timing": True,
+    "transcript": None,
+}
+
+def resolved_options(options=None):
+    """Extraction options with every default filled in."""
+    return {**EXTRACT_DEFAULTS, **(options or {})}
+
+
+class PhonemeCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 * 1024, store_path=DEFAULT_STORE_PATH):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        # The worker's pronunciation store (g2p_cache.py), for its seed digest
+        self.store_path = store_path
+
+    def cache_key(self, audio_path, model_name, g2p_version, options=None):
+        sha = hashlib.sha256()
+        sha.update(audio_digest(audio_path).encode())
+        sha.update(f"|{PIPELINE_VERSION}|{model_name}|{g2p_version}|{seed_digest(self.store_path)}|".encode())
+        sha.update(json.dumps(resolved_options(options), sort_keys=True).encode())
+        sha.update(json.dumps(PHONEME_TO_VISEME, sort_keys=True).encode())
+        return sha.hexdigest()
+
+    def lookup_key(self, audio_path, model_name, options=None):
+        """Returns the key for `audio_path`, or None while the G2P version is still unknown."""
+        g2p_version = self.load_environment().get("g2p_version")
+        if g2p_version is None:
+            return None
+        return self.cache_key(audio_path, model_name, g2p_version, options)
+
+    def get(self, key):
+        """Returns the cached file for `key` (and marks it recently used), or None."""
+        for extension in ENTRY_EXTENSIONS:
+            path = self._entry_path(key, extension)
+            if os.path.exists(path):
+                os.utime(path, None)
+                return path
+        return None
+
+    def put(self, key, src_path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key, os.path.splitext(src_path)[1])
+        tmp_path = path + ".tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_EXTENSIONS) and entry.name != ENVIRONMENT_FILE:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def load_environment(self):
+        try:
+            with open(os.path.join(self.cache_dir, ENVIRONMENT_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_environment(self, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, ENVIRONMENT_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"g2p_version": meta.get("g2p_version")}, f)
+
+    def _entry_path(self, key, extension):
+        return os.path.join(self.cache_dir, key + extension)
@@ -0,0 +1,162 @@
+import numpy as np
+
+from vad import FRAME_SECONDS, speech_threshold
+
+
+# ------------------------------------------------------------------------
+# PHONEME DURATION MODEL
+# ------------------------------------------------------------------------
+# Whisper gives word boundaries only. Each word's time is shared out among
+# its phonemes in proportion to their typical durations (mean durations in
+# ms of read American English, rounded), so vowels and fricatives get more
+# time than taps and stop releases. Everything below works on whole clips
+# at once: one array entry per phoneme, `owner` maps a phoneme to its word.
+
+PHONEME_DURATION_MS = {
+    # Vowels and diphthongs
+    "AA": 130, "AE": 140, "AH": 80, "AO": 130, "AW": 160, "AY": 150, "EH": 100, "ER": 120,
+    "EY": 130, "IH": 80, "IY": 110, "OW": 140, "OY": 170, "UH": 80, "UW": 120,
+    # Stops and affricates (closure + release)
+    "P": 80, "B": 65, "T": 70, "D": 55, "K": 80, "G": 70, "CH": 100, "JH": 90,
+    # Fricatives
+    "F": 100, "V": 60, "TH": 90, "DH": 45, "S": 110, "Z": 85, "SH": 115, "ZH": 80, "HH": 65,
+    # Nasals, liquids and glides
+    "M": 70, "N": 60, "NG": 75, "L": 65, "R": 70, "W": 60, "Y": 60,
+}
+DEFAULT_DURATION_MS = 80
+
+# The silent closure before a stop belongs to the word, so words starting
+# with one keep their start when trimmed to the audio energy.
+STOP_PHONEMES = frozenset(("P", "B", "T", "D", "K", "G"))
+
+
+def duration_weights(phonemes):
+    """Relative duration weight of each phoneme (float64 array)."""
+    return np.array([PHONEME_DURATION_MS.get(p, DEFAULT_DURATION_MS) for p in phonemes], dtype=np.float64)
+
+
+def distribute_word_time(word_starts, word_ends, owner, weights):
+    """
+    Splits every word's [start, end) among its phonemes by weight. `owner`
+    holds the word index of each phoneme, in word order. Returns
+    (phoneme_starts, phoneme_ends); each word's last phoneme ends at the word end.
+    """
+    word_starts = np.asarray(word_starts, dtype=np.float64)
+    word_ends = np.asarray(word_ends, dtype=np.float64)
+    if not len(owner):
+        return np.empty(0), np.empty(0)
+
+    totals = np.bincount(owner, weights=weights, minlength=len(word_starts))
+    cumulative = np.cumsum(weights)
+    # Weight sum of the earlier words, subtracted to restart the sum per word
+    before_word = np.concatenate([[0.0], np.cumsum(totals)])[owner]
+    fraction_end = (cumulative - before_word) / totals[owner]
+
+    ends = word_starts[owner] + fraction_end * (word_ends - word_starts)[owner]
+    first = np.insert(owner[1:] != owner[:-1], 0, True)
+    last = np.append(first[1:], True)
+    ends[last] = word_ends[owner[last]]
+    # Each phoneme starts exactly where the previous one of its word ends
+    starts = np.where(first, word_starts[owner], np.roll(ends, 1))
+    return starts, ends
+
+
+def refine_word_bounds(word_starts, word_ends, levels, offset=0.0, keep_start=None, max_trim=0.3,
+                       frame_seconds=FRAME_SECONDS):
+    """
+    Tightens word boundaries to the voiced frames inside each word window.
+    `levels` are frame levels in dBFS (vad.frame_levels) for audio starting at
+    `offset` seconds. At most `max_trim` of a word is cut at either end; words
+    without voiced frames, and starts flagged in `keep_start`, are unchanged.
+    """
+    word_starts = np.asarray(word_starts, dtype=np.float64)
+    word_ends = np.asarray(word_ends, dtype=np.float64)
+    if not len(word_starts) or not len(levels):
+        return word_starts, word_ends
+
+    voiced = np.flatnonzero(levels > speech_threshold(levels))
+    if not len(voiced):
+        return word_starts, word_ends
+    first_frame = np.floor((word_starts - offset) / frame_seconds).astype(np.int64)
+    end_frame = np.ceil((word_ends - offset) / frame_seconds).astype(np.int64)
+
+    # First and last voiced frame inside [first_frame, end_frame) of every word
+    lo = np.searchsorted(voiced, first_frame, side="left")
+    hi = np.searchsorted(voiced, end_frame, side="left") - 1
+    has_voice = (lo <= hi) & (lo < len(voiced))
+    lo = np.minimum(lo, len(voiced) - 1)
+    hi = np.clip(hi, 0, len(voiced) - 1)
+
+    durations = word_ends - word_starts
+    voice_start = offset + voiced[lo] * frame_seconds
+    voice_end = offset + (voiced[hi] + 1) * frame_seconds
+    starts = np.where(has_voice, np.clip(voice_start, word_starts, word_starts + max_trim * durations), word_starts)
+    ends = np.where(has_voice, np.clip(voice_end, word_ends - max_trim * durations, word_ends), word_ends)
+    if keep_start is not None:
+        starts = np.where(keep_start, word_starts, starts)
+    return starts, ends
+
+
+def distribute_aligned_time(token_starts, token_ends, token_owner, owner, weights):
+    """
+    Like distribute_word_time() for force-aligned words (forced_align.py): each
+    word's phonemes still split it by weight, but along the word's aligned
+    letters instead of linear time, so a phoneme lands where the letters at the
+    same relative position were heard. `token_owner` holds the word index of
+    each letter span, `owner` that of each phoneme; every word has a letter.
+    Returns (phoneme_starts, phoneme_ends).
+    """
+    token_starts = np.asarray(token_starts, dtype=np.float64)
+    token_ends = np.asarray(token_ends, dtype=np.float64)
+    token_owner = np.asarray(token_owner, dtype=np.intp)
+    if not len(owner):
+        return np.empty(0), np.empty(0)
+
+    word_count = int(token_owner[-1]) + 1
+    counts = np.bincount(token_owner, minlength=word_count)
+    first_token = np.cumsum(counts) - counts
+    # One knot per letter start plus one at each word end; word w's knots are
+    # shifted by w so neighbouring words never share a position
+    knot_positions = np.concatenate([np.arange(len(token_owner)) + token_owner,
+                                     first_token + counts + np.arange(word_count)])
+    knot_times = np.concatenate([token_starts, token_ends[first_token + counts - 1]])
+    order = np.argsort(knot_positions, kind="stable")
+    knot_positions, knot_times = knot_positions[order], knot_times[order]
+
+    totals = np.bincount(owner, weights=weights, minlength=word_count)
+    before_word = np.concatenate([[0.0], np.cumsum(totals)])[owner]
+    fraction_end = (np.cumsum(weights) - before_word) / totals[owner]
+    ends = np.interp(first_token[owner] + owner + fraction_end * counts[owner], knot_positions, knot_times)
+
+    first = np.insert(owner[1:] != owner[:-1], 0, True)
+    starts = np.where(first, token_starts[first_token[owner]], np.roll(ends, 1))
+    return starts, ends
+
+
+def extend_aligned_ends(token_starts, token_ends, token_owner, levels, offset=0.0, max_extend=0.3,
+                        frame_seconds=FRAME_SECONDS):
+    """
+    CTC puts a letter on the frame it is recognised in, so a held final sound
+    ends early. Extends the last letter of each word through the voiced frames
+    after it (`levels` as in refine_word_bounds), by at most `max_extend`
+    seconds and never past the next word's first letter. Returns new token_ends.
+    """
+    token_starts = np.asarray(token_starts, dtype=np.float64)
+    token_ends = np.array(token_ends, dtype=np.float64)
+    token_owner = np.asarray(token_owner, dtype=np.intp)
+    if not len(token_owner) or not len(levels):
+        return token_ends
+
+    voiced = levels > speech_threshold(levels)
+    # First unvoiced frame at or after every frame
+    frame_count = len(voiced)
+    unvoiced_at = np.where(voiced, frame_count, np.arange(frame_count))
+    next_unvoiced = np.minimum.accumulate(unvoiced_at[::-1])[::-1]
+
+    last = np.flatnonzero(np.append(token_owner[1:] != token_owner[:-1], True))
+    ends = token_ends[last]
+    frames = np.clip(np.floor((ends - offset) / frame_seconds).astype(np.int64), 0, frame_count - 1)
+    voice_end = offset + next_unvoiced[frames] * frame_seconds
+    limit = np.minimum(ends + max_extend, np.append(token_starts[last[:-1] + 1], np.inf))
+    token_ends[last] = np.maximum(ends, np.minimum(voice_end, limit))
+    return token_ends
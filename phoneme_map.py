@@ -0,0 +1,15 @@
+# Phoneme to Viseme Mapping (Your existing mapping is used here)
+PHONEME_TO_VISEME = {
+    "REST": "Rest/Neutral",
+    "P": "ClosedLips", "B": "ClosedLips", "M": "ClosedLips",
+    "AA": "LipOpenSmall", "AH": "LipOpenSmall", "AO": "LipOpenSmall",
+    "AE": "LipWide", "EH": "LipWide", "AY": "LipWide",
+    "AW": "LipOpenBig", "EY": "LipOpenBig",
+    "UW": "OO", "UH": "OO", "OW": "OO",
+    "IY": "EE", "IH": "EE", "Y": "EE",
+    "F": "FV", "V": "FV",
+    "TH": "TH", "DH": "TH",
+    "CH": "ChSh", "JH": "ChSh", "SH": "ChSh", "ZH": "ChSh", "S": "ChSh", "Z": "ChSh",
+    "K": "KG", "G": "KG", "NG": "KG",
+    "L": "LR", "R": "LR"
+}
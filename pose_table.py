@@ -0,0 +1,126 @@
+import json
+import os
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# POSE TABLE LAYOUT
+# ------------------------------------------------------------------------
+# Every pose is stored as 10 floats per bone:
+#   [0:3] location, [3:7] rotation_quaternion (w, x, y, z), [7:10] scale
+
+DEFAULT_POSE_TABLE_PATH = os.path.join(os.path.dirname(__file__), "viseme_poses.json")
+# Brow / eyelid / cheek poses for the emotion layer, same layout with an
+# "expressions" block instead of "visemes" (see emotion.py)
+DEFAULT_EXPRESSION_TABLE_PATH = os.path.join(os.path.dirname(__file__), "expression_poses.json")
+
+CHANNEL_SLICES = {
+    "location": slice(0, 3),
+    "rotation_quaternion": slice(3, 7),
+    "scale": slice(7, 10),
+}
+CHANNEL_COUNT = 10
+REST_CHANNELS = np.array([0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0], dtype=np.float32)
+REST_VISEME = "Rest/Neutral"
+NEUTRAL_EXPRESSION = "Neutral"
+# Coarticulation strength of visemes the "dominance" block does not list
+DEFAULT_DOMINANCE = 1.0
+
+
+class PoseTable:
+    """
+    Dense viseme pose table: `poses[viseme_index, bone_index]` holds the
+    10 channel values of a bone. Bones a viseme does not mention are at rest.
+    `dominance[viseme_index]` weighs the viseme against its neighbours when
+    they are blended (see coarticulation.py).
+    Expression tables use the same class, with expressions as the rows.
+    """
+
+    def __init__(self, viseme_names, bone_names, poses, rest_name=REST_VISEME, dominance=None):
+        self.viseme_names = list(viseme_names)
+        self.bone_names = list(bone_names)
+        self.poses = poses
+        if dominance is None:
+            dominance = np.full(len(self.viseme_names), DEFAULT_DOMINANCE, dtype=np.float64)
+        self.dominance = dominance
+        self.viseme_to_index = {name: i for i, name in enumerate(self.viseme_names)}
+        self.rest_index = self.viseme_to_index[rest_name]
+        self._bone_index_cache = {}
+
+    def viseme_index(self, viseme_code):
+        """Returns the pose row for `viseme_code`, or None if the table has no such viseme."""
+        return self.viseme_to_index.get(viseme_code)
+
+    def resolve_bones(self, armature):
+        """
+        Returns (table_bone_indices, bone_names) for the bones of this table that
+        exist on `armature`. Resolved once per armature data block and bone set.
+        """
+        pose_bones = armature.pose.bones
+        key = armature_key(armature)
+        resolved = self._bone_index_cache.get(key)
+        if resolved is None:
+            present = [i for i, name in enumerate(self.bone_names) if name in pose_bones]
+            resolved = (np.array(present, dtype=np.intp), [self.bone_names[i] for i in present])
+            self._bone_index_cache[key] = resolved
+        return resolved
+
+
+def armature_key(armature):
+    """
+    Cache key for per-armature lookups: the data block and its bone names, so
+    renamed, added or removed bones (or a reused pointer) resolve again.
+    """
+    return armature.data.as_pointer(), tuple(armature.pose.bones.keys())
+
+
+def compile_pose_table(table_data, bone_map=None) -> PoseTable:
+    """
+    Builds the (n_visemes, n_bones, 10) float32 array from the declarative table.
+    `bone_map` renames the table's bones to another rig's bone names.
+    """
+    table_bones = list(table_data["bones"])
+    bone_index = {name: i for i, name in enumerate(table_bones)}
+    bone_names = [bone_map.get(name, name) for name in table_bones] if bone_map else table_bones
+    if "expressions" in table_data:
+        visemes, rest_name = table_data["expressions"], NEUTRAL_EXPRESSION
+    else:
+        visemes, rest_name = table_data["visemes"], REST_VISEME
+    viseme_names = list(visemes)
+
+    poses = np.empty((len(viseme_names), len(bone_names), CHANNEL_COUNT), dtype=np.float32)
+    poses[:] = REST_CHANNELS
+
+    for v, viseme_name in enumerate(viseme_names):
+        for bone_name, channels in visemes[viseme_name].items():
+            b = bone_index[bone_name]
+            for data_path, values in channels.items():
+                poses[v, b, CHANNEL_SLICES[data_path]] = values
+
+    dominance_data = table_data.get("dominance", {})
+    dominance = np.array([dominance_data.get(name, DEFAULT_DOMINANCE) for name in viseme_names], dtype=np.float64)
+
+    return PoseTable(viseme_names, bone_names, poses, rest_name, dominance)
+
+
+def normalize_quaternions(values):
+    """Renormalizes the rotation channels of (..., 10) pose values in place after blending."""
+    quaternion = CHANNEL_SLICES["rotation_quaternion"]
+    norms = np.linalg.norm(values[..., quaternion], axis=-1, keepdims=True)
+    values[..., quaternion] /= np.maximum(norms, 1e-8)
+    return values
+
+
+_table_cache = {}
+
+
+def load_pose_table(path=DEFAULT_POSE_TABLE_PATH) -> PoseTable:
+    """Loads and compiles a pose table file, once per path and modification time."""
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    table = _table_cache.get(key)
+    if table is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = compile_pose_table(json.load(f))
+        _table_cache[key] = table
+    return table
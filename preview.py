@@ -0,0 +1,178 @@
+import bisect
+import os
+import time
+
+import bpy
+from bpy.app.handlers import persistent
+
+from . import coarticulation
+from . import profiling
+from . import timeline_io
+from .baking import scene_fps
+
+
+# ------------------------------------------------------------------------
+# LIVE PREVIEW (Pose the armature per frame, no keyframes)
+# ------------------------------------------------------------------------
+# A frame_change_pre handler poses every previewed armature straight from
+# its timeline: a binary search over the sorted entry starts finds the
+# current entry and the pose comes from the cached pose arrays, blended with
+# the same coarticulation weights a bake would key. Each frame costs
+# O(log n) in the timeline length. The timings file is re-read when it
+# changes on disk, so edited (or still extracting) timings show up while
+# scrubbing. The armature's action is set aside during the preview, since
+# its F-curves would override the pose, and put back when it stops.
+
+# Seconds between checks of the timings file for changes
+REFRESH_INTERVAL = 0.5
+
+
+class PreviewState:
+    def __init__(self, armature_name, audio_file, resolve_timings, table, bone_indices, bone_names,
+                 spread=coarticulation.DEFAULT_SPREAD, frame_offset=0):
+        self.armature_name = armature_name
+        self.audio_file = audio_file
+        # audio_file -> (timings_path, is_partial)
+        self.resolve_timings = resolve_timings
+        self.table = table
+        self.poses = table.poses[:, bone_indices]
+        self.bone_names = bone_names
+        self.spread = spread
+        self.frame_offset = frame_offset
+        self.stashed_action = None
+        self.stashed_fake_user = False
+        self.source = None
+        self._checked = 0.0
+        self._last_key = None
+        self.load()
+
+    def load(self):
+        path, _ = self.resolve_timings(self.audio_file)
+        self.source = (path, os.path.getmtime(path))
+        timeline = timeline_io.load_timeline(path)
+        if not len(timeline):
+            raise ValueError(f"No viseme timings in '{os.path.basename(path)}'")
+        self.timeline = timeline
+        self.segments = coarticulation.timeline_segments(timeline, self.table)
+        # Plain list for bisect; entry i of the timeline is segment i + 1
+        self.starts = self.segments[0].tolist()
+        self._last_key = None
+
+    def refresh(self):
+        """Reloads the timeline if its timings file changed (checked every REFRESH_INTERVAL)."""
+        now = time.monotonic()
+        if now - self._checked < REFRESH_INTERVAL:
+            return
+        self._checked = now
+        try:
+            path, _ = self.resolve_timings(self.audio_file)
+            if (path, os.path.getmtime(path)) != self.source:
+                self.load()
+        except (OSError, ValueError) as e:
+            # Repeats every REFRESH_INTERVAL while the file stays broken
+            profiling.log.info("Preview keeps the previous timings (%s)", e)
+
+    def pose_at(self, seconds):
+        """(n_bones, 10) pose at `seconds`, or None when it equals the last pose applied."""
+        segment = bisect.bisect_right(self.starts, seconds) - 1
+        if not self.spread:
+            # Hold each entry's pose; gaps and the edges are at rest
+            inside = seconds < self.segments[1][segment]
+            row = self.segments[2][segment] if inside else self.table.rest_index
+            if row == self._last_key:
+                return None
+            self._last_key = row
+            return self.poses[row]
+
+        # Inside the same entry the blend still changes, so only a repeated time is skipped
+        if seconds == self._last_key:
+            return None
+        self._last_key = seconds
+        weights = coarticulation.coarticulation_weights(
+            self.timeline, self.table, [seconds], self.spread, segments=self.segments
+        )
+        return coarticulation.blend_poses(weights, self.poses)[0]
+
+    def apply(self, armature, frame, fps):
+        values = self.pose_at((frame - self.frame_offset) / fps)
+        if values is None:
+            return
+        pose_bones = armature.pose.bones
+        for bone_name, bone_values in zip(self.bone_names, values):
+            pose_bone = pose_bones.get(bone_name)
+            if pose_bone is None:
+                continue
+            pose_bone.location = bone_values[0:3]
+            pose_bone.rotation_quaternion = bone_values[3:7]
+            pose_bone.scale = bone_values[7:10]
+
+
+# Armature name -> PreviewState
+_previews = {}
+
+
+@persistent
+def preview_frame_handler(scene, depsgraph=None):
+    if not _previews:
+        return
+    fps = scene_fps(scene)
+    frame = scene.frame_current + getattr(scene, "frame_subframe", 0.0)
+    for armature_name, state in list(_previews.items()):
+        armature = bpy.data.objects.get(armature_name)
+        if armature is None:
+            del _previews[armature_name]
+            continue
+        state.refresh()
+        state.apply(armature, frame, fps)
+
+
+def is_previewing(armature_name):
+    return armature_name in _previews
+
+
+def start_preview(armature, audio_file, resolve_timings, table, spread=coarticulation.DEFAULT_SPREAD,
+                  frame_offset=0, scene=None):
+    """Starts (or restarts) the live preview of `audio_file` on `armature`."""
+    stop_preview(armature.name)
+    bone_indices, bone_names = table.resolve_bones(armature)
+    state = PreviewState(armature.name, audio_file, resolve_timings, table, bone_indices, bone_names,
+                         spread, frame_offset)
+
+    animation_data = armature.animation_data
+    if animation_data is not None and animation_data.action is not None:
+        # A fake user keeps the action through a save while it is unassigned
+        state.stashed_action = animation_data.action
+        state.stashed_fake_user = state.stashed_action.use_fake_user
+        state.stashed_action.use_fake_user = True
+        animation_data.action = None
+
+    _previews[armature.name] = state
+    if preview_frame_handler not in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.append(preview_frame_handler)
+    if scene is not None:
+        preview_frame_handler(scene)
+    return state
+
+
+def stop_preview(armature_name):
+    """Stops the preview on `armature_name` and gives its action back. Returns whether one ran."""
+    state = _previews.pop(armature_name, None)
+    if state is None:
+        return False
+    armature = bpy.data.objects.get(armature_name)
+    action = state.stashed_action
+    if action is not None and action.name in bpy.data.actions:
+        action.use_fake_user = state.stashed_fake_user
+        if armature is not None:
+            animation_data = armature.animation_data or armature.animation_data_create()
+            if animation_data.action is None:
+                animation_data.action = action
+
+    if not _previews and preview_frame_handler in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(preview_frame_handler)
+    return True
+
+
+def stop_all_previews():
+    for armature_name in list(_previews):
+        stop_preview(armature_name)
@@ -0,0 +1,167 @@
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+
+
+# ------------------------------------------------------------------------
+# PROFILING (Per-stage timers, cProfile and trace-event export)
+# ------------------------------------------------------------------------
+# Every pipeline stage runs inside profiler.stage(name), which adds its wall
+# time to a per-stage total: two perf_counter() calls and a dict update, cheap
+# enough to stay on all the time because stages wrap whole passes, never
+# single frames or keys. With tracing on, each stage also becomes a Chrome
+# trace event ("X" phase), viewable in chrome://tracing or Perfetto; the
+# Whisper worker returns its events with each job, so one trace covers both
+# processes (perf_counter is the same monotonic clock in both).
+#
+# Like transcribers.py this module has no bpy dependency: the addon and the
+# external open_AI_whisper.py both import it.
+
+# Stages in pipeline order, for display; unknown names are listed after them
+STAGE_LABELS = {
+    "spawn": "Worker spawn",
+    "model_load": "Model load",
+    "decode": "Audio decode",
+    "vad": "Voice activity",
+    "transcribe": "Transcribe",
+    "align": "Forced alignment",
+    "g2p": "G2P",
+    "timeline_build": "Timeline build",
+    "write": "Write timings",
+    "timeline_load": "Timeline load",
+    "pose_eval": "Pose evaluation",
+    "fcurve_write": "F-curve write",
+    "depsgraph_update": "Depsgraph update",
+}
+
+LOG_LEVELS = ("WARNING", "INFO", "DEBUG")
+
+# Diagnostics too frequent for plain prints (one per pose or refresh) go here
+log = logging.getLogger("lipsync")
+
+
+def set_log_level(level):
+    """Sets the lip sync log level; messages go to stderr (Blender's system console)."""
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("Lip sync: %(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+    log.setLevel(level)
+
+
+class Profiler:
+    def __init__(self):
+        self.last_run = None
+        self.reset()
+
+    def reset(self, trace=False):
+        """Starts a new run; `trace` also records every stage as a trace event."""
+        # name -> [seconds, calls, items]
+        self.totals = {}
+        self.events = [] if trace else None
+        self.started = time.perf_counter()
+
+    @property
+    def tracing(self):
+        return self.events is not None
+
+    @contextlib.contextmanager
+    def stage(self, name, items=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, items, start)
+
+    def add(self, name, seconds, items=0, start=None):
+        entry = self.totals.get(name)
+        if entry is None:
+            entry = self.totals[name] = [0.0, 0, 0]
+        entry[0] += seconds
+        entry[1] += 1
+        entry[2] += items
+        if self.events is not None:
+            start = time.perf_counter() - seconds if start is None else start
+            self.events.append({
+                "name": name, "ph": "X", "ts": round(start * 1e6, 1), "dur": round(seconds * 1e6, 1),
+                "pid": os.getpid(), "tid": threading.get_ident(),
+            })
+
+    def merge(self, summary, events=None):
+        """Adds the summary() (and trace events) of another process, e.g. the Whisper worker."""
+        for name, entry in (summary or {}).items():
+            total = self.totals.setdefault(name, [0.0, 0, 0])
+            total[0] += entry["seconds"]
+            total[1] += entry["calls"]
+            total[2] += entry["items"]
+        if self.events is not None and events:
+            self.events.extend(events)
+
+    def summary(self):
+        """{stage: {"seconds", "calls", "items"}} of the current run, in pipeline order."""
+        order = {name: index for index, name in enumerate(STAGE_LABELS)}
+        names = sorted(self.totals, key=lambda name: order.get(name, len(order)))
+        return {
+            name: {"seconds": round(self.totals[name][0], 6), "calls": self.totals[name][1],
+                   "items": self.totals[name][2]}
+            for name in names
+        }
+
+    def finish(self, label):
+        """Closes the run as `label` and keeps it as last_run (shown in the panel)."""
+        self.last_run = {
+            "label": label,
+            "total": round(time.perf_counter() - self.started, 6),
+            "stages": self.summary(),
+        }
+        return self.last_run
+
+    def write_trace(self, path):
+        """Writes the recorded events as Chrome trace-event JSON."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events or [], "displayTimeUnit": "ms"}, f)
+        return path
+
+
+profiler = Profiler()
+
+
+def stage(name, items=0):
+    """profiler.stage() of the shared profiler."""
+    return profiler.stage(name, items)
+
+
+@contextlib.contextmanager
+def cprofile(path):
+    """Runs the block under cProfile and dumps the stats to `path` (pstats format); no-op without a path."""
+    if not path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        profile.dump_stats(path)
+        print(f"cProfile stats saved to: {path}")
+
+
+def format_stage(name, entry):
+    label = STAGE_LABELS.get(name, name)
+    calls = f" x{entry['calls']}" if entry["calls"] > 1 else ""
+    return f"{label}: {entry['seconds'] * 1000.0:.1f} ms{calls}"
+
+
+def format_run(run):
+    """Console text of a finish() result, one stage per line."""
+    lines = [f"{run['label']}: {run['total'] * 1000.0:.1f} ms"]
+    lines += [f"  {format_stage(name, entry)}" for name, entry in run["stages"].items()]
+    return "\n".join(lines)
@@ -0,0 +1,208 @@
+import json
+import os
+
+from . import pose_table
+
+
+# ------------------------------------------------------------------------
+# RIG PROFILES
+# ------------------------------------------------------------------------
+# A profile is a JSON file naming a pose table and how its bones are called
+# on one kind of rig:
+#
+#   {
+#     "label": "Mixamo (no prefix)",
+#     "pose_table": "../viseme_poses.json",
+#     "expression_table": "../expression_poses.json",
+#     "prefix_map": {"mixamorig:": ""},
+#     "bone_map": {"mixamorig:Jaw": "jaw"},
+#     "required_bones": ["jaw"]
+#   }
+#
+# prefix_map rewrites name prefixes, bone_map renames single bones (taking
+# precedence over prefixes), required_bones uses the rig's names. New rigs
+# only need a new file in one of PROFILE_DIRS. "expression_table" (brow, eye
+# and cheek poses for the emotion layer) may be null for rigs without them.
+
+PROFILE_DIRS = (
+    os.path.join(os.path.dirname(__file__), "rig_profiles"),
+    os.path.join(os.path.expanduser("~"), ".config", "blender_lipsync", "rig_profiles"),
+)
+DEFAULT_PROFILE = "mixamo"
+
+
+class RigProfileError(ValueError):
+    """The armature cannot be driven by the profile (required bones are missing)."""
+
+
+class RigProfile:
+    def __init__(self, name, label, table, required_bones=(), description="", expressions=None):
+        self.name = name
+        self.label = label
+        self.description = description
+        self.table = table
+        self.expressions = expressions
+        self.required_bones = list(required_bones)
+        self._validated = set()
+
+    def bind(self, armature):
+        """
+        Validates `armature` against the profile and returns the table's
+        (bone_indices, bone_names) for it. Checked once per armature bone set.
+        """
+        bone_indices, bone_names = self.table.resolve_bones(armature)
+        key = pose_table.armature_key(armature)
+        if key in self._validated:
+            return bone_indices, bone_names
+
+        pose_bones = armature.pose.bones
+        missing = [name for name in self.required_bones if name not in pose_bones]
+        if missing:
+            raise RigProfileError(
+                f"'{armature.name}' does not match rig profile '{self.label}': missing {', '.join(missing)}"
+            )
+        skipped = len(self.table.bone_names) - len(bone_names)
+        if skipped:
+            print(f"Rig profile '{self.label}': {skipped} of {len(self.table.bone_names)} bones "
+                  f"not on '{armature.name}', they will not be keyed")
+        self._validated.add(key)
+        return bone_indices, bone_names
+
+
+def profile_path(name_or_path):
+    """Resolves a profile name (file stem in PROFILE_DIRS) or a .json path."""
+    if name_or_path.lower().endswith(".json"):
+        return os.path.abspath(name_or_path)
+    for directory in PROFILE_DIRS:
+        path = os.path.join(directory, name_or_path + ".json")
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Rig profile '{name_or_path}' not found")
+
+
+def map_bone_names(bone_names, prefix_map=None, bone_map=None):
+    """Returns {table_name: rig_name} for the names the maps change."""
+    mapping = {}
+    for name in bone_names:
+        mapped = name
+        for prefix, replacement in (prefix_map or {}).items():
+            if mapped.startswith(prefix):
+                mapped = replacement + mapped[len(prefix):]
+                break
+        mapped = (bone_map or {}).get(name, mapped)
+        if mapped != name:
+            mapping[name] = mapped
+    return mapping
+
+
+# path -> (modification key, RigProfile); one entry per profile file
+_profile_cache = {}
+
+
+def _compile_mapped(table_path, data):
+    with open(table_path, 'r', encoding='utf-8') as f:
+        table_data = json.load(f)
+    bone_map = map_bone_names(table_data["bones"], data.get("prefix_map"), data.get("bone_map"))
+    return pose_table.compile_pose_table(table_data, bone_map)
+
+
+def load_profile(name_or_path=DEFAULT_PROFILE) -> RigProfile:
+    """Loads and compiles a profile, once per profile and pose table modification time."""
+    path = os.path.abspath(profile_path(name_or_path or DEFAULT_PROFILE))
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    base_dir = os.path.dirname(path)
+    table_path = os.path.normpath(os.path.join(base_dir, data.get("pose_table", "../viseme_poses.json")))
+    expression_path = data.get("expression_table", "../expression_poses.json")
+    if expression_path:
+        expression_path = os.path.normpath(os.path.join(base_dir, expression_path))
+
+    key = (os.path.getmtime(path), table_path, os.path.getmtime(table_path),
+           expression_path and os.path.getmtime(expression_path))
+    cached = _profile_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    profile = RigProfile(
+        name, data.get("label", name), _compile_mapped(table_path, data),
+        data.get("required_bones", ()), data.get("description", ""),
+        _compile_mapped(expression_path, data) if expression_path else None
+    )
+    # Replaces the compile of the file's previous version
+    _profile_cache[path] = (key, profile)
+    return profile
+
+
+def cached_profile(name):
+    """
+    load_profile() for draw-time callbacks: reuses the last compile of a listed
+    profile while its file is unchanged, without reading the JSON again (edits
+    to the pose tables alone show once the profile is next loaded for a bake).
+    """
+    available_profiles()
+    path = _profile_paths.get(name)
+    cached = _profile_cache.get(path)
+    if cached is not None and cached[0][0] == os.path.getmtime(path):
+        return cached[1]
+    return load_profile(path or name)
+
+
+# Blender keeps only references to dynamic enum strings, so the items live here.
+_profile_items = []
+# name -> profile file path of the listed profiles
+_profile_paths = {}
+# Modification times of PROFILE_DIRS when the listing was built
+_listing_key = None
+
+
+def _directories_key():
+    key = []
+    for directory in PROFILE_DIRS:
+        try:
+            key.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def available_profiles():
+    """
+    (name, label, description) for every profile file, the default first.
+    Runs on every panel redraw (enum items), so the files are only listed and
+    read again when a profile directory changes (a file added, removed or renamed).
+    """
+    global _listing_key
+    key = _directories_key()
+    if key == _listing_key:
+        return _profile_items
+
+    profiles = {}
+    paths = {}
+    for directory in PROFILE_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for file_name in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(file_name)
+            if extension.lower() != ".json" or name in profiles:
+                continue
+            path = os.path.abspath(os.path.join(directory, file_name))
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping rig profile '{file_name}': {e}")
+                continue
+            profiles[name] = (name, data.get("label", name), data.get("description", ""))
+            paths[name] = path
+
+    items = sorted(profiles.values(), key=lambda item: (item[0] != DEFAULT_PROFILE, item[1]))
+    _profile_items[:] = items
+    _profile_paths.clear()
+    _profile_paths.update(paths)
+    _listing_key = key
+    return _profile_items
+
+
+def rig_profile_items(self, context):
+    return available_profiles()
@@ -0,0 +1,52 @@
+"""
+Shared fixtures. The external-Python modules (vad, forced_align, g2p_cache,
+timeline_io, ...) import as plain modules from the repo root, like
+open_AI_whisper.py imports them. The addon modules use relative imports, so
+the `addon` fixture imports the repo as a package. `bpy` is replaced by
+benchmarks/fake_bpy.py before anything is collected: the repo root has an
+__init__.py, so pytest imports it as a package too.
+
+    python -m pytest -q
+"""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+BENCH_DIR = os.path.join(REPO_DIR, "benchmarks")
+ADDON_PACKAGE = "lipsync_addon"
+
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+import fake_bpy  # noqa: E402
+
+fake_bpy.install()
+from timeline_io import VisemeTimeline  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """The addon package, imported once against fake_bpy."""
+    if ADDON_PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            ADDON_PACKAGE, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[ADDON_PACKAGE] = module
+        spec.loader.exec_module(module)
+    return sys.modules[ADDON_PACKAGE]
+
+
+def random_timeline(count, viseme_names, seed=0):
+    """`count` back-to-back entries of random visemes and lengths (40-200 ms), starting at 0.5 s."""
+    rng = np.random.default_rng(seed)
+    lengths = np.round(rng.uniform(0.04, 0.2, count), 4)
+    ends = np.round(0.5 + np.cumsum(lengths), 4)
+    starts = np.concatenate([[0.5], ends[:-1]])
+    codes = rng.integers(0, len(viseme_names), count).astype(np.uint8)
+    return VisemeTimeline(starts, ends, codes, viseme_names)
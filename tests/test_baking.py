@@ -0,0 +1,163 @@
+import fake_bpy
+import numpy as np
+import pytest
+from conftest import random_timeline
+
+
+@pytest.fixture(scope="module")
+def table(addon):
+    return addon.pose_table.load_pose_table()
+
+
+def edited(timeline, index, viseme_code):
+    codes = timeline.viseme_codes.copy()
+    codes[index] = viseme_code
+    return type(timeline)(timeline.starts, timeline.ends, codes, timeline.viseme_names)
+
+
+def action_keys(armature):
+    action = armature.animation_data.action
+    return {(fcurve.data_path, fcurve.array_index): fcurve.keyframe_points.co.copy() for fcurve in action.fcurves}
+
+
+def sampled(keys, frames):
+    return {channel: np.interp(frames, co[:, 0], co[:, 1]) for channel, co in keys.items()}
+
+
+def keyframe_insert_schedule(timeline, fps, table):
+    """The keys the per-frame keyframe_insert bake made, as {frame: pose row}; later keys on a frame win."""
+    rows = [table.viseme_to_index.get(timeline.viseme_names[code]) for code in timeline.viseme_codes.tolist()]
+    schedule = {max(1, int(timeline.starts[0] * fps) - int(fps * 0.1)): table.rest_index}
+    for i, row in enumerate(rows):
+        if row is not None:
+            schedule[int(timeline.starts[i] * fps) + max(1, int(fps * 0.03))] = row
+        if i + 1 < len(rows):
+            schedule[int(timeline.ends[i] * fps)] = rows[i + 1] if rows[i + 1] is not None else table.rest_index
+    schedule[int(timeline.ends[-1] * fps) + int(fps * 0.5)] = table.rest_index
+    return schedule
+
+
+def test_bulk_bake_matches_keyframe_insert(addon, table):
+    timeline = random_timeline(200, table.viseme_names + ["Unknown"], seed=0)
+    armature = fake_bpy.new_armature("Bulk", table.bone_names)
+    fake_bpy.reset_counters()
+    first, last, keyframes = addon.baking.bake_viseme_timeline(armature, timeline, 24, table)
+
+    schedule = keyframe_insert_schedule(timeline, 24, table)
+    frames = np.array(sorted(schedule))
+    rows = np.array([schedule[frame] for frame in frames])
+    assert (first, last) == (frames[0], frames[-1])
+    keys = action_keys(armature)
+    assert keyframes == len(keys) * len(frames)
+    for bone, name in enumerate(table.bone_names):
+        for data_path, channels in addon.pose_table.CHANNEL_SLICES.items():
+            for index, channel in enumerate(range(channels.start, channels.stop)):
+                co = keys[(f'pose.bones["{name}"].{data_path}', index)]
+                np.testing.assert_array_equal(co[:, 0], frames)
+                np.testing.assert_allclose(co[:, 1], table.poses[rows, bone, channel], atol=1e-6)
+
+    # One bulk write per F-curve, no per-key inserts
+    assert fake_bpy.CALLS["keyframe_points.insert"] == 0
+    assert fake_bpy.CALLS["keyframe_points.add"] == len(keys)
+
+
+def test_bake_replaces_the_previous_action(addon, table):
+    armature = fake_bpy.new_armature("Rebaked", table.bone_names)
+    addon.baking.bake_viseme_timeline(armature, random_timeline(50, table.viseme_names, seed=1), 24, table)
+    timeline = random_timeline(20, table.viseme_names, seed=2)
+    _, _, keyframes = addon.baking.bake_viseme_timeline(armature, timeline, 24, table, frame_offset=100)
+    assert armature.animation_data.action.keyframe_count() == keyframes
+    assert min(co[0, 0] for co in action_keys(armature).values()) >= 100
+
+
+def test_changed_entry_range(addon, table):
+    timeline = random_timeline(50, table.viseme_names, seed=1)
+    changed_entry_range = addon.baking.changed_entry_range
+    assert changed_entry_range(timeline, timeline) == (50, 0)
+
+    code = (timeline.viseme_codes[20] + 1) % len(table.viseme_names)
+    assert changed_entry_range(timeline, edited(timeline, 20, code)) == (20, 29)
+
+    shifted = type(timeline)(timeline.starts.copy(), timeline.ends.copy(), timeline.viseme_codes, table.viseme_names)
+    shifted.ends[10] += 0.01
+    shifted.starts[11] += 0.01
+    assert changed_entry_range(timeline, shifted) == (10, 38)
+
+    # Same visemes under a different name order still compare equal
+    names = table.viseme_names[::-1]
+    renamed = type(timeline)(timeline.starts, timeline.ends,
+                             (len(names) - 1 - timeline.viseme_codes).astype(np.uint8), names)
+    assert changed_entry_range(timeline, renamed) == (50, 0)
+
+
+def test_decimate_curve_stays_within_tolerance(addon):
+    frames = np.arange(400)
+    values = np.sin(frames / 20.0).astype(np.float32)
+    values[100:150] = values[100]
+    tolerance = 0.005
+
+    keep = addon.baking.decimate_curve(frames, values, tolerance)
+    assert keep[0] and keep[-1]
+    assert keep.sum() < len(frames) // 2
+    assert not keep[101:149].any()
+    rebuilt = np.interp(frames, frames[keep], values[keep])
+    assert np.abs(rebuilt - values).max() <= tolerance + 1e-6
+
+
+def test_decimate_curve_keeps_short_curves(addon):
+    assert addon.baking.decimate_curve(np.arange(2), np.zeros(2), 0.1).all()
+
+
+@pytest.mark.parametrize("coarticulation", [0.0, 0.04])
+def test_rebake_matches_a_full_bake(addon, table, coarticulation):
+    baking = addon.baking
+    timeline = random_timeline(300, table.viseme_names, seed=2)
+    changed = timeline
+    for index in (40, 41, 200):
+        changed = edited(changed, index, (changed.viseme_codes[index] + 3) % len(table.viseme_names))
+
+    incremental = fake_bpy.new_armature("Incremental", table.bone_names)
+    baking.bake_viseme_timeline(incremental, timeline, 24, table, coarticulation=coarticulation)
+    _, _, rekeyed = baking.rebake_viseme_timeline(incremental, changed, 24, table, coarticulation=coarticulation)
+    full = fake_bpy.new_armature("Full", table.bone_names)
+    baking.bake_viseme_timeline(full, changed, 24, table, coarticulation=coarticulation)
+
+    assert 0 < rekeyed < full.animation_data.action.keyframe_count()
+    incremental_keys, full_keys = action_keys(incremental), action_keys(full)
+    assert incremental_keys.keys() == full_keys.keys()
+    for channel, keys in full_keys.items():
+        np.testing.assert_allclose(incremental_keys[channel], keys, atol=1e-6, err_msg=str(channel))
+
+
+@pytest.mark.parametrize("coarticulation", [0.0, 0.04])
+def test_optimized_rebake_stays_within_tolerance(addon, table, coarticulation):
+    # Decimation only sees the re-keyed span, so the kept keys may differ from
+    # a full bake's; the curves may not drift from the exact bake by more than the tolerance.
+    baking = addon.baking
+    tolerance = 0.001
+    timeline = random_timeline(300, table.viseme_names, seed=2)
+    changed = edited(timeline, 120, (timeline.viseme_codes[120] + 3) % len(table.viseme_names))
+
+    incremental = fake_bpy.new_armature("OptimizedIncremental", table.bone_names)
+    baking.bake_viseme_timeline(incremental, timeline, 24, table, optimize=True, key_tolerance=tolerance,
+                                coarticulation=coarticulation)
+    baking.rebake_viseme_timeline(incremental, changed, 24, table, optimize=True, key_tolerance=tolerance,
+                                  coarticulation=coarticulation)
+    exact = fake_bpy.new_armature("Exact", table.bone_names)
+    baking.bake_viseme_timeline(exact, changed, 24, table, coarticulation=coarticulation)
+
+    frames = np.arange(*baking.get_frame_range(changed, 24))
+    incremental_curves, exact_curves = sampled(action_keys(incremental), frames), sampled(action_keys(exact), frames)
+    for channel, curve in exact_curves.items():
+        assert np.abs(incremental_curves[channel] - curve).max() <= tolerance + 1e-6, channel
+
+
+def test_rebake_of_an_unchanged_timeline_writes_nothing(addon, table):
+    timeline = random_timeline(100, table.viseme_names, seed=3)
+    armature = fake_bpy.new_armature("Unchanged", table.bone_names)
+    addon.baking.bake_viseme_timeline(armature, timeline, 24, table)
+    before = action_keys(armature)
+    assert addon.baking.rebake_viseme_timeline(armature, timeline, 24, table)[2] == 0
+    after = action_keys(armature)
+    for channel, keys in before.items():
+        np.testing.assert_array_equal(after[channel], keys)
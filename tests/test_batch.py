@@ -0,0 +1,45 @@
+import json
+
+import open_AI_whisper
+
+
+class FakeResult:
+    def __init__(self, pool, value):
+        self.pool, self.value = pool, value
+
+    def get(self):
+        self.pool.in_flight -= 1
+        return self.value
+
+
+class FakePool:
+    """Runs apply_async calls eagerly and records how many results were not yet taken."""
+
+    def __init__(self):
+        self.in_flight = self.most_in_flight = 0
+
+    def apply_async(self, function, args):
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        return FakeResult(self, args[0].upper())
+
+
+def test_decode_ahead_keeps_order_and_bounds_the_read_ahead():
+    pool = FakePool()
+    paths = [f"clip{i}.wav" for i in range(10)]
+    assert list(open_AI_whisper.decode_ahead(pool, paths, 3)) == [path.upper() for path in paths]
+    assert pool.most_in_flight == 4
+    assert pool.in_flight == 0
+
+
+def test_manifest_transcripts_are_resolved_next_to_the_manifest(tmp_path):
+    manifest = tmp_path / "clips.json"
+    manifest.write_text(json.dumps([
+        "a.wav",
+        {"audio": "b.wav", "out": str(tmp_path / "out" / "b.json"), "transcript": "b.txt"},
+    ]), encoding="utf-8")
+    clips = open_AI_whisper.collect_batch_clips(str(manifest))
+    assert clips == [
+        (str(tmp_path / "a.wav"), str(tmp_path / "a_phonemes.json"), None),
+        (str(tmp_path / "b.wav"), str(tmp_path / "out" / "b.json"), str(tmp_path / "b.txt")),
+    ]
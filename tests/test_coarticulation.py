@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from conftest import random_timeline
+from timeline_io import VisemeTimeline
+
+
+@pytest.fixture(scope="module")
+def table(addon):
+    return addon.pose_table.compile_pose_table({
+        "bones": ["Jaw", "Lip"],
+        "dominance": {"ClosedLips": 4.0, "KG": 0.5},
+        "visemes": {
+            "Rest/Neutral": {},
+            "ClosedLips": {"Lip": {"location": [0.0, -0.01, 0.0]}},
+            "KG": {"Jaw": {"rotation_quaternion": [0.8, 0.6, 0.0, 0.0]}},
+            "LipOpenBig": {"Jaw": {"rotation_quaternion": [0.6, 0.8, 0.0, 0.0]}},
+        },
+    })
+
+
+def timeline(entries):
+    names = ["Rest/Neutral", "ClosedLips", "KG", "LipOpenBig", "Unknown"]
+    return VisemeTimeline(np.array([start for start, _, _ in entries]), np.array([end for _, end, _ in entries]),
+                          np.array([names.index(name) for _, _, name in entries], dtype=np.uint8), names)
+
+
+def test_weights_sum_to_one_and_hold_inside_long_entries(addon, table):
+    take = timeline([(0.5, 1.0, "LipOpenBig"), (1.0, 1.5, "KG")])
+    weights = addon.coarticulation.coarticulation_weights(take, table, [0.0, 0.75, 1.25, 3.0])
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    np.testing.assert_allclose(weights[:, table.rest_index][[0, 3]], 1.0, atol=1e-4)
+    assert weights[1, table.viseme_index("LipOpenBig")] > 0.99
+    assert weights[2, table.viseme_index("KG")] > 0.99
+
+
+def test_dominant_visemes_win_at_boundaries(addon, table):
+    weak = timeline([(0.5, 1.0, "LipOpenBig"), (1.0, 1.5, "KG")])
+    strong = timeline([(0.5, 1.0, "LipOpenBig"), (1.0, 1.5, "ClosedLips")])
+    weak_weights = addon.coarticulation.coarticulation_weights(weak, table, [1.0])
+    strong_weights = addon.coarticulation.coarticulation_weights(strong, table, [1.0])
+    assert weak_weights[0, table.viseme_index("KG")] < 0.5
+    assert strong_weights[0, table.viseme_index("ClosedLips")] > 0.5
+
+
+def test_unknown_visemes_act_as_rest(addon, table):
+    take = timeline([(0.5, 1.0, "LipOpenBig"), (1.0, 1.5, "Unknown"), (1.5, 2.0, "LipOpenBig")])
+    weights = addon.coarticulation.coarticulation_weights(take, table, [1.25])
+    assert weights[0, table.rest_index] > 0.99
+
+
+def test_neighbour_window_matches_every_entry(addon, table):
+    take = random_timeline(300, table.viseme_names + ["Unknown"], seed=3)
+    times = np.linspace(0.0, take.ends[-1] + 1.0, 2000)
+    windowed = addon.coarticulation.coarticulation_weights(take, table, times)
+    full = addon.coarticulation.coarticulation_weights(take, table, times, neighbours=len(take) + 2)
+    np.testing.assert_allclose(windowed, full, atol=1e-6)
+
+
+def test_blend_poses_reproduces_single_visemes(addon, table):
+    weights = np.eye(len(table.viseme_names))
+    values = addon.coarticulation.blend_poses(weights, table.poses)
+    np.testing.assert_allclose(values, table.poses, atol=1e-6)
+
+
+def test_coarticulated_values_select_bones(addon, table):
+    take = timeline([(0.5, 1.0, "LipOpenBig"), (1.0, 1.5, "ClosedLips")])
+    values = addon.coarticulation.coarticulated_values(take, [18, 30], 24, table, np.array([1]))
+    assert values.shape == (2, 1, addon.pose_table.CHANNEL_COUNT)
+    np.testing.assert_allclose(values[1, 0], table.poses[table.viseme_index("ClosedLips"), 1], atol=1e-4)
+    empty = addon.coarticulation.coarticulated_values(take, [], 24, table, np.array([0, 1]))
+    assert empty.shape == (0, 2, addon.pose_table.CHANNEL_COUNT)
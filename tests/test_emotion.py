@@ -0,0 +1,79 @@
+import fake_bpy
+import numpy as np
+import pytest
+from conftest import random_timeline
+
+
+@pytest.fixture(scope="module")
+def table(addon):
+    return addon.pose_table.compile_pose_table({
+        "bones": ["Brow", "Cheek"],
+        "expressions": {
+            "Neutral": {},
+            "Happy": {"Cheek": {"location": [0.0, 0.01, 0.0]}},
+            "Sad": {"Brow": {"rotation_quaternion": [0.98, 0.2, 0.0, 0.0]}},
+        },
+    })
+
+
+def segment(start, end, emotion, intensity=1.0):
+    return {"start": start, "end": end, "emotion": emotion, "intensity": intensity}
+
+
+def test_segments_ramp_in_and_back_to_neutral(addon, table):
+    frames, rows, weights = addon.emotion.build_expression_keys(
+        [segment(1.0, 2.0, "Happy", 0.5), segment(4.0, 5.0, "Sad")], 24, table
+    )
+    happy, sad = table.viseme_index("Happy"), table.viseme_index("Sad")
+    np.testing.assert_array_equal(frames, [24, 30, 48, 54, 96, 102, 120, 126])
+    np.testing.assert_array_equal(rows, [0, happy, happy, 0, 0, sad, sad, 0])
+    np.testing.assert_array_equal(weights, [0.0, 0.5, 0.5, 0.0, 0.0, 1.0, 1.0, 0.0])
+
+
+def test_close_segments_blend_without_neutral(addon, table):
+    frames, rows, _ = addon.emotion.build_expression_keys(
+        [segment(1.0, 2.0, "Happy"), segment(2.1, 3.0, "Sad")], 24, table
+    )
+    assert table.rest_index not in rows[1:-1]
+    assert np.all(np.diff(frames) > 0)
+
+
+def test_overlapping_segments_keep_frames_increasing(addon, table):
+    frames, rows, _ = addon.emotion.build_expression_keys(
+        [segment(0.0, 2.0, "Happy"), segment(1.0, 1.5, "Sad")], 24, table
+    )
+    assert np.all(np.diff(frames) > 0)
+    assert frames[-1] == 49 + 6
+    assert rows[-2] == table.viseme_index("Sad")
+
+    rng = np.random.default_rng(0)
+    starts = np.sort(rng.uniform(0.0, 20.0, 40))
+    segments = [segment(start, start + length, name)
+                for start, length, name in zip(starts, rng.uniform(0.01, 3.0, 40), rng.choice(["Happy", "Sad"], 40))]
+    frames, _, _ = addon.emotion.build_expression_keys(segments, 24, table)
+    assert np.all(np.diff(frames) > 0)
+
+
+def test_unknown_emotions_use_neutral(addon, table):
+    _, rows, _ = addon.emotion.build_expression_keys([segment(0.0, 1.0, "Bored")], 24, table)
+    assert set(rows.tolist()) == {table.rest_index}
+
+
+def test_default_emotion_spans_the_take(addon):
+    timeline = random_timeline(10, ["Rest/Neutral", "EE"])
+    assert addon.emotion.emotion_segments_for(timeline) == []
+    segments = addon.emotion.emotion_segments_for(timeline, default_emotion="Happy", intensity=0.7)
+    assert segments == [{"start": float(timeline.starts[0]), "end": float(timeline.ends[-1]),
+                         "emotion": "Happy", "intensity": 0.7}]
+
+
+def test_bake_puts_the_layer_on_its_own_track(addon, table):
+    armature = fake_bpy.new_armature("Emotional", ["Brow", "Cheek", "Jaw"])
+    keyframes = addon.emotion.bake_emotion_layer(armature, [segment(1.0, 2.0, "Sad")], 24, table)
+    assert keyframes > 0
+    track = armature.animation_data.nla_tracks.get(addon.emotion.EMOTION_TRACK_NAME)
+    assert track.strips[0].blend_type == 'COMBINE'
+    assert armature.animation_data.action_blend_type == 'COMBINE'
+
+    assert addon.emotion.bake_emotion_layer(armature, [], 24, table) == 0
+    assert armature.animation_data.nla_tracks.get(addon.emotion.EMOTION_TRACK_NAME) is None
@@ -0,0 +1,115 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from forced_align import AlignmentError, ctc_viterbi, transcript_words, windowed_viterbi, word_tokens
+
+
+def reference_best_path(log_probs, tokens, blank=0):
+    """Best frame labelling that collapses to `tokens` under CTC rules, by trying every labelling."""
+    n_frames, n_classes = log_probs.shape
+    best_score, best_path = -np.inf, None
+    for path in itertools.product(range(n_classes), repeat=n_frames):
+        collapsed = [label for i, label in enumerate(path) if label != blank and (i == 0 or label != path[i - 1])]
+        if collapsed == list(tokens):
+            score = log_probs[np.arange(n_frames), path].sum()
+            if score > best_score:
+                best_score, best_path = score, path
+    return best_score, best_path
+
+
+def path_score(log_probs, tokens, starts, ends, blank=0):
+    labels = np.full(len(log_probs), blank)
+    for token, start, end in zip(tokens, starts, ends):
+        labels[start:end] = token
+    return log_probs[np.arange(len(log_probs)), labels].sum()
+
+
+def synthetic_emissions(n_words, seed, n_classes=30):
+    """
+    Log probabilities of a clip whose letters are heard for 2-5 frames each,
+    with short blanks between words and occasional long pauses. Returns
+    (log_probs, tokens, token_owner, true_starts).
+    """
+    rng = np.random.default_rng(seed)
+    labels, tokens, token_owner, true_starts = [], [], [], []
+    for word in range(n_words):
+        if rng.random() < 0.1:
+            labels += [0] * int(rng.integers(50, 800))
+        labels += [0] * int(rng.integers(1, 8))
+        for _ in range(int(rng.integers(1, 8))):
+            token = int(rng.integers(1, n_classes))
+            if token_owner and token_owner[-1] == word and tokens[-1] == token:
+                token = token % (n_classes - 1) + 1
+            tokens.append(token)
+            token_owner.append(word)
+            true_starts.append(len(labels))
+            labels += [token] * int(rng.integers(2, 6))
+    log_probs = np.full((len(labels), n_classes), -8.0, dtype=np.float32)
+    log_probs[np.arange(len(labels)), labels] = -0.05
+    log_probs += rng.normal(0, 0.5, log_probs.shape).astype(np.float32)
+    return log_probs, np.array(tokens), np.array(token_owner), np.array(true_starts)
+
+
+def test_ctc_viterbi_matches_exhaustive_search():
+    rng = np.random.default_rng(1)
+    for _ in range(40):
+        n_frames = int(rng.integers(3, 7))
+        tokens = rng.integers(1, 3, int(rng.integers(1, 3)))
+        log_probs = np.log(rng.dirichlet(np.ones(3), n_frames)).astype(np.float32)
+        best_score, best_path = reference_best_path(log_probs, tokens)
+        if best_path is None:
+            with pytest.raises(AlignmentError):
+                ctc_viterbi(log_probs, tokens)
+            continue
+
+        starts, ends = ctc_viterbi(log_probs, tokens)
+        assert np.all(starts < ends) and np.all(ends[:-1] <= starts[1:])
+        assert path_score(log_probs, tokens, starts, ends) == pytest.approx(best_score, abs=1e-4)
+
+
+def test_ctc_viterbi_repeated_tokens_need_a_blank():
+    log_probs = np.log(np.full((3, 2), 0.5, dtype=np.float32))
+    starts, ends = ctc_viterbi(log_probs, [1, 1])
+    np.testing.assert_array_equal(starts, [0, 2])
+    np.testing.assert_array_equal(ends, [1, 3])
+    with pytest.raises(AlignmentError):
+        ctc_viterbi(log_probs[:2], [1, 1])
+
+
+def test_ctc_viterbi_recovers_synthetic_spans():
+    log_probs, tokens, _, true_starts = synthetic_emissions(40, seed=2)
+    starts, _ = ctc_viterbi(log_probs, tokens)
+    np.testing.assert_array_equal(starts, true_starts)
+
+
+def test_ctc_viterbi_open_end_stops_where_the_audio_does():
+    log_probs, tokens, _, true_starts = synthetic_emissions(40, seed=3)
+    cut = true_starts[len(tokens) // 2]
+    starts, ends = ctc_viterbi(log_probs[:cut], tokens, open_end=True)
+    assert len(starts) == len(tokens) // 2
+    np.testing.assert_array_equal(starts, true_starts[:len(starts)])
+    assert ends[-1] <= cut
+
+
+def test_ctc_viterbi_empty_script():
+    starts, ends = ctc_viterbi(np.zeros((5, 3), dtype=np.float32), [])
+    assert len(starts) == len(ends) == 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_windowed_viterbi_matches_one_search(seed):
+    log_probs, tokens, token_owner, true_starts = synthetic_emissions(150, seed)
+    starts, ends = windowed_viterbi(log_probs, tokens, token_owner, window_frames=1000)
+    full_starts, full_ends = ctc_viterbi(log_probs, tokens)
+    np.testing.assert_array_equal(starts, full_starts)
+    np.testing.assert_array_equal(ends, full_ends)
+    np.testing.assert_array_equal(starts, true_starts)
+
+
+def test_word_tokens_folds_accents_and_drops_unknown_letters():
+    dictionary = {c: i for i, c in enumerate("-abcdefghijklmnopqrstuvwxyz'*")}
+    assert word_tokens("Café,", dictionary) == [dictionary[c] for c in "cafe"]
+    assert word_tokens("42", dictionary) == []
+    assert transcript_words(" Hello,  world!\n") == ["Hello,", "world!"]
@@ -0,0 +1,87 @@
+import json
+
+import g2p_cache
+from g2p_cache import CachedG2p, normalize_word, seed_digest
+
+
+class FakeG2p:
+    """Deterministic stand-in for g2p_en.G2p that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, word):
+        self.calls += 1
+        return [letter.upper() + "H" for letter in word]
+
+
+def test_normalize_word():
+    assert normalize_word("  Hello, ") == "hello"
+    assert normalize_word("“quoted”") == "quoted"
+    assert normalize_word("...") == ""
+
+
+def test_memory_then_store_then_model(tmp_path):
+    store = str(tmp_path / "store" / "pronunciations.sqlite")
+    model = FakeG2p()
+    cache = CachedG2p(store, g2p=model)
+    assert cache("Hello,") == ["HH", "EH", "LH", "LH", "OH"]
+    assert cache("hello") == ["HH", "EH", "LH", "LH", "OH"]
+    assert cache.stats() == {"hits": 1, "store_hits": 0, "misses": 1}
+    cache.close()
+
+    reopened = CachedG2p(store, g2p=model)
+    assert reopened("HELLO") == ["HH", "EH", "LH", "LH", "OH"]
+    assert reopened.stats() == {"hits": 0, "store_hits": 1, "misses": 0}
+    assert model.calls == 1
+    reopened.close()
+
+
+def test_lookup_many_matches_single_lookups():
+    words = ["The", "cat", "sat", "on", "the", "mat.", "", "Cat"]
+    single = CachedG2p(None, g2p=FakeG2p())
+    many = CachedG2p(None, g2p=FakeG2p())
+    assert many.lookup_many(words) == [tuple(single(word)) for word in words]
+    # Every distinct word is converted once
+    assert many.stats() == {"hits": 0, "store_hits": 0, "misses": 5}
+
+
+def test_lookup_many_in_a_pool_matches_one_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(g2p_cache, "MIN_PARALLEL_MISSES", 1)
+    words = [f"word{i % 300}" for i in range(600)]
+    serial = CachedG2p(None, g2p=FakeG2p(), jobs=1)
+    pooled = CachedG2p(str(tmp_path / "pronunciations.sqlite"), g2p=FakeG2p(), jobs=2)
+    try:
+        assert pooled.lookup_many(words) == serial.lookup_many(words)
+        assert pooled.stats()["misses"] == 300
+    finally:
+        pooled.close()
+
+
+def test_seeds_win_over_the_model(tmp_path):
+    store = str(tmp_path / "pronunciations.sqlite")
+    seeds = tmp_path / "names.json"
+    seeds.write_text(json.dumps({"Zara": ["Z", "AA1", "R", "AH0"]}), encoding="utf-8")
+    cache = CachedG2p(store, g2p=FakeG2p())
+    assert cache.seed_file(str(seeds)) == 1
+    cache.close()
+
+    reopened = CachedG2p(store, g2p=FakeG2p())
+    assert reopened("zara!") == ["Z", "AA1", "R", "AH0"]
+    reopened.close()
+
+
+def test_seed_digest_changes_with_the_seeds(tmp_path):
+    store = str(tmp_path / "pronunciations.sqlite")
+    assert seed_digest(store) == ""
+    cache = CachedG2p(store, g2p=FakeG2p())
+    cache("unseeded")
+    cache.seed("Zara", ["Z", "AA1", "R", "AH0"])
+    first = seed_digest(store)
+    assert first
+
+    cache("another")
+    assert seed_digest(store) == first
+    cache.seed("Zara", ["Z", "AE1", "R", "AH0"])
+    assert seed_digest(store) not in ("", first)
+    cache.close()
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from g2p_cache import CachedG2p
+
+
+@pytest.fixture
+def phoneme_cache(addon):
+    return addon.phoneme_cache
+
+
+@pytest.fixture
+def audio(tmp_path):
+    path = tmp_path / "line.wav"
+    path.write_bytes(b"RIFF" + bytes(range(256)) * 64)
+    return str(path)
+
+
+def test_key_hashes_options_with_defaults(phoneme_cache, audio, tmp_path):
+    cache = phoneme_cache.PhonemeCache(str(tmp_path / "cache"), store_path=None)
+    key = cache.cache_key(audio, "base", "2.1.0", {"vad": True})
+    assert key == cache.cache_key(audio, "base", "2.1.0", phoneme_cache.EXTRACT_DEFAULTS)
+    assert key == cache.cache_key(audio, "base", "2.1.0")
+    assert key != cache.cache_key(audio, "base", "2.1.0", {"vad": False})
+    assert key != cache.cache_key(audio, "small", "2.1.0")
+    assert key != cache.cache_key(audio, "base", "2.2.0")
+
+
+def test_key_changes_with_the_pipeline_version(phoneme_cache, audio, tmp_path, monkeypatch):
+    cache = phoneme_cache.PhonemeCache(str(tmp_path / "cache"), store_path=None)
+    key = cache.cache_key(audio, "base", "2.1.0")
+    monkeypatch.setattr(phoneme_cache, "PIPELINE_VERSION", phoneme_cache.PIPELINE_VERSION + 1)
+    assert cache.cache_key(audio, "base", "2.1.0") != key
+
+
+def test_seeding_invalidates_keys(phoneme_cache, audio, tmp_path):
+    store = str(tmp_path / "pronunciations.sqlite")
+    cache = phoneme_cache.PhonemeCache(str(tmp_path / "cache"), store_path=store)
+    before = cache.cache_key(audio, "base", "2.1.0")
+
+    g2p = CachedG2p(store, g2p=lambda word: list(word.upper()))
+    g2p("unseeded")
+    assert cache.cache_key(audio, "base", "2.1.0") == before
+    g2p.seed("Zara", ["Z", "AA1", "R", "AH0"])
+    g2p.close()
+    assert cache.cache_key(audio, "base", "2.1.0") != before
+
+
+def test_lookup_key_waits_for_the_g2p_version(phoneme_cache, audio, tmp_path):
+    cache = phoneme_cache.PhonemeCache(str(tmp_path / "cache"), store_path=None)
+    assert cache.lookup_key(audio, "base") is None
+    cache.save_environment({"g2p_version": "2.1.0", "model": "base"})
+    assert cache.lookup_key(audio, "base") == cache.cache_key(audio, "base", "2.1.0")
+
+
+def test_put_evicts_the_least_recently_used_entry(phoneme_cache, tmp_path):
+    cache = phoneme_cache.PhonemeCache(str(tmp_path / "cache"), max_bytes=2500, store_path=None)
+
+    def put(name):
+        src = tmp_path / f"{name}.json"
+        src.write_bytes(b"x" * 1000)
+        return cache.put(name, str(src))
+
+    a, b = put("a"), put("b")
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    assert cache.get("a") == a  # now more recent than "b"
+    c = put("c")
+    assert cache.get("b") is None
+    assert cache.get("a") == a
+    assert cache.get("c") == c
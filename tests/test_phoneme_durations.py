@@ -0,0 +1,60 @@
+import numpy as np
+
+from phoneme_durations import (
+    DEFAULT_DURATION_MS, PHONEME_DURATION_MS, distribute_aligned_time, distribute_word_time, duration_weights,
+)
+
+
+def test_duration_weights():
+    weights = duration_weights(["AA", "T", "XX"])
+    np.testing.assert_array_equal(weights, [PHONEME_DURATION_MS["AA"], PHONEME_DURATION_MS["T"], DEFAULT_DURATION_MS])
+
+
+def test_distribute_word_time_splits_by_weight():
+    owner = np.array([0, 0, 0, 1])
+    weights = np.array([1.0, 2.0, 1.0, 5.0])
+    starts, ends = distribute_word_time([0.0, 2.0], [1.0, 2.5], owner, weights)
+    np.testing.assert_allclose(starts, [0.0, 0.25, 0.75, 2.0])
+    np.testing.assert_allclose(ends, [0.25, 0.75, 1.0, 2.5])
+
+
+def test_distribute_word_time_tiles_every_word():
+    rng = np.random.default_rng(0)
+    owner = np.sort(rng.integers(0, 50, 300))
+    owner = np.unique(owner, return_inverse=True)[1]
+    word_count = owner[-1] + 1
+    word_starts = np.cumsum(rng.uniform(0.1, 0.5, word_count))
+    word_ends = word_starts + rng.uniform(0.05, 0.4, word_count)
+    starts, ends = distribute_word_time(word_starts, word_ends, owner, rng.uniform(40, 170, len(owner)))
+
+    first = np.insert(owner[1:] != owner[:-1], 0, True)
+    last = np.append(first[1:], True)
+    np.testing.assert_allclose(starts[first], word_starts)
+    np.testing.assert_allclose(ends[last], word_ends)
+    np.testing.assert_allclose(starts[~first], ends[:-1][~first[1:]])
+    assert np.all(ends > starts)
+
+
+def test_distribute_word_time_empty():
+    starts, ends = distribute_word_time([], [], np.empty(0, dtype=np.intp), np.empty(0))
+    assert len(starts) == len(ends) == 0
+
+
+def test_distribute_aligned_time_follows_the_letters():
+    # One word, two letters: the first heard over [0, 0.1), the second over [0.9, 1.0)
+    starts, ends = distribute_aligned_time([0.0, 0.9], [0.1, 1.0], [0, 0], np.array([0, 0]), np.array([1.0, 1.0]))
+    # The phoneme boundary sits at the second letter, not halfway through the word
+    np.testing.assert_allclose(starts, [0.0, 0.9])
+    np.testing.assert_allclose(ends, [0.9, 1.0])
+
+
+def test_distribute_aligned_time_evenly_spaced_letters_match_linear_time():
+    token_owner = np.array([0, 0, 0, 0, 1, 1])
+    token_starts = np.array([0.0, 0.25, 0.5, 0.75, 2.0, 2.5])
+    token_ends = np.array([0.25, 0.5, 0.75, 1.0, 2.5, 3.0])
+    owner = np.array([0, 0, 0, 1, 1])
+    weights = np.array([1.0, 2.0, 1.0, 1.0, 3.0])
+
+    aligned = distribute_aligned_time(token_starts, token_ends, token_owner, owner, weights)
+    linear = distribute_word_time([0.0, 2.0], [1.0, 3.0], owner, weights)
+    np.testing.assert_allclose(aligned, linear)
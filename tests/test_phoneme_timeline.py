@@ -0,0 +1,170 @@
+"""
+phoneme_timeline() against the per-word loop it replaced. The reference
+functions below are the serial build_phoneme_timings() and
+speech_phoneme_timings() as they were before the columnar timeline build,
+minus the profiling stages; both must produce the same records.
+"""
+
+import numpy as np
+import pytest
+
+import g2p_cache
+import open_AI_whisper
+from g2p_cache import CachedG2p
+from open_AI_whisper import (STOP_PHONEMES, classify_viseme, distribute_word_time, duration_weights,
+                             refine_word_bounds, remove_stress)
+
+
+# ------------------------------------------------------------------------
+# Reference: the serial per-word loop
+# ------------------------------------------------------------------------
+
+def reference_build_phoneme_timings(word_timings, g2p, previous_end=None, levels=None, levels_offset=0.0):
+    words, phonemes, owner = reference_word_phonemes([w for w, _, _ in word_timings], g2p)
+    word_starts = np.array([start for _, start, _ in word_timings], dtype=np.float64)
+    word_ends = np.array([end for _, _, end in word_timings], dtype=np.float64)
+    if levels is not None:
+        keep_start = np.array([bool(p) and p[0] in STOP_PHONEMES for _, p in words], dtype=bool)
+        word_starts, word_ends = refine_word_bounds(word_starts, word_ends, levels, levels_offset, keep_start)
+    ph_starts, ph_ends = distribute_word_time(word_starts, word_ends, owner, duration_weights(phonemes))
+    return reference_phoneme_records(words, word_starts, ph_starts, ph_ends, previous_end)
+
+
+def reference_word_phonemes(word_texts, g2p):
+    words = []
+    phonemes = []
+    owner = []
+    for w in word_texts:
+        phones = [p for p in remove_stress(g2p(w)) if p.isalpha()]
+        owner.extend([len(words)] * len(phones))
+        phonemes.extend(phones)
+        words.append((w, phones))
+    return words, phonemes, np.array(owner, dtype=np.intp)
+
+
+def reference_phoneme_records(words, word_starts, ph_starts, ph_ends, previous_end=None):
+    ph_starts, ph_ends = np.round(ph_starts, 4).tolist(), np.round(ph_ends, 4).tolist()
+    phoneme_timings = []
+    last_end = previous_end
+    i = 0
+    for (w, word_phonemes), start in zip(words, word_starts.tolist()):
+        if last_end is not None and start > last_end + 0.05:
+            phoneme_timings.append({
+                "phoneme": "REST",
+                "start": round(last_end, 4),
+                "end": round(start, 4),
+                "word": "",
+                "viseme": "Rest/Neutral"
+            })
+            last_end = phoneme_timings[-1]['end']
+
+        if not word_phonemes:
+            continue
+
+        for ph in word_phonemes:
+            phoneme_timings.append({
+                "phoneme": ph,
+                "start": ph_starts[i],
+                "end": ph_ends[i],
+                "word": w,
+                "viseme": classify_viseme(ph)
+            })
+            i += 1
+
+        last_end = phoneme_timings[-1]['end']
+
+    return phoneme_timings
+
+
+def reference_speech_phoneme_timings(word_timings, g2p, duration, previous_end=0.0, levels=None, levels_offset=0.0):
+    phoneme_timings = reference_build_phoneme_timings(word_timings, g2p, previous_end, levels, levels_offset)
+    last_end = phoneme_timings[-1]["end"] if phoneme_timings else previous_end
+    if duration > last_end + 0.05:
+        phoneme_timings.append({
+            "phoneme": "REST",
+            "start": round(last_end, 4),
+            "end": round(duration, 4),
+            "word": "",
+            "viseme": "Rest/Neutral"
+        })
+    return phoneme_timings
+
+
+# ------------------------------------------------------------------------
+# Cases
+# ------------------------------------------------------------------------
+
+class FakeG2p:
+    """Stressed vowels, plain consonants, no phonemes for digits and a non-letter token like g2p_en's spaces."""
+
+    def __call__(self, word):
+        phonemes = []
+        for letter in word:
+            if letter in "aeiou":
+                phonemes.append(letter.upper() + "H1")
+            elif letter.isalpha():
+                phonemes.append({"c": "K", "q": "K", "x": "S", "y": "Y"}.get(letter, letter.upper()))
+        return phonemes + [" "] if phonemes else []
+
+
+VOCABULARY = ["the", "cat", "sat", "on", "mat", "bob", "pip", "...", "42", "zebra", "fox", "quick", "", "way"]
+
+CASES = {
+    "gaps": ([("the", 0.3, 0.5), ("cat", 0.52, 0.8), ("sat", 1.2, 1.5)], None, 2.0),
+    "no_phonemes_inside": ([("the", 0.3, 0.5), ("42", 0.9, 1.0), ("cat", 1.02, 1.3)], None, 1.3),
+    "no_phonemes_first": ([("...", 0.2, 0.3), ("cat", 0.6, 0.9)], 0.0, 1.0),
+    "no_phonemes_last": ([("cat", 0.2, 0.5), ("42", 0.8, 0.9)], 0.0, 0.9),
+    "no_phonemes_only": ([("42", 0.5, 0.6), ("...", 0.8, 0.9)], 0.25, 1.5),
+    "no_phonemes_in_a_row": ([("cat", 0.1, 0.3), ("42", 0.6, 0.7), ("...", 0.9, 1.0), ("sat", 1.3, 1.6)], None, 1.6),
+    "overlapping": ([("zebra", 0.2, 0.9), ("fox", 0.7, 1.1), ("way", 1.05, 1.4)], 0.0, 1.4),
+    "out_of_order": ([("quick", 1.0, 1.4), ("bob", 0.4, 0.8), ("pip", 2.0, 2.2)], 0.0, 3.0),
+    "continued": ([("cat", 3.21, 3.5), ("sat", 3.9, 4.2)], 3.2, 5.0),
+    "continued_after_a_gap": ([("cat", 3.5, 3.8)], 3.2, 3.81),
+    "empty": ([], 1.5, 4.0),
+}
+
+
+def random_words(seed, count=300):
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.uniform(0.0, 0.4, count))
+    # Some words start before the previous one ends, or before it starts
+    starts += rng.normal(0.0, 0.05, count) * (rng.random(count) < 0.2)
+    ends = starts + rng.uniform(0.01, 0.5, count)
+    words = rng.choice(VOCABULARY, count)
+    return [(str(w), round(float(s), 3), round(float(e), 3)) for w, s, e in zip(words, starts, ends)]
+
+
+@pytest.fixture(params=["serial", "pool"])
+def g2p(request, monkeypatch):
+    if request.param == "pool":
+        monkeypatch.setattr(g2p_cache, "MIN_PARALLEL_MISSES", 1)
+        cache = CachedG2p(None, g2p=FakeG2p(), jobs=2)
+    else:
+        cache = CachedG2p(None, g2p=FakeG2p(), jobs=1)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_timeline_matches_the_serial_loop(g2p, case):
+    word_timings, previous_end, duration = CASES[case]
+    expected = reference_build_phoneme_timings(word_timings, FakeG2p(), previous_end)
+    assert open_AI_whisper.build_phoneme_timings(word_timings, g2p, previous_end).to_records() == expected
+
+    previous_end = previous_end or 0.0
+    expected = reference_speech_phoneme_timings(word_timings, FakeG2p(), duration, previous_end)
+    assert open_AI_whisper.speech_phoneme_timings(word_timings, g2p, duration, previous_end).to_records() == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_takes_match_the_serial_loop(g2p, seed):
+    word_timings = random_words(seed)
+    duration = word_timings[-1][2] + 0.5
+    levels = np.random.default_rng(seed).uniform(0.0, 0.1, int(duration / 0.03) + 1)
+    for previous_end in (None, 0.0, 0.2):
+        expected = reference_build_phoneme_timings(word_timings, FakeG2p(), previous_end)
+        assert open_AI_whisper.build_phoneme_timings(word_timings, g2p, previous_end).to_records() == expected
+
+    expected = reference_speech_phoneme_timings(word_timings, FakeG2p(), duration, levels=levels, levels_offset=0.1)
+    actual = open_AI_whisper.speech_phoneme_timings(word_timings, g2p, duration, levels=levels, levels_offset=0.1)
+    assert actual.to_records() == expected
@@ -0,0 +1,77 @@
+import json
+import os
+
+import numpy as np
+
+import pose_table
+from phoneme_map import PHONEME_TO_VISEME
+from pose_table import REST_CHANNELS, compile_pose_table, load_pose_table, normalize_quaternions
+
+TABLE = {
+    "version": 1,
+    "bones": ["Jaw", "LipUpper"],
+    "dominance": {"ClosedLips": 2.5},
+    "visemes": {
+        "Rest/Neutral": {},
+        "ClosedLips": {"LipUpper": {"location": [0.0, -0.01, 0.0]}},
+        "LipOpenBig": {"Jaw": {"rotation_quaternion": [0.96, 0.28, 0.0, 0.0], "scale": [1.0, 1.1, 1.0]}},
+    },
+}
+
+
+def test_compile_fills_unlisted_channels_with_rest():
+    table = compile_pose_table(TABLE)
+    assert table.viseme_names == ["Rest/Neutral", "ClosedLips", "LipOpenBig"]
+    assert table.bone_names == ["Jaw", "LipUpper"]
+    assert table.poses.shape == (3, 2, pose_table.CHANNEL_COUNT)
+    assert table.poses.dtype == np.float32
+    assert table.rest_index == 0
+
+    np.testing.assert_array_equal(table.poses[0], [REST_CHANNELS, REST_CHANNELS])
+    np.testing.assert_allclose(table.poses[1, 1, 0:3], [0.0, -0.01, 0.0])
+    np.testing.assert_array_equal(table.poses[1, 0], REST_CHANNELS)
+    np.testing.assert_allclose(table.poses[2, 0], [0.0, 0.0, 0.0, 0.96, 0.28, 0.0, 0.0, 1.0, 1.1, 1.0])
+    np.testing.assert_array_equal(table.dominance, [pose_table.DEFAULT_DOMINANCE, 2.5, pose_table.DEFAULT_DOMINANCE])
+    assert table.viseme_index("LipOpenBig") == 2
+    assert table.viseme_index("Missing") is None
+
+
+def test_compile_renames_bones_with_a_bone_map():
+    table = compile_pose_table(TABLE, {"Jaw": "rig:jaw"})
+    assert table.bone_names == ["rig:jaw", "LipUpper"]
+    np.testing.assert_array_equal(table.poses, compile_pose_table(TABLE).poses)
+
+
+def test_expression_tables_rest_on_neutral():
+    table = compile_pose_table({"bones": ["Brow"], "expressions": {"Happy": {}, "Neutral": {}}})
+    assert table.rest_index == 1
+
+
+def test_normalize_quaternions():
+    values = np.tile(REST_CHANNELS, (2, 1))
+    values[0, 3:7] = [2.0, 0.0, 0.0, 0.0]
+    values[1, 3:7] = [0.0, 0.0, 0.0, 0.0]
+    normalize_quaternions(values)
+    np.testing.assert_allclose(values[0, 3:7], [1.0, 0.0, 0.0, 0.0])
+    np.testing.assert_array_equal(values[1, 3:7], 0.0)
+    np.testing.assert_array_equal(values[:, 7:], 1.0)
+
+
+def test_shipped_table_covers_every_viseme():
+    table = load_pose_table()
+    assert set(PHONEME_TO_VISEME.values()) <= set(table.viseme_names)
+    np.testing.assert_array_equal(table.poses[table.rest_index], np.tile(REST_CHANNELS, (len(table.bone_names), 1)))
+    norms = np.linalg.norm(table.poses[..., 3:7], axis=-1)
+    np.testing.assert_allclose(norms, 1.0, atol=1e-3)
+
+
+def test_load_pose_table_recompiles_after_an_edit(tmp_path):
+    path = tmp_path / "poses.json"
+    path.write_text(json.dumps(TABLE), encoding="utf-8")
+    first = load_pose_table(str(path))
+    assert load_pose_table(str(path)) is first
+
+    edited = dict(TABLE, visemes={**TABLE["visemes"], "EE": {}})
+    path.write_text(json.dumps(edited), encoding="utf-8")
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    assert load_pose_table(str(path)).viseme_names[-1] == "EE"
@@ -0,0 +1,82 @@
+import fake_bpy
+import numpy as np
+import pytest
+from conftest import random_timeline
+
+
+@pytest.fixture(scope="module")
+def table(addon):
+    return addon.pose_table.load_pose_table()
+
+
+@pytest.fixture
+def take(table, tmp_path):
+    timeline = random_timeline(100, table.viseme_names, seed=4)
+    path = timeline.save_npz(str(tmp_path / "line_phonemes.npz"))
+    return timeline, lambda audio_file: (path, False)
+
+
+def held_row(timeline, table, seconds):
+    """The pose row a spread-free preview shows at `seconds`, by linear search."""
+    for start, end, code in zip(timeline.starts, timeline.ends, timeline.viseme_codes):
+        if start <= seconds < end:
+            return table.viseme_index(timeline.viseme_names[code])
+    return table.rest_index
+
+
+def test_held_poses_follow_the_timeline(addon, table, take):
+    timeline, resolve = take
+    bone_indices, bone_names = table.resolve_bones(fake_bpy.new_armature("Held", table.bone_names))
+    state = addon.preview.PreviewState("Held", "line.wav", resolve, table, bone_indices, bone_names, spread=0.0)
+    previous = None
+    for seconds in np.linspace(0.0, timeline.ends[-1] + 0.5, 500):
+        values = state.pose_at(seconds)
+        row = held_row(timeline, table, seconds)
+        if row == previous:
+            assert values is None
+        else:
+            np.testing.assert_array_equal(values, table.poses[row])
+        previous = row
+
+
+def test_blended_poses_match_a_coarticulated_bake(addon, table, take):
+    timeline, resolve = take
+    bone_indices, bone_names = table.resolve_bones(fake_bpy.new_armature("Blended", table.bone_names))
+    state = addon.preview.PreviewState("Blended", "line.wav", resolve, table, bone_indices, bone_names, spread=0.04)
+    frames = np.arange(0, int(timeline.ends[-1] * 24) + 12)
+    baked = addon.coarticulation.coarticulated_values(timeline, frames, 24, table, bone_indices, 0.04)
+    for frame, values in zip(frames, baked):
+        np.testing.assert_allclose(state.pose_at(frame / 24), values, atol=1e-5)
+    assert state.pose_at(frames[-1] / 24) is None
+
+
+def test_handler_uses_the_playback_frame_rate(addon, table, take, monkeypatch):
+    timeline, resolve = take
+    armature = fake_bpy.new_armature("Ntsc", table.bone_names)
+    scene = fake_bpy.Scene(fps=30)
+    scene.render.fps_base = 1.001
+    assert addon.baking.scene_fps(scene) == pytest.approx(29.97, abs=1e-3)
+
+    seen = []
+    monkeypatch.setattr(addon.preview.PreviewState, "pose_at", lambda self, seconds: seen.append(seconds))
+    addon.preview.start_preview(armature, "line.wav", resolve, table, spread=0.0, frame_offset=10)
+    try:
+        scene.frame_current = 310
+        addon.preview.preview_frame_handler(scene)
+    finally:
+        addon.preview.stop_preview("Ntsc")
+    assert seen == [pytest.approx(300 * 1.001 / 30)]
+
+
+def test_preview_sets_the_action_aside(addon, table, take):
+    _, resolve = take
+    armature = fake_bpy.new_armature("Stashed", table.bone_names)
+    addon.baking.bake_viseme_timeline(armature, random_timeline(20, table.viseme_names, seed=5), 24, table)
+    action = armature.animation_data.action
+
+    addon.preview.start_preview(armature, "line.wav", resolve, table)
+    assert addon.preview.is_previewing("Stashed")
+    assert armature.animation_data.action is None
+    assert addon.preview.stop_preview("Stashed")
+    assert armature.animation_data.action is action
+    assert not addon.preview.stop_preview("Stashed")
@@ -0,0 +1,69 @@
+import json
+import os
+
+import fake_bpy
+import numpy as np
+import pytest
+from conftest import REPO_DIR
+
+
+@pytest.fixture
+def rig_profiles(addon):
+    return addon.rig_profiles
+
+
+def write_profile(directory, name, **data):
+    path = directory / f"{name}.json"
+    profile = {"label": name.title(), "pose_table": os.path.join(REPO_DIR, "viseme_poses.json"),
+               "expression_table": None, **data}
+    path.write_text(json.dumps(profile), encoding="utf-8")
+    return path
+
+
+def test_profiles_map_the_shared_table_to_their_rig(rig_profiles):
+    prefixed = rig_profiles.load_profile("mixamo")
+    unprefixed = rig_profiles.load_profile("mixamo_unprefixed")
+    assert [name.replace("mixamorig:", "") for name in prefixed.table.bone_names] == unprefixed.table.bone_names
+    np.testing.assert_array_equal(prefixed.table.poses, unprefixed.table.poses)
+    assert unprefixed.expressions is not None
+    assert rig_profiles.load_profile("mixamo") is prefixed
+
+
+def test_map_bone_names_prefers_single_bones(rig_profiles):
+    mapping = rig_profiles.map_bone_names(["rig:Jaw", "rig:Lip", "Head"], {"rig:": "face_"}, {"rig:Jaw": "jaw"})
+    assert mapping == {"rig:Jaw": "jaw", "rig:Lip": "face_Lip"}
+
+
+def test_listing_follows_the_profile_directories(rig_profiles, tmp_path, monkeypatch):
+    monkeypatch.setattr(rig_profiles, "PROFILE_DIRS", (str(tmp_path),))
+    write_profile(tmp_path, "mixamo")
+    assert [name for name, _, _ in rig_profiles.available_profiles()] == ["mixamo"]
+
+    write_profile(tmp_path, "custom", label="A Custom Rig")
+    os.utime(tmp_path, (os.path.getmtime(tmp_path) + 10,) * 2)
+    assert [name for name, _, _ in rig_profiles.available_profiles()] == ["mixamo", "custom"]
+    profile = rig_profiles.cached_profile("custom")
+    assert profile.label == "A Custom Rig"
+    assert rig_profiles.cached_profile("custom") is profile
+
+
+def test_bind_checks_the_required_bones(rig_profiles):
+    profile = rig_profiles.load_profile("mixamo_unprefixed")
+    armature = fake_bpy.new_armature("Partial", ["Jaw", "Head"])
+    bone_indices, bone_names = profile.bind(armature)
+    assert bone_names == ["Jaw", "Head"]
+    np.testing.assert_array_equal(bone_indices, [profile.table.bone_names.index(name) for name in bone_names])
+
+    with pytest.raises(rig_profiles.RigProfileError):
+        profile.bind(fake_bpy.new_armature("Headless", ["Head"]))
+
+
+def test_renamed_bones_resolve_again(rig_profiles):
+    table = rig_profiles.load_profile("mixamo_unprefixed").table
+    armature = fake_bpy.new_armature("Renamed", ["Jaw", "Head"])
+    assert table.resolve_bones(armature)[1] == ["Jaw", "Head"]
+
+    # Same data block, same bone count, different names
+    bones = armature.pose.bones
+    bones["Neck"] = bones.pop("Head")
+    assert table.resolve_bones(armature)[1] == ["Jaw", "Neck"]
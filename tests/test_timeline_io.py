@@ -0,0 +1,51 @@
+import json
+
+import numpy as np
+
+from timeline_io import VisemeTimeline, first_seen_codes, load_timeline, read_meta
+
+RECORDS = [
+    {"phoneme": "rest", "start": 0.0, "end": 0.25, "word": "", "viseme": "Rest/Neutral"},
+    {"phoneme": "HH", "start": 0.25, "end": 0.3125, "word": "hello", "viseme": "LipOpenSmall"},
+    {"phoneme": "AH0", "start": 0.3125, "end": 0.4, "word": "hello", "viseme": "LipOpenSmall"},
+    {"phoneme": "L", "start": 0.4, "end": 0.4567, "word": "hello", "viseme": "LR"},
+    {"phoneme": "OW1", "start": 0.4567, "end": 0.61, "word": "hello", "viseme": "OO"},
+]
+META = {"model": "base", "g2p_version": "2.1.0"}
+
+
+def test_records_round_trip():
+    timeline = VisemeTimeline.from_records(RECORDS, META)
+    assert len(timeline) == len(RECORDS)
+    assert timeline.viseme_names == ["Rest/Neutral", "LipOpenSmall", "LR", "OO"]
+    assert timeline.to_records() == RECORDS
+
+
+def test_json_and_npz_load_the_same_timeline(tmp_path):
+    timeline = VisemeTimeline.from_records(RECORDS, META)
+    json_path = tmp_path / "clip_phonemes.json"
+    json_path.write_text(json.dumps({"meta": META, "phoneme_timings": RECORDS}), encoding="utf-8")
+    npz_path = timeline.save_npz(str(tmp_path / "clip_phonemes.npz"))
+
+    for path in (str(json_path), npz_path):
+        loaded = load_timeline(path)
+        assert loaded.to_records() == RECORDS
+        assert loaded.meta == META
+        assert read_meta(path) == META
+        np.testing.assert_array_equal(loaded.starts, timeline.starts)
+        np.testing.assert_array_equal(loaded.ends, timeline.ends)
+
+
+def test_partial_jsonl_stops_at_a_torn_line(tmp_path):
+    path = tmp_path / "clip_phonemes.partial.jsonl"
+    lines = [json.dumps(record) for record in RECORDS[:3]]
+    path.write_text("\n".join(lines) + "\n" + lines[0][:10], encoding="utf-8")
+    assert load_timeline(str(path)).to_records() == RECORDS[:3]
+
+
+def test_first_seen_codes_matches_interning():
+    names = ["a", "b", "c", "d"]
+    codes, used = first_seen_codes([2, 2, 0, 3, 0], names, np.uint8)
+    assert used == ["c", "a", "d"]
+    assert codes.dtype == np.uint8
+    np.testing.assert_array_equal(codes, [0, 0, 1, 2, 1])
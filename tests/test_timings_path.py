@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+
+def touch(path, mtime):
+    path.write_text("", encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_newest_final_file_wins(addon, tmp_path):
+    audio = str(tmp_path / "line.wav")
+    touch(tmp_path / "line_phonemes.json", 1000)
+    npz = touch(tmp_path / "line_phonemes.npz", 2000)
+    assert addon.timings_path_for_audio(audio) == (npz, False)
+
+
+def test_a_newer_partial_wins_over_the_previous_take(addon, tmp_path):
+    audio = str(tmp_path / "line.wav")
+    final = touch(tmp_path / "line_phonemes.json", 1000)
+    partial = touch(tmp_path / "line_phonemes.partial.jsonl", 2000)
+    assert addon.timings_path_for_audio(audio) == (partial, True)
+
+    # A leftover partial older than the finished output is ignored
+    os.utime(partial, (500, 500))
+    assert addon.timings_path_for_audio(audio) == (final, False)
+
+
+def test_missing_timings_raise(addon, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        addon.timings_path_for_audio(str(tmp_path / "line.wav"))
@@ -0,0 +1,50 @@
+import numpy as np
+
+from vad import detect_speech, pack_regions, unpack_words
+
+SAMPLE_RATE = 16000
+
+
+def tone_bursts(bursts, duration):
+    samples = np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+    for start, end in bursts:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        samples[a:b] = 0.3 * np.sin(np.arange(b - a) * 2 * np.pi * 220 / SAMPLE_RATE)
+    return samples
+
+
+def test_detect_speech_finds_the_bursts():
+    bursts = [(1.0, 2.0), (4.0, 4.5)]
+    regions = detect_speech(tone_bursts(bursts, 6.0), SAMPLE_RATE)
+    assert len(regions) == len(bursts)
+    for (start, end), (burst_start, burst_end) in zip(regions, bursts):
+        assert start <= burst_start and end >= burst_end
+        assert burst_start - start < 0.5 and end - burst_end < 0.5
+
+
+def test_pack_regions_concatenates_with_gaps():
+    samples = np.arange(10 * SAMPLE_RATE, dtype=np.float32)
+    regions = np.array([[1.0, 2.0], [5.0, 5.5]])
+    packed, table = pack_regions(samples, SAMPLE_RATE, regions, gap=0.3)
+
+    assert len(packed) == int(1.8 * SAMPLE_RATE)
+    np.testing.assert_allclose(table, [[0.0, 1.0, 1.0], [1.3, 5.0, 0.5]])
+    np.testing.assert_array_equal(packed[:SAMPLE_RATE], samples[SAMPLE_RATE:2 * SAMPLE_RATE])
+    assert not packed[SAMPLE_RATE:int(1.3 * SAMPLE_RATE)].any()
+    np.testing.assert_array_equal(packed[int(1.3 * SAMPLE_RATE):], samples[5 * SAMPLE_RATE:int(5.5 * SAMPLE_RATE)])
+
+
+def test_unpack_words_maps_back_to_source_time():
+    regions = np.array([[1.0, 2.0], [5.0, 5.5]])
+    _, table = pack_regions(np.zeros(10 * SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE, regions, gap=0.3)
+    words = [("one", 0.1, 0.4), ("two", 0.5, 1.05), ("three", 1.25, 1.6)]
+
+    unpacked = unpack_words(words, table)
+    assert [w for w, _, _ in unpacked] == ["one", "two", "three"]
+    # "two" spills into the gap and is clamped to its region, "three" starts in the gap
+    np.testing.assert_allclose([(s, e) for _, s, e in unpacked], [(1.1, 1.4), (1.5, 2.0), (5.0, 5.3)])
+
+
+def test_unpack_words_empty():
+    assert unpack_words([], np.empty((0, 3))) == []
+    assert unpack_words([("a", 0.0, 1.0)], np.empty((0, 3))) == []
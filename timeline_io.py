@@ -0,0 +1,140 @@
+import json
+
+import numpy as np
+
+# ------------------------------------------------------------------------
+# VISEME TIMELINE (Columnar in memory, JSON or compact .npz on disk)
+# ------------------------------------------------------------------------
+# Shared by open_AI_whisper.py (external Python) and the addon, so this module
+# only depends on NumPy and the standard library.
+#
+# The .npz layout stores each distinct string once and per-row integer codes:
+#   words / phonemes / visemes : string tables
+#   word (uint32), phoneme (uint8), viseme (uint8) : codes into those tables
+#   start / end (float32)      : seconds
+#   meta                       : JSON string
+
+TIME_DECIMALS = 4
+
+
+class VisemeTimeline:
+    def __init__(self, starts, ends, viseme_codes, viseme_names,
+                 phoneme_codes=None, phoneme_names=None, word_codes=None, word_names=None, meta=None):
+        self.starts = starts
+        self.ends = ends
+        self.viseme_codes = viseme_codes
+        self.viseme_names = list(viseme_names)
+        self.phoneme_codes = phoneme_codes
+        self.phoneme_names = list(phoneme_names or [])
+        self.word_codes = word_codes
+        self.word_names = list(word_names or [])
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_records(cls, records, meta=None):
+        """Builds the columns from the JSON entry dicts ({"phoneme", "start", "end", "word", "viseme"})."""
+        viseme_codes, viseme_names = _intern([r["viseme"] for r in records], np.uint8)
+        phoneme_codes, phoneme_names = _intern([r["phoneme"] for r in records], np.uint8)
+        word_codes, word_names = _intern([r.get("word", "") for r in records], np.uint32)
+        return cls(
+            np.array([r["start"] for r in records], dtype=np.float64),
+            np.array([r["end"] for r in records], dtype=np.float64),
+            viseme_codes, viseme_names, phoneme_codes, phoneme_names, word_codes, word_names, meta,
+        )
+
+    def to_records(self):
+        count = len(self)
+        phonemes = ([self.phoneme_names[c] for c in self.phoneme_codes.tolist()] if self.phoneme_names
+                    else [""] * count)
+        words = [self.word_names[c] for c in self.word_codes.tolist()] if self.word_names else [""] * count
+        visemes = [self.viseme_names[c] for c in self.viseme_codes.tolist()]
+        return [
+            {"phoneme": phoneme, "start": round(start, TIME_DECIMALS), "end": round(end, TIME_DECIMALS),
+             "word": word, "viseme": viseme}
+            for phoneme, start, end, word, viseme in zip(
+                phonemes, np.asarray(self.starts, dtype=np.float64).tolist(),
+                np.asarray(self.ends, dtype=np.float64).tolist(), words, visemes)
+        ]
+
+    def save_npz(self, path):
+        # Uncompressed, so members load with a plain read and no inflate step.
+        np.savez(
+            path,
+            start=self.starts.astype(np.float32),
+            end=self.ends.astype(np.float32),
+            viseme=self.viseme_codes,
+            visemes=np.array(self.viseme_names, dtype=str),
+            phoneme=self.phoneme_codes if self.phoneme_codes is not None else np.zeros(len(self), np.uint8),
+            phonemes=np.array(self.phoneme_names or [""], dtype=str),
+            word=self.word_codes if self.word_codes is not None else np.zeros(len(self), np.uint32),
+            words=np.array(self.word_names or [""], dtype=str),
+            meta=np.array(json.dumps(self.meta)),
+        )
+        return path
+
+    @classmethod
+    def load_npz(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                # float32 on disk; rounding restores the 4-decimal times of the JSON format.
+                np.round(data["start"].astype(np.float64), TIME_DECIMALS),
+                np.round(data["end"].astype(np.float64), TIME_DECIMALS),
+                data["viseme"],
+                data["visemes"].tolist(),
+                data["phoneme"], data["phonemes"].tolist(),
+                data["word"], data["words"].tolist(),
+                json.loads(str(data["meta"])),
+            )
+
+
+def load_timeline(path):
+    """Loads a timeline from .npz, .json or a chunked-mode .partial.jsonl file."""
+    if path.endswith(".npz"):
+        return VisemeTimeline.load_npz(path)
+
+    if path.endswith(".jsonl"):
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # last line may still be being written
+        return VisemeTimeline.from_records(records)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return VisemeTimeline.from_records(data.get("phoneme_timings", []), data.get("meta"))
+
+
+def read_meta(path):
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as data:
+            return json.loads(str(data["meta"]))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("meta", {})
+
+
+def first_seen_codes(codes, names, dtype):
+    """
+    Renumbers `codes` into `names` so the table lists only used names, in order
+    of first use: the same columns _intern() gives when building row by row.
+    Returns (codes, names).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    used, first = np.unique(codes, return_index=True)
+    used = used[np.argsort(first, kind="stable")]
+    remap = np.zeros(len(names), dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    return remap[codes].astype(dtype), [names[c] for c in used.tolist()]
+
+
+def _intern(values, dtype):
+    table = {}
+    codes = np.fromiter((table.setdefault(v, len(table)) for v in values), dtype=np.int64, count=len(values))
+    if len(table) > np.iinfo(dtype).max + 1:
+        raise ValueError(f"Too many distinct values ({len(table)}) for {np.dtype(dtype).name} codes")
+    return codes.astype(dtype), list(table)
@@ -0,0 +1,230 @@
+import contextlib
+import importlib
+import time
+import types
+
+
+# ------------------------------------------------------------------------
+# TRANSCRIPTION BACKENDS
+# ------------------------------------------------------------------------
+# A backend loads one model and turns 16 kHz mono float32 audio into
+# (word, start, end) tuples. Backends are chosen with a spec string:
+#
+#   "base"                          openai-whisper, model "base" (PyTorch)
+#   "faster-whisper:small"          CTranslate2, int8 on CPU by default
+#   "faster-whisper:small:float32"  explicit compute type
+#
+# The canonical spec is the model identity recorded in timing files and
+# used in cache keys, so results of different backends never mix. Thread
+# counts only change speed and stay out of it. The backend libraries are
+# imported on load(), so this module is safe to import anywhere (the addon
+# uses it to build specs).
+
+DEFAULT_BACKEND = "openai-whisper"
+DEFAULT_COMPUTE_TYPE = "default"
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large-v3")
+
+BACKENDS = {}
+
+
+def register_backend(cls):
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def parse_spec(spec):
+    """'backend:model[:compute_type]' or a bare model name -> (backend, model, compute_type)."""
+    parts = spec.split(":")
+    if len(parts) == 1:
+        return DEFAULT_BACKEND, parts[0], DEFAULT_COMPUTE_TYPE
+    if parts[0] not in BACKENDS or len(parts) > 3:
+        raise ValueError(f"Unknown transcriber spec '{spec}' (backends: {', '.join(BACKENDS)})")
+    return parts[0], parts[1], parts[2] if len(parts) == 3 else DEFAULT_COMPUTE_TYPE
+
+
+def model_id(backend, model_name, compute_type=DEFAULT_COMPUTE_TYPE):
+    """Canonical spec; the reference backend with defaults stays a bare model name."""
+    compute_type = BACKENDS[backend].resolve_compute_type(compute_type)
+    if backend == DEFAULT_BACKEND and compute_type == DEFAULT_COMPUTE_TYPE:
+        return model_name
+    return f"{backend}:{model_name}:{compute_type}"
+
+
+def canonical_spec(spec):
+    """The model identity of any spec, e.g. "faster-whisper:small" -> "faster-whisper:small:int8"."""
+    return model_id(*parse_spec(spec))
+
+
+def create_transcriber(spec, threads=0, device="auto"):
+    backend, model_name, compute_type = parse_spec(spec)
+    return BACKENDS[backend](model_name, compute_type, threads, device)
+
+
+class Transcriber:
+    """Base class; subclasses implement load() and _transcribe()."""
+    name = ""
+    install_hint = ""
+
+    def __init__(self, model_name="base", compute_type=DEFAULT_COMPUTE_TYPE, threads=0, device="auto"):
+        self.model_name = model_name
+        self.compute_type = self.resolve_compute_type(compute_type)
+        self.threads = threads
+        self.device = device
+        self.load_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.calls = 0
+
+    @classmethod
+    def resolve_compute_type(cls, compute_type):
+        return compute_type
+
+    @property
+    def spec(self):
+        return model_id(self.name, self.model_name, self.compute_type)
+
+    def load(self):
+        started = time.perf_counter()
+        try:
+            self._load()
+        except ImportError as e:
+            raise ImportError(f"Transcription backend '{self.name}' is not installed ({e}). {self.install_hint}")
+        self.load_seconds = time.perf_counter() - started
+        return self
+
+    def transcribe(self, audio, progress=None):
+        """(word, start, end) tuples for a 16 kHz float32 array; `progress(percent)` is optional."""
+        started = time.perf_counter()
+        words = self._transcribe(audio, progress)
+        self.busy_seconds += time.perf_counter() - started
+        self.audio_seconds += len(audio) / 16000.0
+        self.calls += 1
+        return words
+
+    def stats(self):
+        """Throughput so far: realtime_factor is seconds of audio per second of compute."""
+        return {
+            "spec": self.spec,
+            "threads": self.threads,
+            "load_s": round(self.load_seconds, 3),
+            "audio_s": round(self.audio_seconds, 3),
+            "transcribe_s": round(self.busy_seconds, 3),
+            "realtime_factor": round(self.audio_seconds / self.busy_seconds, 2) if self.busy_seconds else None,
+            "calls": self.calls,
+        }
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _transcribe(self, audio, progress):
+        raise NotImplementedError
+
+
+# ------------------------------------------------------------------------
+# OPENAI WHISPER (Reference PyTorch implementation)
+# ------------------------------------------------------------------------
+
+class _TranscribeProgressBar:
+    """Stands in for tqdm inside whisper.transcribe and reports the percentage done."""
+    callback = None
+
+    def __init__(self, total=None, **kwargs):
+        self.total = total or 0
+        self.n = 0
+        self._last_percent = -1
+
+    def update(self, n=1):
+        self.n += n
+        if self.total:
+            percent = min(100, int(100 * self.n / self.total))
+            if percent != self._last_percent:
+                self._last_percent = percent
+                self.callback(percent)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@contextlib.contextmanager
+def _whisper_progress(progress):
+    if progress is None:
+        yield
+        return
+    transcribe_module = importlib.import_module("whisper.transcribe")
+    original = transcribe_module.tqdm
+    bar = type("ProgressBar", (_TranscribeProgressBar,), {"callback": staticmethod(progress)})
+    transcribe_module.tqdm = types.SimpleNamespace(tqdm=bar)
+    try:
+        yield
+    finally:
+        transcribe_module.tqdm = original
+
+
+@register_backend
+class OpenAIWhisperTranscriber(Transcriber):
+    name = "openai-whisper"
+    install_hint = "pip install openai-whisper"
+
+    @classmethod
+    def resolve_compute_type(cls, compute_type):
+        # PyTorch Whisper runs fp16 or fp32 only; quantized types fall back to its default
+        return compute_type if compute_type in ("float16", "float32") else DEFAULT_COMPUTE_TYPE
+
+    def _load(self):
+        import torch
+        import whisper
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self._model = whisper.load_model(self.model_name, device=None if self.device == "auto" else self.device)
+
+    def _transcribe(self, audio, progress):
+        options = {}
+        if self.compute_type != DEFAULT_COMPUTE_TYPE:
+            options["fp16"] = self.compute_type == "float16"
+        with _whisper_progress(progress):
+            result = self._model.transcribe(audio, word_timestamps=True, **options)
+
+        word_timings = []
+        for segment in result.get("segments", ()):
+            for word in segment.get("words", ()):
+                start = word.get("start", None)
+                end = word.get("end", None)
+                if start is None or end is None:
+                    continue
+                word_timings.append((word["word"].strip(), float(start), float(end)))
+        return word_timings
+
+
+# ------------------------------------------------------------------------
+# FASTER-WHISPER (CTranslate2, int8 quantized CPU inference)
+# ------------------------------------------------------------------------
+
+@register_backend
+class FasterWhisperTranscriber(Transcriber):
+    name = "faster-whisper"
+    install_hint = "pip install faster-whisper"
+
+    @classmethod
+    def resolve_compute_type(cls, compute_type):
+        # int8 weights are the fast path on CPUs without a GPU
+        return "int8" if compute_type == DEFAULT_COMPUTE_TYPE else compute_type
+
+    def _load(self):
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(
+            self.model_name, device=self.device, compute_type=self.compute_type, cpu_threads=self.threads
+        )
+
+    def _transcribe(self, audio, progress):
+        segments, info = self._model.transcribe(audio, word_timestamps=True)
+        word_timings = []
+        # Segments are decoded lazily while iterating
+        for segment in segments:
+            for word in segment.words or ():
+                word_timings.append((word.word.strip(), float(word.start), float(word.end)))
+            if progress is not None and info.duration:
+                progress(min(100, int(100 * segment.end / info.duration)))
+        return word_timings
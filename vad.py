@@ -0,0 +1,120 @@
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# ENERGY-BASED VOICE ACTIVITY DETECTION
+# ------------------------------------------------------------------------
+# Frames of 30 ms are classified by RMS level against a threshold derived
+# from the clip itself (noise floor + margin, capped below the loud end so
+# takes without pauses stay speech). Short dropouts are bridged, blips are
+# dropped and regions are padded, so word edges are not clipped.
+#
+# Speech regions are packed back to back (with a short silent gap) into one
+# array for the transcriber; word times are mapped back through the packing
+# table, so silences never reach Whisper.
+
+FRAME_SECONDS = 0.03
+
+
+def frame_levels(samples, sample_rate, frame_seconds=FRAME_SECONDS):
+    """RMS level of each frame in dBFS (float32 samples in [-1, 1])."""
+    frame_length = max(1, int(sample_rate * frame_seconds))
+    count = len(samples) // frame_length
+    if len(samples) > count * frame_length:
+        # Zero-pad the tail into one last frame
+        samples = np.concatenate([samples, np.zeros((count + 1) * frame_length - len(samples), dtype=np.float32)])
+        count += 1
+    frames = np.asarray(samples, dtype=np.float32)[:count * frame_length].reshape(count, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+def _runs(mask):
+    """(starts, ends) of the True runs of a boolean array, as index arrays."""
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_threshold(levels, margin_db=12.0, min_db=-55.0, min_range_db=20.0):
+    """Level (dBFS) above which a frame counts as speech, derived from the clip's own levels."""
+    floor = np.percentile(levels, 10)
+    peak = np.percentile(levels, 99)
+    return max(min(floor + margin_db, peak - min_range_db), min_db)
+
+
+def detect_speech(samples, sample_rate, margin_db=12.0, min_db=-55.0, min_range_db=20.0,
+                  min_speech=0.15, min_silence=0.3, padding=0.15, frame_seconds=FRAME_SECONDS, levels=None):
+    """
+    Returns the speech regions of `samples` as an (n, 2) float array of
+    (start, end) seconds, sorted and non-overlapping. Precomputed frame
+    `levels` (frame_levels of the same samples) skip the RMS pass.
+    """
+    duration = len(samples) / float(sample_rate)
+    if not len(samples):
+        return np.empty((0, 2))
+    if levels is None:
+        levels = frame_levels(samples, sample_rate, frame_seconds)
+
+    speech = levels > speech_threshold(levels, margin_db, min_db, min_range_db)
+
+    # Bridge pauses shorter than min_silence (not at the clip edges)
+    starts, ends = _runs(~speech)
+    short = ((ends - starts) * frame_seconds < min_silence) & (starts > 0) & (ends < len(speech))
+    fill = np.zeros(len(speech) + 1, dtype=np.int32)
+    np.add.at(fill, starts[short], 1)
+    np.add.at(fill, ends[short], -1)
+    speech |= np.cumsum(fill[:-1]) > 0
+
+    starts, ends = _runs(speech)
+    keep = (ends - starts) * frame_seconds >= min_speech
+    regions = np.column_stack([starts[keep], ends[keep]]) * frame_seconds
+    if not len(regions):
+        return np.empty((0, 2))
+
+    regions[:, 0] = np.maximum(regions[:, 0] - padding, 0.0)
+    regions[:, 1] = np.minimum(regions[:, 1] + padding, duration)
+    # Padding can make neighbours overlap; merge them (ends are increasing)
+    first = np.concatenate([[True], regions[1:, 0] > regions[:-1, 1]])
+    last = np.concatenate([first[1:], [True]])
+    return np.column_stack([regions[first, 0], regions[last, 1]])
+
+
+def pack_regions(samples, sample_rate, regions, gap=0.3):
+    """
+    Concatenates the regions of `samples` with `gap` seconds of silence in
+    between. Returns (packed_samples, table) where each table row is
+    (packed_start, source_start, length) in seconds.
+    """
+    gap_samples = np.zeros(int(gap * sample_rate), dtype=np.float32)
+    pieces = []
+    table = np.empty((len(regions), 3))
+    position = 0.0
+    for i, (start, end) in enumerate(regions):
+        a, b = int(start * sample_rate), int(end * sample_rate)
+        if i:
+            pieces.append(gap_samples)
+            position += len(gap_samples) / float(sample_rate)
+        pieces.append(np.asarray(samples[a:b], dtype=np.float32))
+        table[i] = (position, a / float(sample_rate), (b - a) / float(sample_rate))
+        position += (b - a) / float(sample_rate)
+    packed = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    return packed, table
+
+
+def unpack_words(word_timings, table):
+    """
+    Maps (word, start, end) tuples from packed time back to source time.
+    Each word is assigned to the region nearest its midpoint and clamped to it.
+    """
+    if not len(word_timings) or not len(table):
+        return []
+    starts = np.array([start for _, start, _ in word_timings])
+    ends = np.array([end for _, _, end in word_timings])
+    # Regions meet in the middle of the gaps between them
+    boundaries = (table[1:, 0] + table[:-1, 0] + table[:-1, 2]) / 2.0
+    region = np.searchsorted(boundaries, (starts + ends) / 2.0, side="right")
+
+    packed_start, source_start, length = table[region, 0], table[region, 1], table[region, 2]
+    mapped_starts = source_start + np.clip(starts - packed_start, 0.0, length)
+    mapped_ends = source_start + np.clip(ends - packed_start, 0.0, length)
+    return [(w, float(s), float(e)) for (w, _, _), s, e in zip(word_timings, mapped_starts, mapped_ends)]
@@ -0,0 +1,193 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+
+from . import profiling
+
+
+# ------------------------------------------------------------------------
+# PERSISTENT WHISPER WORKER
+# ------------------------------------------------------------------------
+# Runs open_AI_whisper.py --worker in the external Python installation and
+# keeps it alive across Extract clicks, so the model and G2P load only once.
+
+class WorkerError(Exception):
+    pass
+
+
+class WhisperWorker:
+    def __init__(self, python_exe, script_path, model_name="base", threads=0):
+        self.python_exe = python_exe
+        self.script_path = script_path
+        # A transcriber spec, e.g. "base" or "faster-whisper:small:int8"
+        self.model_name = model_name
+        self.threads = threads
+        self.process = None
+        self._lines = None
+        self._next_id = 1
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, timeout=300, wait=True):
+        """Starts the worker and (unless wait is False) blocks until the model is loaded."""
+        self.stop()
+        cmd = [self.python_exe, self.script_path, "--worker", "--model", self.model_name,
+               "--threads", str(self.threads)]
+        print(f"Starting Whisper worker: {' '.join(cmd)}")
+
+        # stderr is inherited so Whisper's logs end up in Blender's console.
+        with profiling.stage("spawn"):
+            self.process = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                encoding="utf-8", bufsize=1, env=os.environ.copy()
+            )
+            self._lines = queue.Queue()
+            reader = threading.Thread(target=self._read_stdout, args=(self.process, self._lines), daemon=True)
+            reader.start()
+
+        if wait:
+            message = self._wait_for(lambda m: m.get("event") == "ready", timeout)
+            # The worker's model load, timed on its side
+            profiling.profiler.merge(message.get("profile"))
+            print(f"Whisper worker ready (pid {message.get('pid')})")
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self._send({"cmd": "shutdown"})
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+        self._lines = None
+
+    def kill(self):
+        """Stops the worker immediately, abandoning any running job."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        self._lines = None
+
+    def submit(self, audio_path, out_path, options=None):
+        """
+        Queues one extraction job and returns its id without waiting. While the
+        profiler traces, the worker returns the job's trace events too.
+        """
+        job_id = self._next_id
+        self._next_id += 1
+        job = {"id": job_id, "audio": audio_path, "out": out_path, "options": options or {}}
+        if profiling.profiler.tracing:
+            job["trace"] = True
+        self._send(job)
+        return job_id
+
+    def poll(self):
+        """
+        Returns every message received so far without blocking.
+        Raises WorkerError once the worker has exited.
+        """
+        messages = []
+        while True:
+            try:
+                line = self._lines.get_nowait()
+            except queue.Empty:
+                return messages
+            if line is None:
+                self._lines.put(None)
+                if messages:
+                    return messages
+                raise WorkerError(f"Whisper worker exited with code {self.process.wait()}")
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                continue
+
+    def run_job(self, audio_path, out_path, timeout=300, options=None):
+        """Sends one extraction job and blocks until its result arrives."""
+        job_id = self.submit(audio_path, out_path, options)
+        result = self._wait_for(lambda m: m.get("id") == job_id and "ok" in m, timeout)
+        profiling.profiler.merge(result.get("profile"), result.get("trace_events"))
+        return result
+
+    def _send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"Whisper worker is not accepting jobs: {e}")
+
+    def _wait_for(self, predicate, timeout):
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                raise WorkerError(f"Whisper worker did not answer within {timeout}s")
+            if line is None:
+                # stdout closed: the process is gone (or going), reap it.
+                try:
+                    code = self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    code = self.process.wait()
+                raise WorkerError(f"Whisper worker exited with code {code}")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if predicate(message):
+                return message
+
+    @staticmethod
+    def _read_stdout(process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+
+_worker = None
+
+
+def get_worker(python_exe, script_path, model_name="base", wait=True, threads=0):
+    """Returns the shared worker, (re)starting it if it is missing, dead or outdated."""
+    global _worker
+    if _worker is not None and (
+        _worker.python_exe != python_exe or _worker.model_name != model_name or _worker.threads != threads
+    ):
+        _worker.stop()
+        _worker = None
+
+    if _worker is None:
+        _worker = WhisperWorker(python_exe, script_path, model_name, threads)
+    if not _worker.is_alive():
+        _worker.start(wait=wait)
+    return _worker
+
+
+def run_job(python_exe, script_path, audio_path, out_path, model_name="base", timeout=300, options=None,
+            threads=0):
+    """Runs one job on the shared worker, restarting it once if it crashed."""
+    worker = get_worker(python_exe, script_path, model_name, threads=threads)
+    try:
+        return worker.run_job(audio_path, out_path, timeout, options)
+    except WorkerError as e:
+        if worker.is_alive():
+            raise
+        print(f"Whisper worker crashed ({e}); restarting")
+        worker = get_worker(python_exe, script_path, model_name, threads=threads)
+        return worker.run_job(audio_path, out_path, timeout, options)
+
+
+def shutdown_worker(force=False):
+    global _worker
+    if _worker is not None:
+        if force:
+            _worker.kill()
+        else:
+            _worker.stop()
+        _worker = None